@@ -0,0 +1,7 @@
+"""
+EventRAG is the event knowledge agent: the MeTTa knowledge graph, its indexes, snapshot and learned-answer
+store, and the query pipeline in utils.py. It is a package so the coordinator can embed the same pipeline
+(embedded_rag.py) without putting this directory on sys.path. Run the agent and its scripts from the
+repository root, e.g. `python -m EventRAG.agent`; tracing, streaming and single_flight are the coordinator's
+modules there, shared by both agents.
+"""
@@ -6,29 +6,36 @@ model (LLM), and returns contextually accurate answers. The agent acknowledges i
 logs user interactions, and handles errors gracefully. The workflow involves parsing user queries,
 retrieving relevant event information from the knowledge base, generating responses, and sending
 formatted replies back to the sender effectively functioning as an intelligent, autonomous event
-Q&A assistant.
+Q&A assistant. With STREAM_REPLIES=1, answers written by the LLM are sent in progressive chunks as they
+are generated. Identical questions asked at the same time share one pipeline run. With TRACING=1, each
+stage (classify, retrieve, summarize, send) is timed and its LLM tokens counted (tracing.py).
 """
 
 from datetime import datetime, timezone
+from functools import partial
 from uuid import uuid4
 import json
 import os
 from dotenv import load_dotenv
-from uagents import Context, Model, Protocol, Agent
+from uagents import Context, Field, Model, Protocol, Agent
 from hyperon import MeTTa
 
 from uagents_core.contrib.protocols.chat import (
     ChatAcknowledgement,
     ChatMessage,
+    MetadataContent,
     StartSessionContent,
     TextContent,
     chat_protocol_spec,
 )
 
 # Import components from separate files
-from event_rag import EventRAG
-from knowledge import initialize_knowledge_graph
-from utils import LLM, process_query
+from single_flight import SingleFlight
+from streaming import ChatStream
+from tracing import tracer
+from .knowledge_store import KnowledgeStore
+from .snapshot import load_knowledge, save_snapshot
+from .utils import AsyncLLM, IntentClassifier, learned_cache_from_rag, process_query_async
 
 # Load environment variables
 load_dotenv()
@@ -43,9 +50,18 @@ class GeneralQuery(Model):
     keyword: str
 
 
-def create_text_chat(text: str) -> ChatMessage:
-    """Create a text chat message."""
+class TraceMetrics(Model):
+    enabled: bool = Field(description="Whether tracing is on (TRACING=1)")
+    stages: dict = Field(description="Per stage/kind: spans, errors, and duration and token histograms")
+    prometheus: str = Field(description="The same histograms in the Prometheus text exposition format")
+
+
+def create_text_chat(text: str, in_reply_to=None) -> ChatMessage:
+    """Create a text chat message, tagged with the msg_id of the question it answers if given."""
     content = [TextContent(type="text", text=text)]
+    if in_reply_to is not None:
+        # the coordinator routes the answer to whoever asked by this id
+        content.append(MetadataContent(metadata={"in_reply_to": str(in_reply_to)}))
     return ChatMessage(
         timestamp=datetime.now(timezone.utc),
         msg_id=uuid4(),
@@ -54,10 +70,26 @@ def create_text_chat(text: str) -> ChatMessage:
 
 
 # Initialize global components
+EVENTRAG_DIR = os.path.dirname(os.path.abspath(__file__))
 metta = MeTTa()
-initialize_knowledge_graph(metta)
-rag = EventRAG(metta)
-llm = LLM(api_key=os.getenv("ASI1_API_KEY"))
+snapshot_path = os.getenv("EVENTRAG_SNAPSHOT", os.path.join(EVENTRAG_DIR, "knowledge.snapshot"))
+rag = load_knowledge(
+    metta,
+    store=KnowledgeStore(os.getenv("EVENTRAG_STORE", os.path.join(EVENTRAG_DIR, "learned_knowledge.db"))),
+    snapshot_path=snapshot_path,
+)
+llm = AsyncLLM(api_key=os.getenv("ASI1_API_KEY"))
+classifier = IntentClassifier.from_rag(rag)
+learned_cache = learned_cache_from_rag(
+    rag,
+    threshold=float(os.getenv("EVENTRAG_LEARNED_THRESHOLD", "0.85")),
+    max_entries=int(os.getenv("EVENTRAG_LEARNED_MAX", "5000")),
+)
+
+STREAM_REPLIES = os.getenv("STREAM_REPLIES", "0") == "1"
+
+# concurrent identical questions share one process_query_async run
+inflight_queries = SingleFlight()
 
 # Protocol setup
 chat_proto = Protocol(spec=chat_protocol_spec)
@@ -66,7 +98,6 @@ chat_proto = Protocol(spec=chat_protocol_spec)
 @chat_proto.on_message(ChatMessage)
 async def handle_message(ctx: Context, sender: str, msg: ChatMessage):
     """Handle incoming chat messages and process Fetch.ai/uAgents queries."""
-    ctx.storage.set(str(ctx.session), sender)
     await ctx.send(
         sender,
         ChatAcknowledgement(timestamp=datetime.now(timezone.utc), acknowledged_msg_id=msg.msg_id),
@@ -82,7 +113,24 @@ async def handle_message(ctx: Context, sender: str, msg: ChatMessage):
 
             try:
                 # Process the query using the general assistant logic
-                response = process_query(user_query, rag, llm)
+                reply = partial(create_text_chat, in_reply_to=msg.msg_id)
+                stream = ChatStream(ctx, sender, reply) if STREAM_REPLIES else None
+                # a question that joins one already running gets the answer whole, not streamed
+                response = await inflight_queries.do(
+                    " ".join(user_query.lower().split()),
+                    lambda: process_query_async(user_query, rag, llm, classifier, learned_cache=learned_cache,
+                                                on_delta=stream.write if stream else None),
+                )
+                ctx.logger.info(f"RAG query cache: {rag.cache_stats()} | learned cache: {learned_cache.stats()} "
+                                f"| coalesced queries: {inflight_queries.stats()}")
+                if stream:
+                    await stream.close()
+                if stream and stream.chunks:
+                    # the answer has gone out as it was generated
+                    ctx.logger.info(f"Streamed reply in {stream.chunks} chunks: first after "
+                                    f"{stream.first_chunk_s * 1000:.0f} ms, complete after {stream.elapsed * 1000:.0f} ms "
+                                    f"| LLM streams: {llm.stream_stats()}")
+                    continue
 
                 # Format the response
                 if isinstance(response, dict):
@@ -91,14 +139,15 @@ async def handle_message(ctx: Context, sender: str, msg: ChatMessage):
                     answer_text = str(response)
 
                 # Send the response back
-                await ctx.send(sender, create_text_chat(answer_text))
+                with tracer.span("send", "reply"):
+                    await ctx.send(sender, reply(answer_text))
 
             except Exception as e:
                 ctx.logger.error(f"Error processing Fetch.ai/uAgents query: {e}")
                 await ctx.send(
                     sender,
                     create_text_chat(
-                        "I apologize, but I encountered an error processing your. Please try again.")
+                        "I apologize, but I encountered an error processing your. Please try again.", msg.msg_id)
                 )
         else:
             ctx.logger.info(f"Got unexpected content from {sender}")
@@ -110,6 +159,33 @@ async def handle_ack(ctx: Context, sender: str, msg: ChatAcknowledgement):
     ctx.logger.info(f"Got an acknowledgement from {sender} for {msg.acknowledged_msg_id}")
 
 
+@agent.on_rest_get("/metrics/trace", TraceMetrics)
+async def trace_metrics(ctx: Context) -> TraceMetrics:
+    """Per-stage latency and token histograms, to see where a slow answer spent its time."""
+    return TraceMetrics(enabled=tracer.enabled, stages=tracer.snapshot(), prometheus=tracer.prometheus())
+
+
+@agent.on_interval(period=15.0)
+async def write_trace_metrics(ctx: Context):
+    """With TRACING=1 and TRACING_PROMETHEUS_FILE set, keep that file current for a textfile collector."""
+    path = os.getenv("TRACING_PROMETHEUS_FILE")
+    if tracer.enabled and path:
+        tracer.write_prometheus(path)
+
+
+@agent.on_event("shutdown")
+async def close_clients(ctx: Context):
+    """Snapshot the graph (with what was learned) for the next start, then release the LLM pool and the store."""
+    if snapshot_path:
+        save_snapshot(rag, snapshot_path)
+    ctx.logger.info(f"LLM stream stats: {llm.stream_stats()}")
+    ctx.logger.info(f"Coalesced queries: {inflight_queries.stats()}")
+    if tracer.enabled:
+        ctx.logger.info(f"Stage traces:\n{tracer.prometheus()}")
+    await llm.aclose()
+    rag.store.close()
+
+
 # Register the protocol
 agent.include(chat_proto, publish_manifest=True)
 
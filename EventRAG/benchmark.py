@@ -0,0 +1,335 @@
+# benchmark.py
+"""
+benchmark.py measures the retrieval cost of the EventRAG pipeline without touching the network.
+A scripted stand-in for the ASI:One LLM returns a fixed intent/keyword pair, so process_query runs
+its real MeTTa lookups for each intent. For every intent the script reports how many metta.run
+calls a single query makes and how long it takes: with the original call pattern (BaselineEventRAG:
+one match per lookup, most fields looked up twice, no cache), with the fact index, and with the
+query cache on top. Finally it times top-5 BM25 FAQ
+search over a synthetic set of 10k FAQ entries and search_events over 5k synthetic events, and
+reports load time and memory for a 100k-fact data file in JSON and .metta form. The startup section runs a
+fresh interpreter per start and reports import time, graph build time and first-query latency without a
+knowledge snapshot and with one (snapshot.py).
+
+Run from the repository root:  python -m EventRAG.benchmark
+"""
+
+import json
+import os
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from hyperon import MeTTa, E, S, ValueAtom
+
+from .event_rag import EventRAG
+from .knowledge import initialize_knowledge_graph
+from .utils import process_query
+
+# (intent, keyword, sample query) for each branch of process_query
+INTENT_QUERIES = [
+    ("dates", "devconnect", "When is Devconnect?"),
+    ("venue", "breakpoint", "Where is the venue for breakpoint?"),
+    ("ticket", "devconnect", "How much are devconnect tickets?"),
+    ("logistics", "devconnect", "How do I get around Buenos Aires?"),
+    ("side_event", "devconnect", "What are the side events?"),
+    ("speakers", "breakpoint", "Who is speaking at breakpoint?"),
+    ("program", "devconnect", "What is Destino?"),
+    ("faq", "what_is_breakpoint", "What is breakpoint?"),
+    ("unknown", "unknown", "Can I bring my laptop?"),
+]
+
+
+class ScriptedLLM:
+    """Offline LLM stand-in: answers the intent prompt with a fixed pair, echoes data otherwise."""
+
+    def __init__(self, intent: str, keyword: str):
+        self.intent = intent
+        self.keyword = keyword
+
+    def create_completion(self, prompt: str, max_tokens: int = 300) -> str:
+        if "Classify intent" in prompt:
+            return json.dumps({"intent": self.intent, "keyword": self.keyword})
+        if "Humanized Answer" in prompt:
+            return "Selected Question: benchmark\nHumanized Answer: benchmark"
+        return "Scripted answer."
+
+
+class CountingMeTTa:
+    """Wraps a MeTTa instance and counts interpreter round trips made through run()."""
+
+    def __init__(self, metta: MeTTa):
+        self._metta = metta
+        self.runs = 0
+
+    def run(self, program: str, *args, **kwargs):
+        self.runs += 1
+        return self._metta.run(program, *args, **kwargs)
+
+    def space(self):
+        return self._metta.space()
+
+
+class BaselineEventRAG(EventRAG):
+    """
+    EventRAG without the fact index or cache, making the lookups the original code made: each field of
+    a summary, the logistics and the venue answer was queried once to test for a value and again to
+    read it, and process_query looked ticket payment methods up a second time.
+    """
+
+    def __init__(self, metta_instance):
+        super().__init__(metta_instance, indexed=False, cache_size=0)
+
+    def query_first(self, relation, subject, default=None):
+        return self.query(relation, subject)[0] if self.query(relation, subject) else default
+
+    def get_event_summary(self, event_key):
+        fullname = self.query("event_fullname", event_key)
+        name = self.query("event", event_key)
+        return {
+            "name": fullname[0] if fullname else (name[0] if name else event_key),
+            "organizer": self.query_first("organiser", event_key),
+            "dates": self.query_first("date_range", event_key),
+            "venue": self.query_first("venue", event_key),
+            "city": self.query_first("venue_city", event_key),
+            "country": self.query_first("venue_country", event_key),
+            "description": (self.query("event_description", event_key) or
+                            self.query("short_desc", event_key) or [""])[0],
+        }
+
+    def get_ticket_info(self, event_key):
+        tiers = self.get_ticket_tiers(event_key)
+        payment = self.query("ticket_payment_methods", event_key)
+        note = self.query("ticket_note", event_key)
+        self.query("ticket_payment_methods", event_key)  # process_query's own lookup
+        return {"tiers": tiers, "payment": payment[0] if payment else None, "note": note[0] if note else None}
+
+
+def measure(indexed: bool, cache_size: int = 0, repeat: int = 50, baseline: bool = False) -> dict:
+    metta = MeTTa()
+    initialize_knowledge_graph(metta)
+    counting = CountingMeTTa(metta)
+    if baseline:
+        rag = BaselineEventRAG(counting)
+    else:
+        rag = EventRAG(counting, indexed=indexed, cache_size=cache_size)
+
+    report = {}
+    for intent, keyword, query in INTENT_QUERIES:
+        llm = ScriptedLLM(intent, keyword)
+        process_query(query, rag, llm)  # warm-up; also lets the "unknown" branch learn once
+
+        counting.runs = 0
+        start = time.perf_counter()
+        for _ in range(repeat):
+            process_query(query, rag, llm)
+        elapsed = time.perf_counter() - start
+        report[intent] = {
+            "metta_runs": counting.runs / repeat,
+            "ms_per_query": elapsed * 1000 / repeat,
+        }
+    if cache_size:
+        print(f"query cache after run: {rag.cache_stats()}")
+    return report
+
+
+FAQ_TOPICS = ["ticket", "visa", "wifi", "laptop", "parking", "food", "badge", "refund", "hotel", "airport",
+              "locker", "childcare", "accessibility", "recording", "stream", "merch", "volunteer", "press"]
+FAQ_ASPECTS = ["policy", "price", "hours", "location", "rules", "deadline", "contact", "options"]
+
+
+def measure_faq(n_entries: int = 10_000, n_queries: int = 2_000, vocabulary: int = 5_000) -> dict:
+    """Build EventRAG over a synthetic FAQ set and time BM25 ranking of free-text questions."""
+    rng = random.Random(7)
+    words = sorted({"".join(rng.choice("bcdfghklmnprstvz") + rng.choice("aeiou") for _ in range(3))
+                    for _ in range(vocabulary * 2)})[:vocabulary]
+    rng.shuffle(words)
+    zipf = [1 / (rank + 1) for rank in range(vocabulary)]
+
+    metta = MeTTa()
+    keys = []
+    for i in range(n_entries):
+        topic, aspect = rng.choice(FAQ_TOPICS), rng.choice(FAQ_ASPECTS)
+        subject = rng.choices(words, weights=zipf, k=2)
+        key = f"{topic}_{aspect}_{'_'.join(subject)}_{i}"
+        answer = " ".join(rng.choices(words, weights=zipf, k=12))
+        metta.space().add_atom(E(S("faq"), S(key), ValueAtom(f"The {topic} {aspect}: {answer}.")))
+        keys.append(key)
+
+    start = time.perf_counter()
+    rag = EventRAG(metta, cache_size=0)
+    build_s = time.perf_counter() - start
+
+    questions = [key.rsplit("_", 1)[0].replace("_", " ") + "?" for key in rng.sample(keys, n_queries)]
+    start = time.perf_counter()
+    for q in questions:
+        rag.search_faq(q, k=5)
+    search_s = time.perf_counter() - start
+    return {"entries": len(rag.faq_index), "build_ms": build_s * 1000, "us_per_search": search_s * 1e6 / n_queries}
+
+
+CITIES = ["Buenos Aires", "Abu Dhabi", "Lisbon", "Denver", "Singapore", "Seoul", "Berlin", "Bangkok", "Istanbul",
+          "Nairobi", "Lagos", "Paris", "Dubai", "Austin", "Toronto", "Prague"]
+
+
+def measure_event_search(n_events: int = 5_000, n_queries: int = 1_000) -> dict:
+    """Time search_events (all-terms prefix match and ranked) over a synthetic graph of many events."""
+    rng = random.Random(11)
+    metta = MeTTa()
+    for i in range(n_events):
+        key, city = f"conf_{i}", rng.choice(CITIES)
+        metta.space().add_atom(E(S("event"), S(key), ValueAtom(f"Conference {i} {rng.choice(FAQ_TOPICS)} summit")))
+        metta.space().add_atom(E(S("venue"), S(key), ValueAtom(f"Hall {i % 40}")))
+        metta.space().add_atom(E(S("venue_city"), S(key), ValueAtom(city)))
+
+    start = time.perf_counter()
+    rag = EventRAG(metta, cache_size=0)
+    build_s = time.perf_counter() - start
+
+    queries = [f"{rng.choice(FAQ_TOPICS)} {rng.choice(CITIES).split()[0]}" for _ in range(n_queries)]
+    timings = {}
+    for mode in (False, True):
+        start = time.perf_counter()
+        for q in queries:
+            rag.search_events(q, ranked=mode, limit=10)
+        timings["ranked" if mode else "match_all"] = (time.perf_counter() - start) * 1e6 / n_queries
+    return {"events": len(rag.event_index), "build_ms": build_s * 1000, **timings}
+
+
+def write_synthetic_facts(data_dir: str, n_facts: int, fmt: str = "json") -> str:
+    """Write n_facts synthetic (fact_R conf_N "value I") facts to one data file. Returns its path."""
+    relations = [f"fact_{r}" for r in range(50)]
+    path = os.path.join(data_dir, f"synthetic.{fmt}")
+    with open(path, "w", encoding="utf-8") as f:
+        if fmt == "json":
+            document = {}
+            for i in range(n_facts):
+                document.setdefault(f"conf_{i // len(relations)}", {})[relations[i % len(relations)]] = f"value {i}"
+            json.dump(document, f)
+        else:
+            for i in range(n_facts):
+                f.write(f'({relations[i % len(relations)]} conf_{i // len(relations)} "value {i}")\n')
+    return path
+
+
+def measure_knowledge_load(n_facts: int = 100_000, fmt: str = "json") -> dict:
+    """Time and memory to load n_facts from one synthetic data file and index them."""
+    with tempfile.TemporaryDirectory() as data_dir:
+        write_synthetic_facts(data_dir, n_facts, fmt)
+
+        rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        tracemalloc.start()
+        metta = MeTTa()
+        start = time.perf_counter()
+        loaded = initialize_knowledge_graph(metta, data_dir)
+        load_s = time.perf_counter() - start
+        start = time.perf_counter()
+        EventRAG(metta)
+        index_s = time.perf_counter() - start
+        _, python_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    return {
+        "loaded": loaded,
+        "load_s": load_s,
+        "index_s": index_s,
+        "python_peak_mb": python_peak / 2**20,
+        "max_rss_growth_mb": (rss_after - rss_before) / 1024,  # ru_maxrss is KiB on Linux
+    }
+
+
+# runs in a fresh interpreter so module import cost is measured too; argv: snapshot path, data dir ("" = default)
+_STARTUP_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+from hyperon import MeTTa
+from EventRAG.snapshot import load_knowledge
+from EventRAG.utils import process_query
+import_s = time.perf_counter() - start
+start = time.perf_counter()
+rag = load_knowledge(MeTTa(), snapshot_path=sys.argv[1] or None, data_dir=sys.argv[2] or None)
+build_s = time.perf_counter() - start
+from EventRAG.benchmark import ScriptedLLM
+start = time.perf_counter()
+process_query("When is Devconnect?", rag, ScriptedLLM("dates", "devconnect"))
+print(json.dumps({"import_s": import_s, "build_s": build_s, "first_query_s": time.perf_counter() - start}))
+"""
+
+
+def measure_startup(data_dir: str = "", repeat: int = 3) -> dict:
+    """
+    Import time, graph build time and first-query latency of a fresh process, median of `repeat` runs:
+    without a snapshot, on the first start with one (build + write) and on later starts (snapshot load).
+    """
+    def probe(snapshot_path: str) -> dict:
+        out = subprocess.run([sys.executable, "-c", _STARTUP_PROBE, snapshot_path, data_dir],
+                             capture_output=True, text=True, check=True,
+                             cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        return json.loads(out.stdout.strip().splitlines()[-1])
+
+    def median(runs: list) -> dict:
+        return {key: statistics.median(run[key] for run in runs) for key in runs[0]}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        snapshot_path = os.path.join(tmp, "knowledge.snapshot")
+        no_snapshot = median([probe("") for _ in range(repeat)])
+        first_start = probe(snapshot_path)
+        snapshot_start = median([probe(snapshot_path) for _ in range(repeat)])
+    return {"no snapshot": no_snapshot, "build + write": first_start, "from snapshot": snapshot_start}
+
+
+def print_startup(title: str, report: dict):
+    print(f"\n{title}")
+    print(f"{'start':<16}{'import (ms)':>14}{'graph build (ms)':>20}{'first query (ms)':>20}")
+    for mode, row in report.items():
+        print(f"{mode:<16}{row['import_s'] * 1000:>14.1f}{row['build_s'] * 1000:>20.1f}{row['first_query_s'] * 1000:>20.2f}")
+
+
+def print_report(title: str, before: dict, after: dict, columns=("metta_runs", "ms_per_query")):
+    print(f"\n{title}")
+    header = f"{'intent':<12}" + "".join(f"{c + ' (before)':>26}{c + ' (after)':>26}" for c in columns)
+    print(header)
+    print("-" * len(header))
+    for intent in before:
+        row = f"{intent:<12}"
+        for c in columns:
+            row += f"{before[intent][c]:>26.3f}{after[intent][c]:>26.3f}"
+        print(row)
+
+
+if __name__ == "__main__":
+    baseline = measure(indexed=False, baseline=True)
+    print_report(
+        "metta.run calls and latency per query, original lookups (before) vs fact index (after)",
+        baseline,
+        measure(indexed=True),
+    )
+    print_report(
+        "metta.run calls and latency per query, original lookups (before) vs index + query cache (after)",
+        baseline,
+        measure(indexed=True, cache_size=1024),
+    )
+
+    faq = measure_faq()
+    print(f"\nFAQ BM25 index: {faq['entries']} entries, built with the fact index in {faq['build_ms']:.0f} ms, "
+          f"top-5 search {faq['us_per_search']:.0f} µs/query")
+
+    events = measure_event_search()
+    print(f"event search: {events['events']} events indexed in {events['build_ms']:.0f} ms, "
+          f"all-terms {events['match_all']:.0f} µs/query, ranked {events['ranked']:.0f} µs/query")
+
+    for fmt in ("json", "metta"):
+        load = measure_knowledge_load(fmt=fmt)
+        print(f"knowledge load ({fmt}): {load['loaded']}; load {load['load_s']:.2f} s, index {load['index_s']:.2f} s, "
+              f"python peak {load['python_peak_mb']:.0f} MB, max RSS +{load['max_rss_growth_mb']:.0f} MB")
+
+    print_startup("agent startup, data/ knowledge files", measure_startup())
+    with tempfile.TemporaryDirectory() as synthetic_dir:
+        write_synthetic_facts(synthetic_dir, 100_000)
+        print_startup("agent startup, 100k synthetic facts", measure_startup(synthetic_dir))
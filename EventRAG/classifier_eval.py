@@ -0,0 +1,118 @@
+# classifier_eval.py
+"""
+classifier_eval.py reports how well the local IntentClassifier fast path does on a labelled query
+set: coverage (share of queries resolved without an LLM call), accuracy of the resolved pairs
+against the labels and, when ASI1_API_KEY is set, agreement with the ASI:One classifier on the
+same queries. It exits non-zero if a query in REQUIRED_LOCAL isn't resolved locally and correctly.
+
+Run from the repository root:  python -m EventRAG.classifier_eval
+"""
+
+import os
+import sys
+
+from dotenv import load_dotenv
+from hyperon import MeTTa
+
+from .event_rag import EventRAG
+from .knowledge import initialize_knowledge_graph
+from .utils import LLM, IntentClassifier, get_intent_and_keyword
+
+# (query, intent, keyword) — keyword "" where the pipeline ignores it
+LABELLED_QUERIES = [
+    ("When is Devconnect?", "dates", "devconnect"),
+    ("when is devconnect", "dates", "devconnect"),
+    ("When is Breakpoint?", "dates", "breakpoint"),
+    ("What are the dates for Breakpoint 2025?", "dates", "breakpoint"),
+    ("When does the Abu Dhabi conference start?", "dates", "breakpoint"),
+    ("Where is the venue for breakpoint?", "venue", "breakpoint"),
+    ("Where is Devconnect held?", "venue", "devconnect"),
+    ("What's the address of La Rural?", "venue", "devconnect"),
+    ("breakpoint tickets", "ticket", "breakpoint"),
+    ("How much are devconnect tickets?", "ticket", "devconnect"),
+    ("Student price for Solana Breakpoint", "ticket", "breakpoint"),
+    ("Can I pay for Devconnect with crypto?", "ticket", "devconnect"),
+    ("How do I get around Buenos Aires?", "logistics", "devconnect"),
+    ("Which ride apps work in Argentina?", "logistics", "devconnect"),
+    ("What is the emergency number in Buenos Aires?", "logistics", "devconnect"),
+    ("Best neighborhood to stay near La Rural", "logistics", "devconnect"),
+    ("Is it safe to walk at night in Buenos Aires?", "logistics", "devconnect"),
+    ("What are the side events?", "side_event", ""),
+    ("Any side events at Breakpoint?", "side_event", "breakpoint"),
+    ("Is there a hackathon at devconnect?", "side_event", "devconnect"),
+    ("Who is speaking at breakpoint?", "speakers", "breakpoint"),
+    ("Devconnect speakers", "speakers", "devconnect"),
+    ("Who gives the keynote at Etihad Arena?", "speakers", "breakpoint"),
+    ("What is Destino?", "program", ""),
+    ("How do I join the Frens program?", "program", ""),
+    ("Are there scholarships for devconnect?", "program", "devconnect"),
+    ("Can I bring my laptop?", "unknown", "unknown"),
+    ("What's the wifi password?", "unknown", "unknown"),
+    ("Tell me a joke", "unknown", "unknown"),
+    ("Is the food good?", "unknown", "unknown"),
+    ("How much is a taxi to La Rural from the airport?", "logistics", "devconnect"),
+    # answered from FAQ entries, which the fast path leaves to the LLM
+    ("What is Breakpoint?", "faq", "what_is_breakpoint"),
+    ("How do I enter La Rural?", "faq", "how_to_enter_la_rural"),
+    ("What does a Devconnect ticket include?", "faq", "devconnect_ticket_inclusions"),
+    ("Are Breakpoint sessions recorded?", "faq", "are_sessions_recorded"),
+    ("What are the Breakpoint prices?", "faq", "breakpoint_prices"),
+    # out of scope, but naming an event
+    ("How much is a hotel near devconnect?", "unknown", "unknown"),
+    ("How much does food cost in Buenos Aires?", "unknown", "unknown"),
+    ("How much time do I need at breakpoint?", "unknown", "unknown"),
+    ("Can I get a refund for my breakpoint pass?", "unknown", "unknown"),
+    ("Where should I eat near devconnect?", "unknown", "unknown"),
+    ("Where can I park at breakpoint?", "unknown", "unknown"),
+    ("Where do I pick up my breakpoint badge?", "unknown", "unknown"),
+    ("When does devconnect registration close?", "unknown", "unknown"),
+    ("Is the devconnect ticket price refundable?", "unknown", "unknown"),
+    ("What is the wifi password at the breakpoint venue?", "unknown", "unknown"),
+]
+
+# the questions the fast path exists for: these must never need an LLM call
+REQUIRED_LOCAL = ["When is Devconnect?", "when is devconnect", "When is Breakpoint?"]
+
+
+def _matches(predicted: tuple, intent: str, keyword: str) -> bool:
+    p_intent, p_keyword = predicted
+    if p_intent != intent:
+        return False
+    return intent in IntentClassifier.KEYWORD_OPTIONAL or p_keyword == keyword
+
+
+def evaluate(classifier: IntentClassifier, llm: LLM = None) -> dict:
+    covered, correct, compared, agreed = 0, 0, 0, 0
+    missed_required = list(REQUIRED_LOCAL)
+    for query, intent, keyword in LABELLED_QUERIES:
+        local = classifier.classify(query)
+        if local is None:
+            continue
+        if query in missed_required and _matches(local, intent, keyword):
+            missed_required.remove(query)
+        covered += 1
+        correct += _matches(local, intent, keyword)
+        if llm is not None:
+            compared += 1
+            agreed += _matches(local, *get_intent_and_keyword(query, llm))
+
+    return {
+        "queries": len(LABELLED_QUERIES),
+        "coverage": covered / len(LABELLED_QUERIES),
+        "accuracy_on_covered": correct / covered if covered else 0.0,
+        "llm_agreement_on_covered": agreed / compared if compared else None,
+        "missed_required": missed_required,
+    }
+
+
+if __name__ == "__main__":
+    load_dotenv()
+    metta = MeTTa()
+    initialize_knowledge_graph(metta)
+    rag = EventRAG(metta)
+    api_key = os.getenv("ASI1_API_KEY")
+
+    report = evaluate(IntentClassifier.from_rag(rag), LLM(api_key) if api_key else None)
+    for name, value in report.items():
+        print(f"{name:<26} {value if value is None or isinstance(value, (int, list)) else f'{value:.1%}'}")
+    sys.exit(1 if report["missed_required"] else 0)
@@ -8,14 +8,211 @@ ensures robust string extraction, and supports dynamic knowledge expansion via a
 the bridge between symbolic reasoning and natural language agent responses.
 """
 
+import time
+from collections import OrderedDict
 from hyperon import MeTTa, E, S
 from hyperon.atoms import ValueAtom  # Correct import
-from typing import List, Tuple, Optional, Dict, Any
+from typing import List, Tuple, Optional, Dict, Any, Callable, Hashable
+from .knowledge_store import KnowledgeStore
+from .faq_index import BM25Index
+from .knowledge import ingest_facts
+
+_MISS = object()
+
+
+class QueryCache:
+    """Bounded LRU cache with a per-entry TTL and hit/miss counters.
+
+    Keys are (kind, relation, subject) tuples so a write to one relation/subject pair
+    can drop exactly the entries it affects. max_size=0 disables caching.
+    """
+
+    KINDS = ("value", "symbol", "faq", "relation")
+
+    def __init__(self, max_size: int = 1024, ttl: Optional[float] = 300.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return _MISS
+        stored_at, value = entry
+        if self.ttl is not None and time.monotonic() - stored_at > self.ttl:
+            del self._entries[key]
+            self.misses += 1
+            return _MISS
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: Hashable, value: Any):
+        if self.max_size <= 0:
+            return
+        self._entries[key] = (time.monotonic(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, relation: str, subject: str):
+        """Drop every cached lookup that a new (relation, subject, _) fact could change."""
+        for kind in self.KINDS:
+            self._entries.pop((kind, relation, subject), None)
+        self._entries.pop(("relation", relation, None), None)
+
+    def invalidate_kind(self, kind: str):
+        """Drop every cached lookup of one kind, e.g. all FAQ answers after the FAQ set changes."""
+        for key in [key for key in self._entries if key[0] == kind]:
+            del self._entries[key]
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
 
 
 class EventRAG:
-    def __init__(self, metta_instance: MeTTa):
+    # relations whose values make an event findable through search_events
+    EVENT_SEARCH_RELATIONS = ("event", "event_fullname", "organiser", "date_range", "venue", "venue_city",
+                              "venue_country", "event_description", "short_desc")
+
+    def __init__(self, metta_instance: MeTTa, indexed: bool = True,
+                 cache_size: int = 1024, cache_ttl: Optional[float] = 300.0,
+                 store: Optional[KnowledgeStore] = None, faq_min_score: float = 1.0,
+                 snapshot: Optional[Dict[str, Any]] = None):
         self.metta = metta_instance
+        self.indexed = indexed
+        self.cache = QueryCache(max_size=cache_size, ttl=cache_ttl)
+        self.store = store
+        self.faq_index = BM25Index()
+        self.faq_min_score = faq_min_score
+        self.event_index = BM25Index()
+        # (relation, subject) -> [value atoms], and relation -> [(subject atom, value atom)]
+        self._facts: Dict[Tuple[str, str], List[Any]] = {}
+        self._relations: Dict[str, List[Tuple[Any, Any]]] = {}
+        # every store row up to store_mark is in the space; _own_rows are this instance's appends above it
+        self.store_mark = 0
+        self._own_rows: set = set()
+        if snapshot is not None:
+            self.restore_snapshot(snapshot)
+        elif indexed:
+            self.rebuild_index()
+        else:
+            self._build_search_indexes()
+        if store is not None:
+            self.replay_store(after=snapshot["store_mark"] if snapshot is not None else 0)
+
+    # ================================================================
+    # FACT INDEX: one traversal of the space, O(1) lookups afterwards
+    # ================================================================
+    @staticmethod
+    def _atom_value(atom) -> Any:
+        """Python value of a ValueAtom, or the printed form of any other atom."""
+        if hasattr(atom, 'get_object') and atom.get_object() is not None:
+            return atom.get_object().value
+        return str(atom)
+
+    @staticmethod
+    def _subject_key(subject: Any) -> str:
+        return str(subject).strip().strip('"')
+
+    def _index_fact(self, relation_atom, subject_atom, value_atom):
+        relation = str(relation_atom)
+        key = (relation, self._subject_key(subject_atom))
+        self._facts.setdefault(key, []).append(value_atom)
+        self._relations.setdefault(relation, []).append((subject_atom, value_atom))
+
+    def rebuild_index(self):
+        """(Re)build the fact index from every (relation subject value) triple in the space."""
+        self._facts = {}
+        self._relations = {}
+        self.cache.clear()
+        results = self.metta.run('!(match &self ($relation $subject $value) ($relation $subject $value))')
+        for result in results or []:
+            for expr in result:
+                if not hasattr(expr, 'get_children'):
+                    continue
+                children = expr.get_children()
+                if len(children) == 3:
+                    self._index_fact(*children)
+        self._build_search_indexes()
+
+    def restore_snapshot(self, snapshot: Dict[str, Any]):
+        """
+        Load a snapshot body (see snapshot.read_snapshot) into the space: facts are bulk-added and indexed as
+        they go in, without a match traversal, and the FAQ/event search indexes are taken as saved.
+        """
+        self.cache.clear()
+        ingest_facts(self.metta, snapshot["facts"], on_atom=self._index_fact if self.indexed else None)
+        space = self.metta.space()
+        for text in snapshot["atoms"]:
+            space.add_atom(self.metta.parse_single(text))
+        self.faq_index = snapshot["faq_index"]
+        self.event_index = snapshot["event_index"]
+
+    def _build_search_indexes(self):
+        self.faq_index = BM25Index()
+        for key, answer in self.relation_facts("faq"):
+            self._index_faq(key, answer)
+        self.event_index = BM25Index()
+        for event_key, _ in self.relation_facts("event"):
+            self._index_event(event_key)
+
+    def _index_event(self, event_key: str):
+        texts = [event_key.replace("_", " ")]
+        for relation in self.EVENT_SEARCH_RELATIONS:
+            texts += [str(value) for value in self.query(relation, event_key)]
+        self.event_index.add(event_key, " ".join(texts), payload=event_key)
+
+    def _index_faq(self, key: str, answer: Any):
+        # first answer wins, as in the exact lookup; the key is repeated to weigh it above the answer text
+        if key not in self.faq_index:
+            words = key.replace("_", " ")
+            self.faq_index.add(key, f"{words} {words} {answer}", payload=answer)
+
+    def _lookup(self, relation: str, subject: str) -> List[Any]:
+        return self._facts.get((relation, self._subject_key(subject)), [])
+
+    def relation_facts(self, relation: str) -> List[Tuple[str, Any]]:
+        """Every (subject, value) pair stored under `relation`."""
+        if self.indexed:
+            return [(self._subject_key(subject), self._atom_value(value))
+                    for subject, value in self._relations.get(relation, [])]
+
+        results = self.metta.run(f'!(match &self ({relation} $subject $value) ($subject $value))')
+        facts = []
+        for result in results or []:
+            for expr in result:
+                if hasattr(expr, 'get_children') and len(expr.get_children()) == 2:
+                    subject, value = expr.get_children()
+                    facts.append((self._subject_key(subject), self._atom_value(value)))
+        return facts
+
+    def _cached(self, key: Tuple[str, str, Optional[str]], compute: Callable[[], Any]) -> Any:
+        value = self.cache.get(key)
+        if value is _MISS:
+            value = compute()
+            self.cache.put(key, value)
+        return list(value) if isinstance(value, list) else value
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters of the query cache."""
+        return self.cache.stats()
 
     # ================================================================
     # CORE: Robust Generic Query
@@ -28,53 +225,68 @@ class EventRAG:
         query = f'!(match &self ({relation} {subject} {var_name}) {var_name})'
         results = self.metta.run(query)
 
-        if results:
-            extracted = []
-            for r in results:
-                if not r:  # Skip empty inner lists
-                    continue
-                atom = r[0]
-                if hasattr(atom, 'get_object') and atom.get_object() is not None:
-                    extracted.append(atom.get_object().value)
-                else:
-                    extracted.append(str(atom))
+        # metta.run returns one list of matches per `!` expression; every match is a value, as in the index
+        extracted = [self._atom_value(atom) for r in results or [] for atom in r]
+        if extracted:
             return extracted
 
         # Try QUOTED STRING
         query = f'!(match &self ({relation} "{subject}" {var_name}) {var_name})'
         results = self.metta.run(query)
 
-        if results:
-            extracted = []
-            for r in results:
-                if not r:
-                    continue
-                atom = r[0]
-                if hasattr(atom, 'get_object') and atom.get_object() is not None:
-                    extracted.append(atom.get_object().value)
-                else:
-                    extracted.append(str(atom))
-            return extracted
-
-        return []
+        return [self._atom_value(atom) for r in results or [] for atom in r]
 
     def query(self, relation: str, subject: str) -> List[str]:
         """Query value atoms (strings, numbers)."""
+        return self._cached(("value", relation, self._subject_key(subject)),
+                            lambda: self._query_values(relation, subject))
+
+    def _query_values(self, relation: str, subject: str) -> List[str]:
+        if self.indexed:
+            return [self._atom_value(atom) for atom in self._lookup(relation, subject)]
         return self._query_generic(relation, subject, "$value")
 
+    def query_first(self, relation: str, subject: str, default: Any = None) -> Any:
+        """First value for (relation, subject), or `default` when there is none."""
+        values = self.query(relation, subject)
+        return values[0] if values else default
+
     def query_symbol(self, relation: str, subject: str) -> List[str]:
         """Query symbolic atoms (non-ValueAtom)."""
+        return self._cached(("symbol", relation, self._subject_key(subject)),
+                            lambda: self._query_symbols(relation, subject))
+
+    def _query_symbols(self, relation: str, subject: str) -> List[str]:
+        if self.indexed:
+            return [str(atom) for atom in self._lookup(relation, subject)]
         subject = subject.strip().strip('"')
         query = f'!(match &self ({relation} {subject} $sym) $sym)'
         results = self.metta.run(query)
-        return [str(r[0]) for r in results] if results else []
+        return [str(atom) for r in results or [] for atom in r]
 
     # ================================================================
     # FAQ: Robust Symbol-First
     # ================================================================
     def query_faq(self, question: str) -> Optional[str]:
-        """Get FAQ answer — supports symbol keys."""
+        """Get FAQ answer — exact key first (symbol or quoted), then the best BM25 match above faq_min_score."""
         question = question.strip().strip('"')
+        return self._cached(("faq", "faq", question),
+                            lambda: self._query_faq(question) or self._best_faq(question))
+
+    def search_faq(self, question: str, k: int = 5) -> List[Tuple[str, Any, float]]:
+        """Top-k (key, answer, score) FAQ entries ranked by BM25 over keys and answers."""
+        return self.faq_index.search(question, k)
+
+    def _best_faq(self, question: str) -> Optional[str]:
+        matches = self.search_faq(question, k=1)
+        if matches and matches[0][2] >= self.faq_min_score:
+            return matches[0][1]
+        return None
+
+    def _query_faq(self, question: str) -> Optional[str]:
+        if self.indexed:
+            answers = self._lookup("faq", question)
+            return self._atom_value(answers[0]) if answers else None
 
         # 1. Symbol
         results = self.metta.run(f'!(match &self (faq {question} $answer) $answer)')
@@ -95,15 +307,13 @@ class EventRAG:
     # ================================================================
     def get_event_summary(self, event_key: str) -> Dict[str, Any]:
         """Full event overview."""
-        fullname = self.query("event_fullname", event_key)
-        name = self.query("event", event_key)
         return {
-            "name": fullname[0] if fullname else (name[0] if name else event_key),
-            "organizer": self.query("organiser", event_key)[0] if self.query("organiser", event_key) else None,
-            "dates": self.query("date_range", event_key)[0] if self.query("date_range", event_key) else None,
-            "venue": self.query("venue", event_key)[0] if self.query("venue", event_key) else None,
-            "city": self.query("venue_city", event_key)[0] if self.query("venue_city", event_key) else None,
-            "country": self.query("venue_country", event_key)[0] if self.query("venue_country", event_key) else None,
+            "name": self.query_first("event_fullname", event_key) or self.query_first("event", event_key, event_key),
+            "organizer": self.query_first("organiser", event_key),
+            "dates": self.query_first("date_range", event_key),
+            "venue": self.query_first("venue", event_key),
+            "city": self.query_first("venue_city", event_key),
+            "country": self.query_first("venue_country", event_key),
             "description": (
                 self.query("event_description", event_key) or
                 self.query("short_desc", event_key) or
@@ -113,14 +323,10 @@ class EventRAG:
 
     def get_ticket_info(self, event_key: str) -> Dict[str, Any]:
         """All ticketing details — safe and efficient."""
-        tiers = self.get_ticket_tiers(event_key)
-        payment = self.query("ticket_payment_methods", event_key)
-        note = self.query("ticket_note", event_key)
-
         return {
-            "tiers": tiers,
-            "payment": payment[0] if payment else None,
-            "note": note[0] if note else None,
+            "tiers": self.get_ticket_tiers(event_key),
+            "payment": self.query_first("ticket_payment_methods", event_key),
+            "note": self.query_first("ticket_note", event_key),
         }
 
     def get_ticket_tiers(self, event_key: str) -> List[str]:
@@ -128,6 +334,12 @@ class EventRAG:
 
     def get_side_events(self) -> List[Tuple[str, str]]:
         """Return ALL side events safely — handles ExpressionAtoms"""
+        return self._cached(("relation", "side_event", None), self._side_events)
+
+    def _side_events(self) -> List[Tuple[str, str]]:
+        if self.indexed:
+            return [(str(name), str(desc)) for name, desc in self._relations.get("side_event", [])]
+
         results = self.metta.run('!(match &self (side_event $name $desc) ($name $desc))')
         events = []
 
@@ -152,14 +364,20 @@ class EventRAG:
 
     def get_programs(self) -> List[Tuple[str, str]]:
         """All programs: Destino, Frens, etc."""
+        return self._cached(("relation", "program", None), self._programs)
+
+    def _programs(self) -> List[Tuple[str, str]]:
+        if self.indexed:
+            return [(str(key), self._atom_value(value)) for key, value in self._relations.get("program", [])]
+
         results = self.metta.run('!(match &self (program $key $value) ($key $value))')
-        return [
-            (
-                str(r[0]),
-                r[1].get_object().value if hasattr(r[1], 'get_object') and r[1].get_object() is not None else str(r[1])
-            )
-            for r in results
-        ] if results else []
+        programs = []
+        for result in results or []:
+            for expr in result:
+                if hasattr(expr, 'get_children') and len(expr.get_children()) == 2:
+                    key, value = expr.get_children()
+                    programs.append((str(key), self._atom_value(value)))
+        return programs
 
     def get_pre_events(self, event_key: str) -> List[str]:
         return self.query("pre_event", event_key)
@@ -169,16 +387,16 @@ class EventRAG:
         return {
             "transport_apps": self.query_symbol("transport_app", event_key),
             "neighborhoods": self.get_neighborhoods(event_key),
-            "crypto_shops": self.query("crypto_in_local_shops", event_key)[0] if self.query("crypto_in_local_shops", event_key) else None,
-            "crypto_map": self.query("crypto_merchant_map", event_key)[0] if self.query("crypto_merchant_map", event_key) else None,
+            "crypto_shops": self.query_first("crypto_in_local_shops", event_key),
+            "crypto_map": self.query_first("crypto_merchant_map", event_key),
             "emergency": {
-                "police": self.query("emergency_number_police", event_key)[0] if self.query("emergency_number_police", event_key) else None,
-                "ambulance": self.query("emergency_number_ambulance", event_key)[0] if self.query("emergency_number_ambulance", event_key) else None,
-                "fire": self.query("emergency_number_fire", event_key)[0] if self.query("emergency_number_fire", event_key) else None,
+                "police": self.query_first("emergency_number_police", event_key),
+                "ambulance": self.query_first("emergency_number_ambulance", event_key),
+                "fire": self.query_first("emergency_number_fire", event_key),
             },
             "safety_tips": self.query("safety_tip", event_key),
-            "timezone": self.query("timezone", event_key)[0] if self.query("timezone", event_key) else None,
-            "currency": self.query("currency", event_key)[0] if self.query("currency", event_key) else None,
+            "timezone": self.query_first("timezone", event_key),
+            "currency": self.query_first("currency", event_key),
         }
 
     def get_neighborhoods(self, event_key: str) -> List[str]:
@@ -200,20 +418,83 @@ class EventRAG:
     # DYNAMIC KNOWLEDGE
     # ================================================================
     def add_knowledge(self, relation_type: str, subject: str, object_value: Any) -> str:
-        """Add new fact dynamically."""
+        """Add new fact dynamically (and persist it when a store is attached)."""
+        self._add_fact(relation_type, subject, object_value)
+        if self.store is not None:
+            row_id = self.store.append(relation_type, subject, object_value)
+            if row_id == self.store_mark + 1:
+                self.store_mark = row_id
+            else:  # another writer's rows lie in between; sync_store applies them and moves the mark past this
+                self._own_rows.add(row_id)
+        return f"Added {relation_type}: {subject} → {object_value}"
+
+    def _add_fact(self, relation_type: str, subject: str, object_value: Any):
         obj = ValueAtom(object_value) if isinstance(object_value, str) else object_value
         self.metta.space().add_atom(E(S(relation_type), S(subject), obj))
-        return f"Added {relation_type}: {subject} → {object_value}"
+        if self.indexed:
+            self._index_fact(S(relation_type), S(subject), obj)
+        self.cache.invalidate(relation_type, self._subject_key(subject))
+        if relation_type == "faq":
+            self._index_faq(self._subject_key(subject), self._atom_value(obj))
+            self.cache.invalidate_kind("faq")
+        if relation_type == "event" or (relation_type in self.EVENT_SEARCH_RELATIONS
+                                        and self._subject_key(subject) in self.event_index):
+            self._index_event(self._subject_key(subject))
+
+    def remove_knowledge(self, relation_type: str, subject: str) -> int:
+        """Remove every (relation_type subject _) fact from the space, index, cache and store."""
+        subject = self._subject_key(subject)
+        results = self.metta.run(f'!(match &self ({relation_type} {subject} $value) $value)')
+        removed = 0
+        for result in results or []:
+            for value in result:
+                if self.metta.space().remove_atom(E(S(relation_type), S(subject), value)) is not False:
+                    removed += 1
+
+        if self.indexed:
+            self._facts.pop((relation_type, subject), None)
+            self._relations[relation_type] = [
+                (subj, value) for subj, value in self._relations.get(relation_type, [])
+                if self._subject_key(subj) != subject
+            ]
+        self.cache.invalidate(relation_type, subject)
+        if relation_type == "faq":
+            self.faq_index.remove(subject)
+            self.cache.invalidate_kind("faq")
+        if relation_type == "event":
+            self.event_index.remove(subject)
+        elif relation_type in self.EVENT_SEARCH_RELATIONS and subject in self.event_index:
+            self._index_event(subject)
+        if self.store is not None:
+            self.store.delete(relation_type, subject)
+        return removed
+
+    def replay_store(self, after: int = 0) -> int:
+        """Load the attached store's facts (rows after `after`) into the space in one pass. Returns the count."""
+        count = 0
+        for row_id, relation, subject, kind, value in self.store.replay(after):
+            if row_id in self._own_rows:
+                self._own_rows.discard(row_id)  # added by add_knowledge already
+            else:
+                self._add_fact(relation, subject, value if kind == KnowledgeStore.VALUE else S(value))
+                count += 1
+            self.store_mark = row_id
+        return count
+
+    def sync_store(self) -> int:
+        """Apply rows other writers appended to the shared store since store_mark. Returns the count."""
+        return self.replay_store(after=self.store_mark) if self.store is not None else 0
 
     # ================================================================
     # UTILITY
     # ================================================================
-    def search_events(self, keyword: str) -> List[str]:
-        """Fuzzy search across event names, venues, descriptions."""
-        keyword = keyword.lower()
-        results = []
-        for event in ["devconnect_arg", "breakpoint"]:
-            summary = self.get_event_summary(event)
-            if any(keyword in str(v).lower() for v in summary.values() if v):
-                results.append(event)
-        return results
\ No newline at end of file
+    def search_events(self, keyword: str, ranked: bool = False, limit: Optional[int] = None) -> List[str]:
+        """
+        Find event keys by name, organiser, dates, venue, city, country or description.
+        By default returns every event with a word starting with each keyword term. With ranked=True,
+        events matching any term are returned best first by BM25 (partial matches included).
+        """
+        if ranked:
+            return [event for event, _, _ in self.event_index.search(keyword, k=limit or len(self.event_index))]
+        matches = self.event_index.match_all(keyword, prefix=True)
+        return matches[:limit] if limit else matches
\ No newline at end of file
@@ -0,0 +1,143 @@
+# faq_index.py
+
+"""
+faq_index.py implements BM25Index (class), a small incremental inverted index used by EventRAG to rank FAQ
+entries against free-text questions and to find events by name, venue, city or description. Documents are
+added and removed one at a time, so the index can be built once from the `faq` atoms and then kept current by
+add_knowledge. Term statistics (postings, document lengths) are maintained on every write and IDF is computed
+at query time. Searches score the rarest query terms first and stop admitting new candidates once the
+remaining terms can no longer lift an unseen entry into the top k, so common terms only rescore the few
+candidates already found.
+"""
+
+import bisect
+import heapq
+import math
+import re
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_STOPWORDS = {
+    "a", "an", "and", "are", "at", "be", "by", "can", "do", "does", "for", "from", "how", "i", "in", "is", "it",
+    "me", "my", "of", "on", "or", "the", "there", "this", "to", "what", "when", "where", "which", "who", "with",
+}
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-case content-word tokens with a naive plural strip; underscores split words ("ticket_prices")."""
+    words = _WORD_RE.findall(str(text).lower())
+    return [w[:-1] if len(w) > 3 and w.endswith("s") and not w.endswith("ss") else w
+            for w in words if w not in _STOPWORDS]
+
+
+class BM25Index:
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[str, int]] = {}  # term -> {doc_id: term frequency}
+        self._lengths: Dict[str, int] = {}
+        self._terms: Dict[str, Tuple[str, ...]] = {}
+        self._payloads: Dict[str, Any] = {}
+        self._total_length = 0
+        # bounds for pruning; only ever loosened by removals, so they stay valid without rescans
+        self._max_tf: Dict[str, int] = {}
+        self._min_length = 0
+        self._sorted_terms: Optional[List[str]] = None  # vocabulary for prefix matching, rebuilt after writes
+        self._positions: Dict[str, int] = {}  # insertion order, to list matches in a stable order
+        self._next_position = 0
+
+    def add(self, doc_id: str, text: str, payload: Any = None):
+        """Index `text` under `doc_id`, replacing any previous version of the document."""
+        self.remove(doc_id)
+        self._sorted_terms = None
+        tokens = tokenize(text)
+        counts: Dict[str, int] = {}
+        for token in tokens:
+            counts[token] = counts.get(token, 0) + 1
+        for term, tf in counts.items():
+            self._postings.setdefault(term, {})[doc_id] = tf
+            self._max_tf[term] = max(self._max_tf.get(term, 0), tf)
+        self._min_length = min(self._min_length, len(tokens)) if self._lengths else len(tokens)
+        self._terms[doc_id] = tuple(counts)
+        self._lengths[doc_id] = len(tokens)
+        self._payloads[doc_id] = payload
+        self._total_length += len(tokens)
+        self._positions[doc_id] = self._next_position
+        self._next_position += 1
+
+    def remove(self, doc_id: str):
+        if doc_id not in self._lengths:
+            return
+        self._sorted_terms = None
+        for term in self._terms.pop(doc_id):
+            docs = self._postings[term]
+            docs.pop(doc_id, None)
+            if not docs:
+                del self._postings[term]
+        self._total_length -= self._lengths.pop(doc_id)
+        self._payloads.pop(doc_id, None)
+        self._positions.pop(doc_id, None)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._lengths
+
+    def __len__(self) -> int:
+        return len(self._lengths)
+
+    def _docs_for(self, term: str, prefix: bool) -> Set[str]:
+        if not prefix:
+            return set(self._postings.get(term, ()))
+        if self._sorted_terms is None:
+            self._sorted_terms = sorted(self._postings)
+        docs: Set[str] = set()
+        i = bisect.bisect_left(self._sorted_terms, term)
+        while i < len(self._sorted_terms) and self._sorted_terms[i].startswith(term):
+            docs.update(self._postings[self._sorted_terms[i]])
+            i += 1
+        return docs
+
+    def match_all(self, query: str, prefix: bool = False) -> List[str]:
+        """Documents containing every query term (or, with prefix=True, a word starting with each term), in insertion order."""
+        result: Optional[Set[str]] = None
+        for term in sorted(set(tokenize(query)), key=lambda t: len(self._postings.get(t, ()))):
+            docs = self._docs_for(term, prefix)
+            result = docs if result is None else result & docs
+            if not result:
+                return []
+        return sorted(result or (), key=self._positions.__getitem__)
+
+    def search(self, query: str, k: int = 5) -> List[Tuple[str, Any, float]]:
+        """Top-k (doc_id, payload, score) by BM25, best first."""
+        n_docs = len(self._lengths)
+        if not n_docs:
+            return []
+        avg_length = self._total_length / n_docs
+        terms = sorted((t for t in set(tokenize(query)) if t in self._postings), key=lambda t: len(self._postings[t]))
+        idfs = [math.log(1 + (n_docs - len(self._postings[t]) + 0.5) / (len(self._postings[t]) + 0.5)) for t in terms]
+        # the most a term can add: its highest tf in the shortest document
+        shortest_norm = self.k1 * (1 - self.b + self.b * self._min_length / avg_length)
+        bounds = [idf * self._max_tf[t] * (self.k1 + 1) / (self._max_tf[t] + shortest_norm)
+                  for t, idf in zip(terms, idfs)]
+        remaining = sum(bounds)
+
+        # norm(doc) = k1 * (1 - b + b * length / avg_length), hoisted out of the posting loop
+        base, per_token = self.k1 * (1 - self.b), self.k1 * self.b / avg_length
+        lengths = self._lengths
+        scores: Dict[str, float] = {}
+        admitting = True
+        for term, idf, bound in zip(terms, idfs, bounds):
+            docs = self._postings[term]
+            remaining -= bound
+            if admitting:
+                targets = docs.items()
+            else:
+                targets = [(doc_id, docs[doc_id]) for doc_id in scores if doc_id in docs]
+            weight = idf * (self.k1 + 1)
+            for doc_id, tf in targets:
+                scores[doc_id] = scores.get(doc_id, 0.0) + weight * tf / (tf + base + per_token * lengths[doc_id])
+            if admitting and len(scores) >= k:
+                kth = heapq.nlargest(k, scores.values())[-1]
+                # an entry not seen yet can score at most `remaining`: it can't make the top k any more
+                admitting = kth < remaining
+        best = heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+        return [(doc_id, self._payloads[doc_id], score) for doc_id, score in best]
@@ -0,0 +1,90 @@
+# knowledge_store.py
+
+"""
+knowledge_store.py implements KnowledgeStore (class), an append-only SQLite log of the facts EventRAG learns
+at runtime through add_knowledge. Every write is appended as one (relation, subject, value) row, so learned
+answers survive agent restarts. At startup the whole log is read back in one ordered scan and replayed into
+the MeTTa space in bulk. Duplicate rows are compacted away periodically, which keeps replay time proportional
+to the number of distinct facts rather than to the number of writes ever made. Facts EventRAG forgets (for
+example learned answers evicted from the semantic cache) are deleted so they are not replayed.
+"""
+
+import hashlib
+import sqlite3
+from typing import Any, Iterator, Tuple
+
+
+class KnowledgeStore:
+    # value kinds: ValueAtom strings vs. symbols (stored by name)
+    VALUE = "value"
+    SYMBOL = "symbol"
+
+    def __init__(self, path: str = "learned_knowledge.db", compact_every: int = 1000):
+        self.path = path
+        self.compact_every = compact_every
+        self._appends_since_compact = 0
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS facts ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " relation TEXT NOT NULL,"
+            " subject TEXT NOT NULL,"
+            " kind TEXT NOT NULL,"
+            " value TEXT NOT NULL)"
+        )
+        self.conn.commit()
+
+    def append(self, relation: str, subject: str, value: Any) -> int:
+        """Persist one fact; compacts the log every `compact_every` appends. Returns the row id."""
+        kind = self.VALUE if isinstance(value, str) else self.SYMBOL
+        row_id = self.conn.execute(
+            "INSERT INTO facts (relation, subject, kind, value) VALUES (?, ?, ?, ?)",
+            (relation, subject, kind, str(value)),
+        ).lastrowid
+        self.conn.commit()
+        self._appends_since_compact += 1
+        if self.compact_every and self._appends_since_compact >= self.compact_every:
+            self.compact()
+        return row_id
+
+    def delete(self, relation: str, subject: str):
+        """Forget every stored fact for (relation, subject)."""
+        self.conn.execute("DELETE FROM facts WHERE relation = ? AND subject = ?", (relation, subject))
+        self.conn.commit()
+
+    def replay(self, after: int = 0) -> Iterator[Tuple[int, str, str, str, str]]:
+        """Every stored (id, relation, subject, kind, value) with a row id above `after`, in write order."""
+        return iter(self.conn.execute(
+            "SELECT id, relation, subject, kind, value FROM facts WHERE id > ? ORDER BY id", (after,)
+        ).fetchall())
+
+    def last_id(self) -> int:
+        """Row id of the newest fact (0 when empty), whoever wrote it."""
+        return self.conn.execute("SELECT COALESCE(MAX(id), 0) FROM facts").fetchone()[0]
+
+    def digest(self, upto: int) -> str:
+        """Hash of every row with id <= upto, to check that a snapshot's view of the log still holds."""
+        h = hashlib.sha256()
+        for row in self.conn.execute("SELECT id, relation, subject, kind, value FROM facts WHERE id <= ? ORDER BY id", (upto,)):
+            h.update(repr(row).encode())
+        return h.hexdigest()
+
+    def compact(self) -> int:
+        """Drop repeated facts, keeping the first write of each. Returns the number of rows removed."""
+        removed = self.conn.execute(
+            "DELETE FROM facts WHERE id NOT IN"
+            " (SELECT MIN(id) FROM facts GROUP BY relation, subject, kind, value)"
+        ).rowcount
+        self.conn.commit()
+        if removed:
+            self.conn.execute("VACUUM")
+        self._appends_since_compact = 0
+        return removed
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM facts").fetchone()[0]
+
+    def close(self):
+        self.conn.close()
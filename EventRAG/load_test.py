@@ -0,0 +1,197 @@
+# load_test.py
+"""
+load_test.py compares chat throughput of the blocking and non-blocking EventRAG pipelines.
+It starts a local OpenAI-compatible stub server that answers every chat completion after a fixed
+delay (standing in for the ASI:One round trip), then pushes the same batch of queries through
+process_query with the sync LLM — one at a time, as the agent's event loop did when blocked — and
+through process_query_async with AsyncLLM, all in flight at once. It then compares per-query
+p50/p95 latency across every intent with the templated renderer off and on. Last, with a stub that
+generates its answer token by token, it times a humanized answer sent whole vs. streamed: time until
+the user sees the first text, and until the answer is complete.
+
+Run from the repository root:  python -m EventRAG.load_test [queries] [latency_ms]
+"""
+
+import asyncio
+import json
+import re
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from hyperon import MeTTa
+
+from .event_rag import EventRAG
+from .knowledge import initialize_knowledge_graph
+from .benchmark import INTENT_QUERIES
+from .utils import LLM, AsyncLLM, IntentClassifier, TEMPLATED_INTENTS, process_query, process_query_async
+
+STUB_INTENTS = {query: (intent, keyword) for intent, keyword, query in INTENT_QUERIES}
+_QUERY_LINE = re.compile(r'Query: "(.*)"')
+
+
+HUMANIZED = "Selected Question: When is Devconnect?\nHumanized Answer: 2025-11-17 to 2025-11-22"
+LONG_HUMANIZED = ("Selected Question: How do I get around at Devconnect?\nHumanized Answer: "
+                  + "Uber and Cabify work well, and the Subte covers the centre; Palermo is close to La Rural. " * 6)
+
+
+def make_stub_handler(latency: float, answer: str = HUMANIZED, token_latency: float = 0.0):
+    """latency: time to the first token; token_latency: time per further word-sized token."""
+    class StubCompletions(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, so the pooled client can reuse connections
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            prompt = body["messages"][-1]["content"]
+            if "Classify intent" in prompt:
+                match = _QUERY_LINE.search(prompt)
+                intent, keyword = STUB_INTENTS.get(match.group(1) if match else "", ("dates", "devconnect"))
+                content = json.dumps({"intent": intent, "keyword": keyword})
+            else:
+                content = answer
+            tokens = re.findall(r"\S*\s*", content)[:-1]
+            time.sleep(latency)
+            if body.get("stream"):
+                self.stream(body, tokens)
+                return
+            time.sleep(token_latency * (len(tokens) - 1))
+
+            payload = json.dumps({
+                "id": "stub",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": body.get("model", "asi1-mini"),
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": content}}],
+                "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+            }).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def stream(self, body, tokens):
+            # server-sent events over a chunked response, one chat.completion.chunk per token
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for i, token in enumerate(tokens + [None]):
+                if i:
+                    time.sleep(token_latency)
+                chunk = {"id": "stub", "object": "chat.completion.chunk", "created": int(time.time()),
+                         "model": body.get("model", "asi1-mini"),
+                         "choices": [{"index": 0, "delta": {"content": token} if token else {},
+                                      "finish_reason": None if token else "stop"}]}
+                self.write_chunk(f"data: {json.dumps(chunk)}\n\n".encode())
+            self.write_chunk(b"data: [DONE]\n\n")
+            self.wfile.write(b"0\r\n\r\n")
+
+        def write_chunk(self, data: bytes):
+            self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+            self.wfile.flush()
+
+        def log_message(self, *args):
+            pass
+
+    return StubCompletions
+
+
+def start_stub_server(latency: float, answer: str = HUMANIZED, token_latency: float = 0.0) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_stub_handler(latency, answer, token_latency))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run_sync(queries: list, rag: EventRAG, base_url: str) -> float:
+    llm = LLM(api_key="stub", base_url=base_url)
+    start = time.perf_counter()
+    for q in queries:
+        process_query(q, rag, llm, templated_intents=())
+    return time.perf_counter() - start
+
+
+async def run_async(queries: list, rag: EventRAG, base_url: str) -> float:
+    llm = AsyncLLM(api_key="stub", base_url=base_url)
+    start = time.perf_counter()
+    await asyncio.gather(*(process_query_async(q, rag, llm, templated_intents=()) for q in queries))
+    elapsed = time.perf_counter() - start
+    await llm.aclose()
+    return elapsed
+
+
+def measure_latency(rag: EventRAG, base_url: str, templated_intents, rounds: int = 5) -> dict:
+    llm = LLM(api_key="stub", base_url=base_url)
+    # only intents the local classifier resolves are templated
+    classifier = IntentClassifier.from_rag(rag)
+    samples = []
+    for _ in range(rounds):
+        for _, _, query in INTENT_QUERIES:
+            start = time.perf_counter()
+            process_query(query, rag, llm, classifier, templated_intents=templated_intents)
+            samples.append(time.perf_counter() - start)
+    cuts = statistics.quantiles(samples, n=100)
+    return {"p50": cuts[49] * 1000, "p95": cuts[94] * 1000}
+
+
+async def measure_streaming(rag: EventRAG, base_url: str, query: str) -> dict:
+    """Seconds until the user could see the first text and the whole answer, sent whole vs. streamed."""
+    llm = AsyncLLM(api_key="stub", base_url=base_url)
+    start = time.perf_counter()
+    await process_query_async(query, rag, llm)
+    whole = time.perf_counter() - start
+
+    first = []
+
+    async def on_delta(text):
+        if not first:
+            first.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await process_query_async(query, rag, llm, on_delta=on_delta)
+    streamed = time.perf_counter() - start
+    stats = llm.stream_stats()
+    await llm.aclose()
+    return {"whole": whole, "first": first[0], "streamed": streamed, "llm": stats}
+
+
+if __name__ == "__main__":
+    n_queries = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    latency = (int(sys.argv[2]) if len(sys.argv) > 2 else 200) / 1000
+
+    server = start_stub_server(latency)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+    metta = MeTTa()
+    initialize_knowledge_graph(metta)
+    rag = EventRAG(metta)
+    queries = ["When is Devconnect?"] * n_queries
+
+    sync_elapsed = run_sync(queries, rag, base_url)
+    async_elapsed = asyncio.run(run_async(queries, rag, base_url))
+    humanized = measure_latency(rag, base_url, templated_intents=())
+    templated = measure_latency(rag, base_url, templated_intents=TEMPLATED_INTENTS)
+    server.shutdown()
+
+    print(f"\n{n_queries} queries, 2 LLM round trips each, {latency * 1000:.0f} ms stub latency")
+    print(f"sync  LLM: {sync_elapsed:8.2f} s  {n_queries / sync_elapsed:8.1f} queries/s")
+    print(f"async LLM: {async_elapsed:8.2f} s  {n_queries / async_elapsed:8.1f} queries/s")
+    print(f"speed-up:  {sync_elapsed / async_elapsed:8.1f}x")
+
+    print(f"\nper-query latency over all intents, templated intents: {', '.join(sorted(TEMPLATED_INTENTS))}")
+    print(f"LLM humanize : p50 {humanized['p50']:8.1f} ms  p95 {humanized['p95']:8.1f} ms")
+    print(f"templated    : p50 {templated['p50']:8.1f} ms  p95 {templated['p95']:8.1f} ms")
+
+    token_latency = 0.02
+    server = start_stub_server(latency, LONG_HUMANIZED, token_latency)
+    timings = asyncio.run(measure_streaming(rag, f"http://127.0.0.1:{server.server_address[1]}/v1",
+                                            "How do I get around Buenos Aires?"))
+    server.shutdown()
+    print(f"\nhumanized answer, {latency * 1000:.0f} ms to first token + {token_latency * 1000:.0f} ms per token")
+    print(f"sent whole: first text after {timings['whole'] * 1000:8.1f} ms, complete after {timings['whole'] * 1000:8.1f} ms")
+    print(f"streamed  : first text after {timings['first'] * 1000:8.1f} ms, complete after {timings['streamed'] * 1000:8.1f} ms")
+    print(f"LLM stream stats: {timings['llm']}")
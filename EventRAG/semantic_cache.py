@@ -0,0 +1,159 @@
+# semantic_cache.py
+
+"""
+semantic_cache.py implements SemanticCache (class), a similarity lookup over the questions EventRAG has already
+learned answers for. Each question is embedded locally as a sparse hashed vector of its content words and their
+character trigrams, so "what is the dress code at breakpoint" and "Is there a dress code for Breakpoint?" land
+close together without any model or network call; "how much is/are" and "cost" count as "price". Entity words
+(event names, cities, countries; `entity_terms`) are down-weighted, since nearly every question names an event
+and that alone mustn't make two questions similar. Instead a match must name the same events (`event_terms`
+maps each entity word to the events it stands for), so a Breakpoint question never reuses a Devconnect answer,
+and the remaining content words must agree: one question's words must all appear in the other's, so "do I
+need a visa for breakpoint" never reuses the answer to "do I need a vaccine for breakpoint". Vectors
+live in an in-memory inverted index (hash bucket -> entries), so a lookup only scores entries sharing at least
+one feature. The cache is bounded: inserting past max_entries evicts the least recently used entries and hands
+their keys back so the caller can drop them from the `learned` relation.
+"""
+
+import math
+import re
+import zlib
+from collections import Counter, OrderedDict
+from typing import Collection, Dict, FrozenSet, List, Mapping, Optional, Tuple
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+# "how much are tickets" asks for the ticket price; rewritten before tokenizing
+_PRICE_RE = re.compile(r"\bhow much (?=(?:is|are|does|do|will|would)\b)|\bcosts?\b")
+_STOPWORDS = {
+    "a", "an", "and", "any", "are", "at", "be", "can", "do", "does", "for", "how", "i", "in", "is", "it",
+    "much", "my", "of", "on", "the", "there", "to", "what", "with", "you",
+}
+# weight of an entity word's features relative to other content words
+ENTITY_WEIGHT = 0.2
+
+
+def _words(text: str) -> List[str]:
+    """Lower-case content words with a naive plural strip."""
+    words = []
+    for word in _WORD_RE.findall(_PRICE_RE.sub("price ", text.lower())):
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        if word not in _STOPWORDS:
+            words.append(word)
+    return words
+
+
+def embed(text: str, dim: int = 1 << 12, ngram: int = 3,
+          entity_terms: Collection[str] = frozenset()) -> Dict[int, float]:
+    """
+    Unit-length sparse vector of hashed content words (weight 1) and their character n-grams (weight 0.5);
+    words in entity_terms count ENTITY_WEIGHT times as much.
+    """
+    features: Counter = Counter()
+    for word in _words(text):
+        scale = ENTITY_WEIGHT if word in entity_terms else 1.0
+        features[zlib.crc32(word.encode()) % dim] += scale
+        padded = f"<{word}>"
+        for i in range(len(padded) - ngram + 1):
+            features[zlib.crc32(padded[i:i + ngram].encode()) % dim] += 0.5 * scale
+    norm = math.sqrt(sum(w * w for w in features.values())) or 1.0
+    return {bucket: w / norm for bucket, w in features.items()}
+
+
+def _same_word(a: str, b: str) -> bool:
+    # "pay"/"payment" style inflections: a shared prefix of at least 4 letters
+    return a == b or (min(len(a), len(b)) >= 4 and (a.startswith(b) or b.startswith(a)))
+
+
+def _topic_matches(a: FrozenSet[str], b: FrozenSet[str]) -> bool:
+    """Whether every non-entity content word of one question appears in the other."""
+    smaller, larger = (a, b) if len(a) <= len(b) else (b, a)
+    return all(any(_same_word(word, other) for other in larger) for word in smaller)
+
+
+class SemanticCache:
+    def __init__(self, threshold: float = 0.85, max_entries: int = 5000, entity_terms: Collection[str] = (),
+                 event_terms: Optional[Mapping[str, Collection[str]]] = None):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.event_terms = {word: frozenset(events) for word, events in (event_terms or {}).items()}
+        self.entity_terms = frozenset(entity_terms) | frozenset(self.event_terms)
+        # key -> (vector, non-entity content words, events named, answer), in least- to most-recently-used order
+        self._entries: "OrderedDict[str, Tuple[Dict[int, float], FrozenSet[str], FrozenSet[str], str]]" = \
+            OrderedDict()
+        self._postings: Dict[int, set] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _topic(self, question: str) -> FrozenSet[str]:
+        return frozenset(word for word in _words(question) if word not in self.entity_terms)
+
+    def _events(self, question: str) -> FrozenSet[str]:
+        return frozenset(event for word in _words(question) for event in self.event_terms.get(word, ()))
+
+    def lookup(self, question: str) -> Optional[Tuple[str, str, float]]:
+        """Best (key, answer, score) at or above the threshold naming the same events with agreeing words, or None."""
+        vector = embed(question, entity_terms=self.entity_terms)
+        scores: Dict[str, float] = {}
+        for bucket, weight in vector.items():
+            for key in self._postings.get(bucket, ()):
+                scores[key] = scores.get(key, 0.0) + weight * self._entries[key][0][bucket]
+
+        topic, events = self._topic(question), self._events(question)
+        for key, score in sorted(scores.items(), key=lambda item: item[1], reverse=True):
+            if score < self.threshold:
+                break
+            _, entry_topic, entry_events, answer = self._entries[key]
+            if entry_events == events and _topic_matches(topic, entry_topic):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return key, answer, score
+        self.misses += 1
+        return None
+
+    def touch(self, key: str):
+        """Mark an entry as used after an exact-key hit, so LRU eviction spares it."""
+        if key in self._entries:
+            self._entries.move_to_end(key)
+
+    def add(self, key: str, question: str, answer: str) -> List[str]:
+        """Index a learned answer. Returns the keys evicted to stay within max_entries."""
+        self.remove(key)
+        vector = embed(question, entity_terms=self.entity_terms)
+        self._entries[key] = (vector, self._topic(question), self._events(question), answer)
+        for bucket in vector:
+            self._postings.setdefault(bucket, set()).add(key)
+
+        evicted = []
+        while len(self._entries) > self.max_entries:
+            oldest = next(iter(self._entries))
+            self.remove(oldest)
+            evicted.append(oldest)
+            self.evictions += 1
+        return evicted
+
+    def remove(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for bucket in entry[0]:
+            keys = self._postings.get(bucket)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._postings[bucket]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,68 @@
+# semantic_cache_eval.py
+"""
+semantic_cache_eval.py checks the learned-answer cache on labelled question pairs: for each pair the first
+question is learned, then the second is looked up. Paraphrases must reuse the learned answer; near misses
+(same question about another event or none, or the same event with a different question) must not, or one
+user gets another user's answer. Prints the score of every pair and exits non-zero on any wrong outcome.
+
+Run from the repository root:  python -m EventRAG.semantic_cache_eval
+"""
+
+import os
+import sys
+
+from hyperon import MeTTa
+
+from .event_rag import EventRAG
+from .knowledge import initialize_knowledge_graph
+from .semantic_cache import SemanticCache, embed
+from .utils import event_terms_from_rag
+
+# (learned question, new question)
+PARAPHRASES = [
+    ("what is the dress code at breakpoint", "Is there a dress code for Breakpoint?"),
+    ("can I bring my laptop to devconnect", "Can I bring a laptop to Devconnect?"),
+    ("is there free wifi at the devconnect argentina venue", "Is there free wifi at the Devconnect venue?"),
+    ("do I need a visa for breakpoint in abu dhabi", "do I need a visa for breakpoint"),
+    ("are breakpoint sessions recorded", "Will the sessions at breakpoint be recorded?"),
+    ("How much are breakpoint tickets", "breakpoint ticket price?"),
+]
+NEAR_MISSES = [
+    ("do I need a visa for breakpoint in abu dhabi", "do I need a vaccine for breakpoint in abu dhabi"),
+    ("is there free wifi at the devconnect argentina venue", "is there free parking at the devconnect argentina venue"),
+    ("Is breakpoint abu dhabi kid friendly", "Is breakpoint abu dhabi pet friendly"),
+    ("can I bring my laptop to devconnect", "can I bring my dog to devconnect"),
+    ("what time does devconnect open", "what time does devconnect close"),
+    # same question, another event (or none)
+    ("How much are devconnect tickets", "How much are breakpoint tickets"),
+    ("can I bring my laptop to breakpoint", "can I bring my laptop to devconnect"),
+    ("is there free wifi at the devconnect argentina venue", "is there free wifi at the breakpoint venue"),
+    ("is there wifi at devconnect", "is there wifi"),
+    ("is there wifi", "is there wifi at breakpoint"),
+]
+
+
+def score(cache_kwargs: dict, learned: str, question: str):
+    cache = SemanticCache(**cache_kwargs)
+    cache.add("learned", learned, "answer")
+    hit = cache.lookup(question)
+    a, b = embed(learned, entity_terms=cache.entity_terms), embed(question, entity_terms=cache.entity_terms)
+    return sum(w * b.get(k, 0.0) for k, w in a.items()), hit is not None
+
+
+if __name__ == "__main__":
+    metta = MeTTa()
+    initialize_knowledge_graph(metta)
+    kwargs = {"threshold": float(os.getenv("EVENTRAG_LEARNED_THRESHOLD", "0.85")),
+              "event_terms": event_terms_from_rag(EventRAG(metta))}
+
+    failures = 0
+    for label, pairs, should_hit in (("paraphrases", PARAPHRASES, True), ("near misses", NEAR_MISSES, False)):
+        print(f"\n{label} (should {'' if should_hit else 'not '}reuse the learned answer)")
+        for learned, question in pairs:
+            similarity, hit = score(kwargs, learned, question)
+            ok = hit == should_hit
+            failures += not ok
+            print(f"{'ok  ' if ok else 'FAIL'} {similarity:.3f} {'reused' if hit else 'missed'}  "
+                  f"{learned!r} -> {question!r}")
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,120 @@
+# snapshot.py
+
+"""
+snapshot.py implements a precompiled snapshot of the populated knowledge graph, so agents do not rebuild the MeTTa
+space from the data files on every boot. save_snapshot writes every atom in the space (event facts and learned
+atoms alike) together with EventRAG's FAQ and event search indexes to one pickle file. A small header carries
+the format version, a hash of the data files and a mark into the learned-knowledge log: the last row this
+EventRAG applied, after catching up with rows other writers appended, so no row past the mark is missing from
+the snapshot and none before it is skipped. load_knowledge only trusts a snapshot whose header still matches,
+bulk-loads it, and replays the log rows written after the mark.
+A missing, stale or unreadable snapshot falls back to the full build from data/ and is rewritten.
+
+Snapshots are pickles: only load files this agent wrote itself.
+"""
+
+import hashlib
+import os
+import pickle
+from typing import Any, Dict, List, Optional, Tuple
+
+from hyperon import MeTTa, GroundedAtom, SymbolAtom
+
+from .event_rag import EventRAG
+from .knowledge import initialize_knowledge_graph, knowledge_files
+from .knowledge_store import KnowledgeStore
+
+SNAPSHOT_VERSION = 2  # bump when the body layout or the pickled index classes (or their module paths) change
+_PLAIN_VALUES = (str, int, float, bool)
+
+
+def source_hash(files: List[str]) -> str:
+    """Hash of the knowledge files' names and contents."""
+    h = hashlib.sha256()
+    for path in files:
+        h.update(os.path.basename(path).encode())
+        with open(path, "rb") as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+
+def _store_digest(store: Optional[KnowledgeStore], mark: int) -> str:
+    return store.digest(mark) if store is not None else hashlib.sha256().hexdigest()
+
+
+def _encode_fact(atom) -> Optional[Tuple[str, str, Any]]:
+    """(relation, subject, value) in ingest_facts form, or None for atoms that aren't plain facts."""
+    children = atom.get_children() if hasattr(atom, "get_children") else ()
+    if len(children) != 3 or not all(isinstance(c, SymbolAtom) for c in children[:2]):
+        return None
+    relation, subject, value = children
+    if isinstance(value, SymbolAtom):
+        return str(relation), str(subject), {"symbol": str(value)}
+    if isinstance(value, GroundedAtom) and isinstance(value.get_object().value, _PLAIN_VALUES):
+        return str(relation), str(subject), value.get_object().value
+    return None
+
+
+def save_snapshot(rag: EventRAG, path: str, data_dir: Optional[str] = None) -> int:
+    """Write the space behind `rag` to `path` (atomically). Returns the number of atoms saved."""
+    rag.sync_store()
+    facts, atoms = [], []
+    for atom in rag.metta.space().get_atoms():
+        fact = _encode_fact(atom)
+        if fact is not None:
+            facts.append(fact)
+        else:
+            atoms.append(str(atom))
+    store_mark = rag.store_mark
+    header = {
+        "version": SNAPSHOT_VERSION,
+        "sources": source_hash(knowledge_files(data_dir)),
+        "store_mark": store_mark,
+        "store_digest": _store_digest(rag.store, store_mark),
+    }
+    body = {"facts": facts, "atoms": atoms, "faq_index": rag.faq_index, "event_index": rag.event_index}
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump(header, f, protocol=pickle.HIGHEST_PROTOCOL)
+        pickle.dump(body, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+    return len(facts) + len(atoms)
+
+
+def read_snapshot(path: str, sources: str, store: Optional[KnowledgeStore] = None) -> Optional[Dict[str, Any]]:
+    """The snapshot body if `path` holds a current snapshot for these sources and store, else None."""
+    try:
+        with open(path, "rb") as f:
+            header = pickle.load(f)
+            if header.get("version") != SNAPSHOT_VERSION or header.get("sources") != sources:
+                return None
+            mark = header["store_mark"]
+            # the log may have grown since, but the rows the snapshot already holds must be unchanged
+            if (store.last_id() if store is not None else 0) < mark \
+                    or _store_digest(store, mark) != header["store_digest"]:
+                return None
+            body = pickle.load(f)
+    except (OSError, EOFError, KeyError, AttributeError, pickle.UnpicklingError):
+        return None
+    body["store_mark"] = mark
+    return body
+
+
+def load_knowledge(metta: MeTTa, store: Optional[KnowledgeStore] = None, snapshot_path: Optional[str] = None,
+                   data_dir: Optional[str] = None, **rag_kwargs) -> EventRAG:
+    """
+    Populate an empty MeTTa space and return an EventRAG over it: from snapshot_path when it is current,
+    otherwise from the data files, writing a fresh snapshot afterwards.
+    """
+    snapshot = None
+    if snapshot_path:
+        snapshot = read_snapshot(snapshot_path, source_hash(knowledge_files(data_dir)), store)
+    if snapshot is not None:
+        return EventRAG(metta, store=store, snapshot=snapshot, **rag_kwargs)
+
+    initialize_knowledge_graph(metta, data_dir)
+    rag = EventRAG(metta, store=store, **rag_kwargs)
+    if snapshot_path:
+        save_snapshot(rag, snapshot_path, data_dir)
+    return rag
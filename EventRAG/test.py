@@ -1,13 +1,11 @@
 # Import components from separate files
-from event_rag import EventRAG
-from knowledge import initialize_knowledge_graph
-from utils import LLM, process_query, get_intent_and_keyword
+from .snapshot import load_knowledge
+from .utils import LLM, process_query, get_intent_and_keyword
 from hyperon import MeTTa, E, S, ValueAtom
 
 # Initialize global components
 metta = MeTTa()
-initialize_knowledge_graph(metta)
-rag = EventRAG(metta)
+rag = load_knowledge(metta, snapshot_path="knowledge.snapshot")
 llm = LLM("")
 
 query = "Can I bring my laptop?"
@@ -5,17 +5,30 @@ integrating MeTTa-based knowledge retrieval (via EventRAG) with ASI:One LLM for
 data formatting, and humanized response generation. It handles all event-related intents (dates, tickets, venue, logistics, side events, etc.),
 ensures strict adherence to knowledge base facts, bypasses LLM for long lists like side events to prevent truncation,
 and includes fallback learning for new FAQs. All responses are structured with 'Selected Question' and 'Humanized Answer'
-for consistent agent output.
+for consistent agent output. process_query_async traces its stages (classify, retrieve, summarize) and AsyncLLM
+credits ASI:One's token usage to the open span; both are no-ops unless TRACING=1.
 """
 
+import asyncio
 import json
-from openai import OpenAI
-from event_rag import EventRAG
+import math
+import re
+import time
+from collections import Counter
+from typing import Collection, Optional, Union
+
+import httpx
+from openai import OpenAI, AsyncOpenAI
+from tracing import record_tokens, tracer
+from .event_rag import EventRAG
+from .semantic_cache import SemanticCache
+
+ASI1_BASE_URL = "https://api.asi1.ai/v1"
 
 
 class LLM:
-    def __init__(self, api_key: str):
-        self.client = OpenAI(api_key=api_key, base_url="https://api.asi1.ai/v1")
+    def __init__(self, api_key: str, base_url: str = ASI1_BASE_URL):
+        self.client = OpenAI(api_key=api_key, base_url=base_url)
 
     def create_completion(self, prompt: str, max_tokens: int = 300) -> str:
         try:
@@ -31,8 +44,241 @@ class LLM:
             return "Sorry, I couldn't respond right now."
 
 
-def get_intent_and_keyword(query: str, llm: LLM) -> tuple[str, str]:
-    prompt = f"""
+class AsyncLLM:
+    """
+    Non-blocking ASI:One client for use inside the agent's event loop. One instance owns a pooled
+    keep-alive httpx client shared by all requests, a per-request timeout, and a semaphore that caps
+    how many completions are in flight at once. stream_completion streams a completion token by token.
+    """
+
+    def __init__(self, api_key: str, base_url: str = ASI1_BASE_URL, timeout: float = 30.0,
+                 max_concurrency: int = 16, max_connections: int = 32):
+        self._http = httpx.AsyncClient(
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+        )
+        self.client = AsyncOpenAI(api_key=api_key, base_url=base_url, http_client=self._http, timeout=timeout)
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._streams = 0
+        self._first_token_time = 0.0
+        self._stream_time = 0.0
+
+    async def create_completion(self, prompt: str, max_tokens: int = 300) -> str:
+        async with self._semaphore:
+            try:
+                completion = await self.client.chat.completions.create(
+                    messages=[{"role": "user", "content": prompt}],
+                    model="asi1-mini",
+                    max_tokens=max_tokens,
+                    temperature=0.3
+                )
+                if completion.usage:
+                    record_tokens(completion.usage.prompt_tokens, completion.usage.completion_tokens)
+                return completion.choices[0].message.content.strip()
+            except Exception as e:
+                print(f"LLM Error: {e}")
+                return "Sorry, I couldn't respond right now."
+
+    async def stream_completion(self, prompt: str, on_delta, max_tokens: int = 300) -> str:
+        """
+        Like create_completion, but streams: on_delta(text) is awaited for every delta as it arrives. Time to
+        first token and total time are recorded separately. A failure before the first delta returns the usual
+        apology; after it, the error is raised, since part of the answer has already been handed on.
+        """
+        async with self._semaphore:
+            start = time.perf_counter()
+            parts = []
+            try:
+                stream = await self.client.chat.completions.create(
+                    messages=[{"role": "user", "content": prompt}],
+                    model="asi1-mini",
+                    max_tokens=max_tokens,
+                    temperature=0.3,
+                    stream=True,
+                )
+                async for chunk in stream:
+                    if getattr(chunk, "usage", None):
+                        record_tokens(chunk.usage.prompt_tokens, chunk.usage.completion_tokens)
+                    text = chunk.choices[0].delta.content if chunk.choices else None
+                    if text:
+                        if not parts:
+                            self._first_token_time += time.perf_counter() - start
+                        parts.append(text)
+                        await on_delta(text)
+            except Exception as e:
+                print(f"LLM Error: {e}")
+                if parts:
+                    raise
+                return "Sorry, I couldn't respond right now."
+            self._streams += 1
+            self._stream_time += time.perf_counter() - start
+            if not parts:
+                self._first_token_time += time.perf_counter() - start
+            return "".join(parts).strip()
+
+    def stream_stats(self) -> dict:
+        """Completed streams with mean time to first token and mean total time (ms)."""
+        def mean_ms(total):
+            return total / self._streams * 1000 if self._streams else 0.0
+
+        return {"streams": self._streams, "first_token_ms": mean_ms(self._first_token_time),
+                "total_ms": mean_ms(self._stream_time)}
+
+    async def aclose(self):
+        await self.client.close()
+
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def _tokens(text: str) -> list[str]:
+    """Lower-case word tokens with a naive plural strip ("tickets" -> "ticket")."""
+    words = _TOKEN_RE.findall(str(text).lower())
+    return [w[:-1] if len(w) > 3 and w.endswith("s") and not w.endswith("ss") else w for w in words]
+
+
+class IntentClassifier:
+    """
+    Local fast path for get_intent_and_keyword. The event keyword is resolved from alias tokens
+    pulled out of the knowledge graph (names, venues, cities, countries). The intent needs a
+    relation-specific trigger word ("ticket", "venue"; question words like "when" or "how much" are
+    not enough), must also win a small TF-IDF model over each intent's relation names and values by
+    score and margin, and every other content word of the query must belong to that intent's
+    vocabulary, so "how much is a hotel near devconnect" isn't read as a ticket question. The one
+    narrow exception: "when" plus an event name and no other content word ("When is Devconnect?")
+    asks for the dates. classify() returns None whenever it is not confident, so the LLM decides.
+    """
+
+    # knowledge-graph relations whose names and values describe each intent
+    INTENT_RELATIONS = {
+        "dates": ("date_range",),
+        "venue": ("venue", "venue_address", "venue_city", "venue_country"),
+        "ticket": ("ticket_tier", "ticket_payment_methods", "ticket_note", "ticket_required"),
+        "logistics": ("transport_app", "tips_transport", "recommended_neighborhood", "crypto_in_local_shops",
+                      "emergency_number_police", "emergency_number_ambulance", "emergency_number_fire",
+                      "safety_tip", "timezone", "currency"),
+        "side_event": ("side_event",),
+        "speakers": ("speaker",),
+        "program": ("program", "destino_goal", "destino_offering", "destino_scholarship", "frens_eligibility"),
+    }
+    # relation-specific words; one of them must be in the query
+    INTENT_TRIGGERS = {
+        "dates": {"date", "schedule", "start"},
+        "venue": {"venue", "address"},
+        "ticket": {"ticket", "price", "admission", "payment"},
+        "logistics": {"transport", "uber", "taxi", "cab", "ride", "neighborhood", "neighbourhood",
+                      "emergency", "police", "safety", "safe", "around", "logistic"},
+        "side_event": {"side", "hackathon"},
+        "speakers": {"speaker", "speaking", "keynote"},
+        "program": {"destino", "fren", "scholarship", "program", "programme"},
+    }
+    # question, function and other generic words: they neither decide an intent nor make a query out of scope
+    FUNCTION_WORDS = {
+        "a", "an", "the", "is", "are", "was", "be", "do", "doe", "does", "did", "can", "could", "will", "would",
+        "should", "i", "me", "my", "we", "our", "you", "your", "it", "its", "s", "there", "any", "some", "what",
+        "when", "where", "who", "which", "how", "much", "many", "to", "for", "of", "in", "at", "on", "with", "from",
+        "and", "or", "this", "that", "about", "tell", "give", "get", "need", "want", "please", "2025",
+        "best", "good", "work", "join", "go",
+    }
+    EVENT_ALIAS_RELATIONS = ("event", "event_fullname", "venue", "venue_city", "venue_country")
+    EXTRA_EVENT_ALIASES = {"devconnect": {"devcon", "arg"}, "breakpoint": {"uae"}}
+    # intents whose branch in retrieve_data does not need an event keyword
+    KEYWORD_OPTIONAL = {"side_event", "program"}
+
+    def __init__(self, event_aliases: dict[str, set[str]], intent_docs: dict[str, list[str]],
+                 min_score: float = 0.1, min_margin: float = 0.05):
+        self.event_aliases = event_aliases
+        self.min_score = min_score
+        self.min_margin = min_margin
+        self.resolved = 0
+        self.deferred = 0
+
+        self.alias_tokens = set().union(*event_aliases.values()) if event_aliases else set()
+        docs = {intent: Counter(t for t in tokens if t not in self.alias_tokens)
+                for intent, tokens in intent_docs.items()}
+        df = Counter(t for counts in docs.values() for t in counts)
+        self.idf = {t: math.log((1 + len(docs)) / (1 + n)) + 1 for t, n in df.items()}
+        self.vectors = {intent: self._normalize({t: c * self.idf[t] for t, c in counts.items()})
+                        for intent, counts in docs.items()}
+
+    @classmethod
+    def from_rag(cls, rag: EventRAG, **kwargs) -> "IntentClassifier":
+        """Build alias and intent tables from the facts currently in the knowledge graph."""
+        aliases: dict[str, set[str]] = {}
+        for event, _ in rag.relation_facts("event"):
+            tokens = set(_tokens(event)) | cls.EXTRA_EVENT_ALIASES.get(event, set())
+            for relation in cls.EVENT_ALIAS_RELATIONS:
+                for value in rag.query(relation, event):
+                    tokens.update(t for t in _tokens(value) if len(t) > 2 and not t.isdigit())
+            aliases[event] = tokens
+        # a token shared by two events identifies neither
+        for event, tokens in aliases.items():
+            others = set().union(*(t for e, t in aliases.items() if e != event))
+            aliases[event] = tokens - others
+
+        intent_docs = {}
+        for intent, relations in cls.INTENT_RELATIONS.items():
+            tokens = list(cls.INTENT_TRIGGERS[intent])
+            for relation in relations:
+                tokens += _tokens(relation.replace("_", " "))
+                for _, value in rag.relation_facts(relation):
+                    tokens += _tokens(value)
+            intent_docs[intent] = tokens
+        return cls(aliases, intent_docs, **kwargs)
+
+    @staticmethod
+    def _normalize(vector: dict[str, float]) -> dict[str, float]:
+        norm = math.sqrt(sum(v * v for v in vector.values())) or 1.0
+        return {t: v / norm for t, v in vector.items()}
+
+    def _event(self, tokens: list[str]) -> Optional[str]:
+        found = {event for event, aliases in self.event_aliases.items() if aliases.intersection(tokens)}
+        return found.pop() if len(found) == 1 else None
+
+    def _content(self, tokens: list[str]) -> list[str]:
+        return [t for t in tokens if t not in self.FUNCTION_WORDS and t not in self.alias_tokens]
+
+    def _intent(self, tokens: list[str]) -> Optional[str]:
+        if "when" in tokens and not self._content(tokens):
+            return "dates"  # "when is devconnect": nothing but the event to ask the date of
+        triggered = [intent for intent, words in self.INTENT_TRIGGERS.items() if words.intersection(tokens)]
+        if len(triggered) != 1:
+            return None
+        intent = triggered[0]
+
+        content = self._content(tokens)
+        if any(t not in self.vectors[intent] for t in content):
+            return None  # a word the intent's facts can't answer: probably a different question
+
+        query_vec = self._normalize({t: c * self.idf[t] for t, c in Counter(content).items() if t in self.idf})
+        scores = sorted(
+            ((sum(w * vec.get(t, 0.0) for t, w in query_vec.items()), name) for name, vec in self.vectors.items()),
+            reverse=True,
+        )
+        best, runner_up = scores[0], scores[1] if len(scores) > 1 else (0.0, None)
+        if best[1] == intent and best[0] >= self.min_score and best[0] - runner_up[0] >= self.min_margin:
+            return intent
+        return None
+
+    def classify(self, query: str) -> Optional[tuple[str, str]]:
+        """(intent, keyword) when confident, otherwise None."""
+        tokens = _tokens(query)
+        intent = self._intent(tokens)
+        keyword = self._event(tokens)
+        if intent and (keyword or intent in self.KEYWORD_OPTIONAL):
+            self.resolved += 1
+            return intent, keyword or ""
+        self.deferred += 1
+        return None
+
+    def stats(self) -> dict:
+        total = self.resolved + self.deferred
+        return {"resolved": self.resolved, "deferred": self.deferred,
+                "coverage": self.resolved / total if total else 0.0}
+
+
+def _intent_prompt(query: str) -> str:
+    return f"""
         You are an expert for Devconnect (Buenos Aires) and Breakpoint (Abu Dhabi).
         
         Classify intent from: dates, venue, ticket, logistics, side_event, speakers, program, faq, unknown
@@ -46,7 +292,9 @@ def get_intent_and_keyword(query: str, llm: LLM) -> tuple[str, str]:
         Return ONLY JSON:
         {{"intent": "<intent>", "keyword": "<keyword>"}}
     """
-    response = llm.create_completion(prompt, max_tokens=100)
+
+
+def _parse_intent(response: str) -> tuple[str, str]:
     try:
         result = json.loads(response)
         return result.get("intent", "unknown"), result.get("keyword", "")
@@ -54,16 +302,88 @@ def get_intent_and_keyword(query: str, llm: LLM) -> tuple[str, str]:
         return "unknown", ""
 
 
+def _classify_locally(query: str, classifier: Optional[IntentClassifier]) -> Optional[tuple[str, str]]:
+    return classifier.classify(query) if classifier is not None else None
+
+
+def get_intent_and_keyword(query: str, llm: LLM, classifier: Optional[IntentClassifier] = None) -> tuple[str, str]:
+    local = _classify_locally(query, classifier)
+    if local:
+        return local
+    response = llm.create_completion(_intent_prompt(query), max_tokens=100)
+    return _parse_intent(response)
+
+
+async def get_intent_and_keyword_async(query: str, llm: AsyncLLM,
+                                       classifier: Optional[IntentClassifier] = None) -> tuple[str, str]:
+    local = _classify_locally(query, classifier)
+    if local:
+        return local
+    response = await llm.create_completion(_intent_prompt(query), max_tokens=100)
+    return _parse_intent(response)
+
+
+def _knowledge_prompt(query: str, keyword: str) -> str:
+    return f"Query: '{query}'\nAnswer in 1 short sentence about {keyword}. Be factual."
+
 
 def generate_knowledge_response(query: str, intent: str, keyword: str, llm: LLM) -> str:
-    prompt = f"Query: '{query}'\nAnswer in 1 short sentence about {keyword}. Be factual."
-    return llm.create_completion(prompt, max_tokens=80)
+    return llm.create_completion(_knowledge_prompt(query, keyword), max_tokens=80)
 
 
-def process_query(query: str, rag: EventRAG, llm: LLM) -> dict:
-    intent, keyword = get_intent_and_keyword(query, llm)
-    print(f"[Intent] {intent} | [Keyword] {keyword}")
+async def generate_knowledge_response_async(query: str, intent: str, keyword: str, llm: AsyncLLM) -> str:
+    return await llm.create_completion(_knowledge_prompt(query, keyword), max_tokens=80)
 
+
+def _learned_key(query: str) -> str:
+    safe_key = "".join(c for c in query.lower() if c.isalnum() or c in " _-")[:50]
+    return safe_key.strip().replace(" ", "_") or "unknown_query"
+
+
+def _learn(query: str, rag: EventRAG, new_answer: str, learned_cache: Optional[SemanticCache] = None) -> str:
+    safe_key = _learned_key(query)
+    rag.add_knowledge("learned", safe_key, new_answer)
+    print(f"[LEARNED] learned({safe_key}) → {new_answer}")
+    if learned_cache is not None:
+        for evicted in learned_cache.add(safe_key, query, new_answer):
+            rag.remove_knowledge("learned", evicted)
+            print(f"[EVICTED] learned({evicted})")
+    return new_answer
+
+
+def event_terms_from_rag(rag: EventRAG) -> dict[str, set[str]]:
+    """Words naming an event or where it is (event keys, names, venues, cities, countries) -> those events."""
+    terms: dict[str, set[str]] = {}
+    for event, _ in rag.relation_facts("event"):
+        words = set(_tokens(event.replace("_", " "))) | IntentClassifier.EXTRA_EVENT_ALIASES.get(event, set())
+        for relation in IntentClassifier.EVENT_ALIAS_RELATIONS:
+            for value in rag.query(relation, event):
+                words.update(t for t in _tokens(value) if len(t) > 2 and not t.isdigit())
+        for word in words:
+            terms.setdefault(word, set()).add(event)
+    return terms
+
+
+def learned_cache_from_rag(rag: EventRAG, **kwargs) -> SemanticCache:
+    """
+    SemanticCache seeded with every learned answer already in the graph (keys double as questions), with the
+    graph's event and place names as its event terms.
+    """
+    kwargs.setdefault("event_terms", event_terms_from_rag(rag))
+    cache = SemanticCache(**kwargs)
+    for safe_key, answer in rag.relation_facts("learned"):
+        for evicted in cache.add(safe_key, safe_key.replace("_", " "), answer):
+            rag.remove_knowledge("learned", evicted)
+    return cache
+
+
+def retrieve_data(query: str, intent: str, keyword: str, rag: EventRAG,
+                  learned_cache: Optional[SemanticCache] = None) -> Union[str, dict, None]:
+    """
+    Knowledge-graph stage of the pipeline. Returns the data string to humanize, a finished
+    answer dict for intents that bypass the LLM, or None when an unknown query has not been
+    learned yet and needs an LLM answer.
+    """
     data = ""
 
     # ————————————————————
@@ -77,10 +397,10 @@ def process_query(query: str, rag: EventRAG, llm: LLM) -> dict:
     # 2. VENUE
     # ————————————————————
     elif intent == "venue" and keyword:
-        venue = rag.query("venue", keyword)[0] if rag.query("venue", keyword) else "TBD"
-        city = rag.query("venue_city", keyword)[0] if rag.query("venue_city", keyword) else ""
-        country = rag.query("venue_country", keyword)[0] if rag.query("venue_country", keyword) else ""
-        address = rag.query("venue_address", keyword)[0] if rag.query("venue_address", keyword) else ""
+        venue = rag.query_first("venue", keyword, "TBD")
+        city = rag.query_first("venue_city", keyword, "")
+        country = rag.query_first("venue_country", keyword, "")
+        address = rag.query_first("venue_address", keyword, "")
         data = f"{venue}, {city}, {country}"
         if address:
             data += f" | Address: {address}"
@@ -91,11 +411,11 @@ def process_query(query: str, rag: EventRAG, llm: LLM) -> dict:
     elif intent == "ticket" and keyword:
         info = rag.get_ticket_info(keyword)
         tiers = info["tiers"]
-        payment = rag.query("ticket_payment_methods", keyword)
+        payment = info["payment"]
         note = info["note"]
 
         tier_str = " • ".join(tiers) if tiers else "Not announced"
-        payment_str = payment[0] if payment else "Not specified"
+        payment_str = payment or "Not specified"
         note_str = note or ""
 
         data = f"TICKETS: {tier_str}"
@@ -160,6 +480,11 @@ def process_query(query: str, rag: EventRAG, llm: LLM) -> dict:
     # ————————————————————
     elif intent == "faq":
         answer = rag.query_faq(keyword)
+        if not answer:
+            # the LLM's keyword missed; rank the FAQ against the user's own wording
+            matches = rag.search_faq(query, k=1)
+            if matches and matches[0][2] >= rag.faq_min_score:
+                answer = matches[0][1]
         if answer:
             data = answer
         else:
@@ -168,20 +493,22 @@ def process_query(query: str, rag: EventRAG, llm: LLM) -> dict:
     # This is where we add new data to the RAG
     elif intent == "unknown":
         # Generate safe key
-        safe_key = "".join(c for c in query.lower() if c.isalnum() or c in " _-")[:50]
-        safe_key = safe_key.strip().replace(" ", "_") or "unknown_query"
+        safe_key = _learned_key(query)
 
         # 1. CHECK IF ALREADY LEARNED
         existing = rag.query("learned", safe_key)
+        similar = learned_cache.lookup(query) if learned_cache is not None and not existing else None
         if existing:
             data = existing[0]
+            if learned_cache is not None:
+                learned_cache.touch(safe_key)
             print(f"[REUSED] learned({safe_key}) → {data}")
+        elif similar:
+            similar_key, data, score = similar
+            print(f"[REUSED] learned({similar_key}) ~ {score:.2f} → {data}")
         else:
-            # 2. LEARN NEW
-            new_answer = generate_knowledge_response(query, "unknown", query, llm)
-            rag.add_knowledge("learned", safe_key, new_answer)
-            data = new_answer
-            print(f"[LEARNED] learned({safe_key}) → {data}")
+            # 2. LEARN NEW (the caller asks the LLM, then calls _learn)
+            return None
 
     # ————————————————————
     # 9. FALLBACK
@@ -189,10 +516,11 @@ def process_query(query: str, rag: EventRAG, llm: LLM) -> dict:
     else:
         data = "Kindly ask more descriptive questions. About dates, tickets, venue, logistics, or programs for example."
 
-    # ————————————————————
-    # Final Prompt
-    # ————————————————————
-    final_prompt = f"""
+    return data
+
+
+def _final_prompt(query: str, data: str) -> str:
+    return f"""
         USE EXACTLY THIS DATA (DO NOT CHANGE ANYTHING):
         {data}
 
@@ -202,12 +530,113 @@ def process_query(query: str, rag: EventRAG, llm: LLM) -> dict:
         Selected Question: <1-line question>
         Humanized Answer: <exact data, no additions>
     """
-    response = llm.create_completion(final_prompt, max_tokens=300)
 
+
+# intents whose data is already final, answered without the humanize prompt when the local classifier
+# resolved them (an LLM-classified intent may be a guess) unless the caller overrides it
+TEMPLATED_INTENTS = frozenset({"dates", "venue", "ticket"})
+
+
+def render_answer(query: str, intent: str, keyword: str, data: str) -> Optional[dict]:
+    """Build the answer dict locally: the user's own question with the data, or None without an event."""
+    if not keyword and intent not in IntentClassifier.KEYWORD_OPTIONAL:
+        return None
+    return {"selected_question": query.strip(), "humanized_answer": data}
+
+
+class AnswerStream:
+    """
+    Rewrites a streamed "Selected Question: ...\nHumanized Answer: ..." completion into the agent's
+    "**question**\n\nanswer" layout as it arrives: the question line is held until the answer label
+    shows up, then everything after it is passed straight on to on_delta.
+    """
+
+    ANSWER_LABEL = "Humanized Answer:"
+
+    def __init__(self, on_delta):
+        self.on_delta = on_delta
+        self._head = ""
+        self._answering = False
+
+    async def write(self, delta: str):
+        if self._answering:
+            await self.on_delta(delta)
+            return
+        self._head += delta
+        if self.ANSWER_LABEL in self._head:
+            question, answer = self._head.split(self.ANSWER_LABEL, 1)
+            question = question.split(":", 1)[1] if ":" in question else question
+            self._answering = True
+            await self.on_delta(f"**{question.strip()}**\n\n{answer.lstrip()}")
+
+    async def close(self):
+        """Pass on a completion that never reached the answer label as it is."""
+        if not self._answering and self._head.strip():
+            await self.on_delta(self._head.strip())
+
+
+def _parse_final(response: str, query: str, data: str) -> dict:
     try:
         lines = [l.strip() for l in response.split("\n") if l.strip()]
         q = lines[0].split(":", 1)[1].strip() if len(lines) > 0 else query
         a = lines[1].split(":", 1)[1].strip() if len(lines) > 1 else data
         return {"selected_question": q, "humanized_answer": a}
     except:
-        return {"selected_question": query, "humanized_answer": data}
\ No newline at end of file
+        return {"selected_question": query, "humanized_answer": data}
+
+
+def process_query(query: str, rag: EventRAG, llm: LLM, classifier: Optional[IntentClassifier] = None,
+                  templated_intents: Collection[str] = TEMPLATED_INTENTS,
+                  learned_cache: Optional[SemanticCache] = None) -> dict:
+    local = _classify_locally(query, classifier)
+    intent, keyword = local or get_intent_and_keyword(query, llm)
+    print(f"[Intent] {intent} | [Keyword] {keyword}")
+
+    data = retrieve_data(query, intent, keyword, rag, learned_cache)
+    if isinstance(data, dict):
+        return data
+    if data is None:
+        data = _learn(query, rag, generate_knowledge_response(query, "unknown", query, llm), learned_cache)
+    elif local and intent in templated_intents:
+        rendered = render_answer(query, intent, keyword, data)
+        if rendered:
+            return rendered
+
+    response = llm.create_completion(_final_prompt(query, data), max_tokens=300)
+    return _parse_final(response, query, data)
+
+
+async def process_query_async(query: str, rag: EventRAG, llm: AsyncLLM,
+                              classifier: Optional[IntentClassifier] = None,
+                              templated_intents: Collection[str] = TEMPLATED_INTENTS,
+                              learned_cache: Optional[SemanticCache] = None, on_delta=None) -> dict:
+    """
+    Same pipeline as process_query, awaiting the LLM so other chats keep running meanwhile. With on_delta,
+    an answer that goes through the final LLM step is also streamed to it, formatted, as it is generated.
+    """
+    with tracer.span("classify", "intent"):
+        local = _classify_locally(query, classifier)
+        intent, keyword = local or await get_intent_and_keyword_async(query, llm)
+    print(f"[Intent] {intent} | [Keyword] {keyword}")
+
+    with tracer.span("retrieve", "metta"):
+        data = retrieve_data(query, intent, keyword, rag, learned_cache)
+    if isinstance(data, dict):
+        return data
+    if data is None:
+        with tracer.span("summarize", "knowledge"):
+            data = _learn(query, rag, await generate_knowledge_response_async(query, "unknown", query, llm),
+                          learned_cache)
+    elif local and intent in templated_intents:
+        rendered = render_answer(query, intent, keyword, data)
+        if rendered:
+            return rendered
+
+    with tracer.span("summarize", "humanize"):
+        if on_delta is None:
+            response = await llm.create_completion(_final_prompt(query, data), max_tokens=300)
+        else:
+            answer_stream = AnswerStream(on_delta)
+            response = await llm.stream_completion(_final_prompt(query, data), answer_stream.write, max_tokens=300)
+            await answer_stream.close()
+    return _parse_final(response, query, data)
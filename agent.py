@@ -1,17 +1,25 @@
 """
 This script defines the main event assistant agent that processes chat messages, classifies user
 prompts into categories (weather, flight, hotel, currency, or generic), and routes them to the
-correct handler. It uses the uAgents framework with a chat protocol for structured messaging,
-calling helper functions or external APIs to fetch data like weather forecasts, hotel listings,
-or exchange rates.
+correct handler. A message asking for several things at once is split into sub-tasks whose
+handlers run concurrently, and their answers go back as one merged reply. With STREAM_REPLIES=1,
+a single-part weather, flight or hotel answer is sent in progressive chunks as ASI:One generates
+it. It uses the uAgents framework with a chat protocol for structured messaging, calling helper
+functions or external APIs to fetch data like weather forecasts, hotel listings, or exchange rates.
 
-Generic event-related questions are forwarded to a connected EventRAG agent powered by Metta knowledge graphs.
+Generic event-related questions are forwarded to a connected EventRAG agent powered by Metta
+knowledge graphs, or, with EVENTRAG_EMBEDDED=1, answered in-process by the same pipeline (the
+remote agent stays the fallback).
 
-The agent maintains session context, logs activity, handles acknowledgements, and manages responses
-back to users, serving as the central coordinator for all user interactions.
+Questions forwarded to EventRAG are tracked by message id in a pending-request table, so each
+answer goes back to the user who asked it however many are in flight. The agent logs activity,
+handles acknowledgements, and manages responses back to users, serving as the central coordinator
+for all user interactions. With TRACING=1, every stage (classify, retrieve, fetch, summarize,
+send) is timed and its LLM tokens counted (tracing.py).
 """
 
 from datetime import datetime
+from functools import partial
 from uuid import uuid4
 
 from uagents import Agent, Context, Protocol, Model, Field
@@ -19,16 +27,40 @@ from uagents_core.contrib.protocols.chat import (
     ChatAcknowledgement,
     ChatMessage,
     EndSessionContent,
+    MetadataContent,
     StartSessionContent,
     TextContent,
     chat_protocol_spec,
 )
+from asi1_client import asi1_client
+from embedded_rag import EmbeddedRAG
+from http_session import http_session
 from helpers import categorize_prompt, extract_flight_routes, extract_hotel_data, extract_weather_data
 from currency_converter import fetch_exchange_rates
 from flights import fetch_offers
 from hotels import fetch_hotels_by_proximity
 from weather import get_weather_forecast
-import json
+from subtasks import SubtaskError, merge_answers, parse_subtasks, run_subtasks
+from pending_requests import IN_REPLY_TO, PendingRequests
+from response_cache import ResponseCache
+import single_flight
+from streaming import ChatStream
+from ttl_cache import TTLCache
+from tracing import tracer
+import os
+
+
+class CacheMetrics(Model):
+    responses: dict = Field(description="Response cache entries and per-type hits, misses, evictions and hit rate")
+    classifications: dict = Field(description="Classification cache hits, misses and fetches")
+    coalesced: dict = Field(description="Per coalesced call: calls made, executed, and collapsed into one in flight")
+
+
+class TraceMetrics(Model):
+    enabled: bool = Field(description="Whether tracing is on (TRACING=1)")
+    stages: dict = Field(description="Per stage/kind: spans, errors, and duration and token histograms")
+    prometheus: str = Field(description="The same histograms in the Prometheus text exposition format")
+
 
 class CurrencyResponse(Model):
     conversion: str = Field(
@@ -51,22 +83,124 @@ event_RAG_agent = "agent1qg927dsj0llmc2e4yyr23fq5s7dwqjgg737hly75y6uu4r5dm04vwnv
 
 # test-agent://agent1qg927dsj0llmc2e4yyr23fq5s7dwqjgg737hly75y6uu4r5dm04vwnvyced
 
+async def answer_weather(ctx: Context, task: dict, on_delta=None) -> str:
+    with tracer.span("fetch", "weather"):
+        data = await get_weather_forecast(task["event"])
+    with tracer.span("summarize", "weather"):
+        return (await extract_weather_data(data, task["prompt"], on_delta))["choices"][0]["message"]["content"]
+
+
+async def answer_flight(ctx: Context, task: dict, on_delta=None) -> str:
+    try:
+        with tracer.span("fetch", "flight"):
+            offers = await fetch_offers(task["from"], task["to"], task["date"])
+        ctx.logger.info(f"HTTP session stats: {http_session.stats()}")
+        with tracer.span("summarize", "flight"):
+            response = (await extract_flight_routes(offers, on_delta))["choices"][0]["message"]["content"]
+        ctx.logger.info(response)
+        return response
+    except Exception as e:
+        raise SubtaskError("Could not find any flight with those parameters, Please cross check the State Codes and Date") from e
+
+
+async def answer_hotel(ctx: Context, task: dict, on_delta=None) -> str:
+    try:
+        ctx.logger.info(task["event"])
+        with tracer.span("fetch", "hotel"):
+            hotels = await fetch_hotels_by_proximity(task["event"])
+        ctx.logger.info(f"HTTP session stats: {http_session.stats()}")
+        with tracer.span("summarize", "hotel"):
+            return (await extract_hotel_data(hotels, on_delta))["choices"][0]["message"]["content"]
+    except Exception as e:
+        raise SubtaskError("I'm sorry. I can only fetch hotels at the Devconnect or Breakpoint Venues") from e
+
+
+async def answer_currency(ctx: Context, task: dict, on_delta=None) -> str:
+    with tracer.span("fetch", "currency"):
+        response = await fetch_exchange_rates(task["base_code"], task["target_code"], 1)
+    ctx.logger.info(response)
+    return response
+
+
+# set at startup when EVENTRAG_EMBEDDED=1 and the knowledge graph loads
+embedded_rag = None
+
+
+# questions forwarded to the EventRAG agent, by msg_id, until answered or timed out
+pending_requests = PendingRequests(ttl=float(os.getenv("RAG_REPLY_TIMEOUT", "120")),
+                                   max_entries=int(os.getenv("RAG_PENDING_MAX", "10000")))
+
+
+async def ask_event_rag(ctx: Context, task: dict, on_delta=None, reply_to: str = None):
+    if embedded_rag is not None:
+        try:
+            # the EventRAG pipeline opens its own classify/retrieve/summarize spans inside this one
+            with tracer.span("retrieve", "event_rag"):
+                return await embedded_rag.answer(task["prompt"], on_delta)
+        except Exception as e:
+            ctx.logger.error(f"Embedded EventRAG failed, forwarding to the EventRAG agent: {e}")
+    # the EventRAG agent answers in its own message(s), tagged with this msg_id; handle_chat forwards them
+    message = create_text_chat(task["prompt"])
+    pending_requests.add(message.msg_id, reply_to)
+    with tracer.span("send", "event_rag"):
+        await ctx.send(event_RAG_agent, message)
+
+
+SUBTASK_HANDLERS = {
+    "weather": answer_weather,
+    "flight": answer_flight,
+    "hotel": answer_hotel,
+    "currency": answer_currency,
+    "event_info": ask_event_rag,
+    "generic": ask_event_rag,
+}
+
+
+# finished answers by sub-task type + parameters, and classifier output by normalised prompt text
+response_cache = ResponseCache(max_entries=int(os.getenv("RESPONSE_CACHE_MAX", "1000")))
+classification_cache = TTLCache(ttl=24 * 3600, max_entries=int(os.getenv("RESPONSE_CACHE_MAX", "1000")))
+
+STREAM_REPLIES = os.getenv("STREAM_REPLIES", "0") == "1"
+
+
+async def classify(prompt: str) -> list:
+    prompt_output = await categorize_prompt(prompt)
+    return parse_subtasks(prompt_output["choices"][0]["message"]["content"])
+
+
+@agent.on_rest_get("/metrics/cache", CacheMetrics)
+async def cache_metrics(ctx: Context) -> CacheMetrics:
+    """Hit rates of the coordinator's caches and how many calls were coalesced, for tuning TTLs and sizes."""
+    return CacheMetrics(responses=response_cache.stats(), classifications=classification_cache.stats(),
+                        coalesced=single_flight.stats())
+
+
+@agent.on_rest_get("/metrics/trace", TraceMetrics)
+async def trace_metrics(ctx: Context) -> TraceMetrics:
+    """Per-stage latency and token histograms, to see where a slow reply spent its time."""
+    return TraceMetrics(enabled=tracer.enabled, stages=tracer.snapshot(), prometheus=tracer.prometheus())
+
+
 @chat_proto.on_message(ChatMessage)
 async def handle_chat(ctx: Context, sender: str, msg: ChatMessage):
     if sender == event_RAG_agent:
         ctx.logger.info("Received response from EventRAG agent, forwarding to user...")
-        initial_sender = ctx.storage.get(str(ctx.session))
+        request_id = next((item.metadata.get(IN_REPLY_TO) for item in msg.content
+                           if isinstance(item, MetadataContent)), None)
+        initial_sender = pending_requests.route(request_id)
         if not initial_sender:
-            ctx.logger.error("No original user found to forward message to.")
+            ctx.logger.error(f"No pending question {request_id} to forward the EventRAG reply to.")
             return
 
         for item in msg.content:
             if isinstance(item, TextContent):
-                await ctx.send(initial_sender, create_text_chat(item.text))
+                with tracer.span("send", "forward"):
+                    await ctx.send(initial_sender, create_text_chat(item.text))
         return
 
-    # Store the sender's address in the session storage using the session ID as the key
-    ctx.storage.set(str(ctx.session), sender)
+    # questions for EventRAG remember who asked them
+    ask = partial(ask_event_rag, reply_to=sender)
+    handlers = {**SUBTASK_HANDLERS, "event_info": ask, "generic": ask}
 
     for item in msg.content:
         # Check if the content item indicates the start of a new session
@@ -80,50 +214,31 @@ async def handle_chat(ctx: Context, sender: str, msg: ChatMessage):
             # Log the received text message
             ctx.logger.info(f"Got 1 message from {sender}: {item.text}")
 
-            # Store the sender's address again in the session storage (may be redundant)
-            ctx.storage.set(str(ctx.session), sender)
-
             try:
-                # function to extract and classify command from user prompt
-                prompt_output = await categorize_prompt(str(item.text))
-                prompt_data = json.loads(prompt_output["choices"][0]["message"]["content"])
-                ctx.logger.info(json.loads(prompt_output["choices"][0]["message"]["content"])["type"])
-
-                match prompt_data["type"]:
-                    case "weather":
-                        data = await get_weather_forecast(prompt_data["event"])
-                        response = extract_weather_data(data, prompt_data["prompt"])["choices"][0]["message"]["content"]
-                        await ctx.send(sender, create_text_chat(response))
-                    case "flight":
-                        try:
-                            offers = await fetch_offers(prompt_data["from"], prompt_data["to"], prompt_data["date"])
-                            response = extract_flight_routes(offers)["choices"][0]["message"]["content"]
-                            ctx.logger.info(response)
-                            await ctx.send(sender, create_text_chat(response))
-                        except Exception as e:
-                            await ctx.send(sender, create_text_chat("Could not find any flight with those parameters, Please cross check the State Codes and Date"))
-
-                    case "hotel":
-                        try:
-                            ctx.logger.info(prompt_data["event"])
-                            hotels = await fetch_hotels_by_proximity(prompt_data["event"])
-                            response = extract_hotel_data(hotels)["choices"][0]["message"]["content"]
-                            await ctx.send(sender, create_text_chat(response))
-                        except Exception as e:
-                            await ctx.send(sender, create_text_chat("I'm sorry. I can only fetch hotels at the Devconnect or Breakpoint Venues"))
-
-                    case "currency":
-                        response = fetch_exchange_rates(prompt_data["base_code"], prompt_data["target_code"], 1)
-                        ctx.logger.info(response)
-                        await ctx.send(sender, create_text_chat(response))
-
-                    case "generic":
-                        #EventRAG
-                        await ctx.send(event_RAG_agent, create_text_chat(prompt_data["prompt"]))
-
-                    case _:
-                        await ctx.send(sender, create_text_chat("Sorry, I couldn't understand your request type."))
+                # function to extract and classify command(s) from user prompt; repeated prompts reuse the result
+                with tracer.span("classify", "prompt"):
+                    subtasks = await classification_cache.get_or_fetch(
+                        " ".join(str(item.text).lower().split()), lambda: classify(str(item.text)))
+                ctx.logger.info([task["type"] for task in subtasks])
 
+                # every part (weather, flights, hotels, currency, EventRAG) runs at once
+                stream = ChatStream(ctx, sender, create_text_chat) if STREAM_REPLIES else None
+                answers = await run_subtasks(ctx, subtasks, handlers, cache=response_cache,
+                                             on_delta=stream.write if stream else None)
+                if stream:
+                    await stream.close()
+                if stream and stream.chunks:
+                    ctx.logger.info(f"Streamed reply in {stream.chunks} chunks: first after "
+                                    f"{stream.first_chunk_s * 1000:.0f} ms, complete after {stream.elapsed * 1000:.0f} ms "
+                                    f"| ASI:One streams: {asi1_client.stream_stats()}")
+                    if answers[0] != stream.text:
+                        # the stream broke off; the part's apology follows what was already sent
+                        await ctx.send(sender, create_text_chat(answers[0]))
+                elif not any(task["type"] in SUBTASK_HANDLERS for task in subtasks):
+                    await ctx.send(sender, create_text_chat("Sorry, I couldn't understand your request type."))
+                elif any(answers):
+                    with tracer.span("send", "reply"):
+                        await ctx.send(sender, create_text_chat(merge_answers(answers)))
 
             except Exception as e:
                 ctx.logger.error(f"Error processing message: {e}")
@@ -142,6 +257,51 @@ async def handle_ack(ctx: Context, sender: str, msg: ChatAcknowledgement):
     )
 
 
+@agent.on_interval(period=10.0)
+async def expire_pending_requests(ctx: Context):
+    """Tell users whose forwarded question got no EventRAG answer within RAG_REPLY_TIMEOUT."""
+    for msg_id, user in pending_requests.expire():
+        ctx.logger.warning(f"EventRAG did not answer {msg_id} in time")
+        await ctx.send(user, create_text_chat("Sorry, the event assistant didn't answer in time. Please try again."))
+
+
+@agent.on_interval(period=15.0)
+async def write_trace_metrics(ctx: Context):
+    """With TRACING=1 and TRACING_PROMETHEUS_FILE set, keep that file current for a textfile collector."""
+    path = os.getenv("TRACING_PROMETHEUS_FILE")
+    if tracer.enabled and path:
+        tracer.write_prometheus(path)
+
+
+@agent.on_event("startup")
+async def load_embedded_rag(ctx: Context):
+    """Load the EventRAG pipeline in-process when EVENTRAG_EMBEDDED=1; on failure questions go to the agent."""
+    global embedded_rag
+    if os.getenv("EVENTRAG_EMBEDDED", "0") != "1":
+        return
+    try:
+        embedded_rag = EmbeddedRAG.load()
+        ctx.logger.info("EventRAG embedded: event questions are answered in-process")
+    except Exception as e:
+        ctx.logger.warning(f"Could not load embedded EventRAG, using the EventRAG agent: {e}")
+
+
+@agent.on_event("shutdown")
+async def close_clients(ctx: Context):
+    """Release the pooled ASI:One connections and the shared API session."""
+    ctx.logger.info(f"HTTP session stats: {http_session.stats()}")
+    ctx.logger.info(f"Response cache stats: {response_cache.stats()}")
+    ctx.logger.info(f"ASI:One stream stats: {asi1_client.stream_stats()}")
+    ctx.logger.info(f"Pending EventRAG requests: {pending_requests.stats()}")
+    ctx.logger.info(f"Coalesced calls: {single_flight.stats()}")
+    if tracer.enabled:
+        ctx.logger.info(f"Stage traces:\n{tracer.prometheus()}")
+    await asi1_client.aclose()
+    await http_session.aclose()
+    if embedded_rag is not None:
+        await embedded_rag.aclose()
+
+
 # Include protocol to your agent
 agent.include(chat_proto, publish_manifest=True)
 
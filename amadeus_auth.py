@@ -0,0 +1,85 @@
+"""
+This module provides AmadeusTokenManager, the one place flights.py and hotels.py get their Amadeus OAuth2
+access token from. Nothing is fetched at import time: the first request that needs a token fetches it, and
+the token is reused until shortly before its `expires_in` runs out. Refreshes are single-flight — concurrent
+requests that find the token missing or expiring wait on the one fetch in progress instead of each calling
+the auth endpoint. A request that is rejected with 401 can invalidate the token so the next call refreshes it.
+"""
+
+import asyncio
+import os
+import time
+
+import aiohttp
+from dotenv import load_dotenv
+
+# Load environment variables from the .env file (if present)
+load_dotenv()
+
+AUTH_ENDPOINT = "https://test.api.amadeus.com/v1/security/oauth2/token"
+
+
+class AmadeusTokenManager:
+    def __init__(self, client_id: str = None, client_secret: str = None, endpoint: str = AUTH_ENDPOINT,
+                 refresh_margin: float = 60.0, timeout: float = 15.0):
+        self.client_id = client_id if client_id is not None else os.getenv("AMADEUS_CLIENT")
+        self.client_secret = client_secret if client_secret is not None else os.getenv("AMADEUS_SECRET")
+        self.endpoint = endpoint
+        self.refresh_margin = refresh_margin
+        self.timeout = timeout
+        self._token = None
+        self._expires_at = 0.0
+        self._lock = None
+        self._loop = None
+        self.fetches = 0
+
+    def _valid(self) -> bool:
+        return self._token is not None and time.monotonic() < self._expires_at - self.refresh_margin
+
+    async def token(self, session: aiohttp.ClientSession = None) -> str:
+        """A valid access token, fetching or refreshing it (through `session`, if given) when missing or about to expire."""
+        if self._valid():
+            return self._token
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._lock, self._loop = asyncio.Lock(), loop
+        async with self._lock:
+            if not self._valid():  # another request may have refreshed it while we waited
+                await self._fetch(session)
+            return self._token
+
+    async def _fetch(self, session: aiohttp.ClientSession = None):
+        data = {"grant_type": "client_credentials",
+                "client_id": self.client_id,
+                "client_secret": self.client_secret}
+        if session is None:
+            async with aiohttp.ClientSession() as own_session:
+                return await self._fetch(own_session)
+        async with session.post(self.endpoint, data=data, timeout=aiohttp.ClientTimeout(total=self.timeout)) as resp:
+            body = await resp.json(content_type=None)
+        if "access_token" not in body:
+            raise RuntimeError(f"Amadeus authentication failed: {body}")
+        self.fetches += 1
+        self._token = body["access_token"]
+        self._expires_at = time.monotonic() + float(body.get("expires_in", 0))
+
+    async def get_json(self, session: aiohttp.ClientSession, url: str, params: dict) -> dict:
+        """GET an Amadeus API endpoint with the current token, refreshing it once if it was rejected."""
+        for attempt in range(2):
+            token = await self.token(session)
+            async with session.get(url, params=params, headers={'Authorization': 'Bearer' + ' ' + token}) as resp:
+                if resp.status == 401 and attempt == 0:
+                    self.invalidate(token)
+                    continue
+                return await resp.json()
+
+    def invalidate(self, token: str = None):
+        """Forget the token (e.g. after a 401) so the next call fetches a new one. If `token` is given, only
+        that token is dropped, so a late 401 doesn't discard one another request has just refreshed."""
+        if token is None or token == self._token:
+            self._token = None
+            self._expires_at = 0.0
+
+
+# shared by flights.py and hotels.py
+amadeus_tokens = AmadeusTokenManager()
@@ -0,0 +1,153 @@
+"""
+This module provides ASI1Client, the shared asynchronous HTTP client that every helper uses to call the
+ASI:One chat completions endpoint. One aiohttp session with a keep-alive connection pool is reused across
+calls, so concurrent chats don't each pay for a new TCP/TLS handshake, and a global semaphore caps how many
+requests are in flight at once. Each call has a total timeout; timeouts, connection errors and retryable
+statuses (429/5xx) are retried with exponential backoff and full jitter so parallel retries don't land
+together. The session is opened lazily on the running event loop and closed with aclose() on shutdown.
+complete_streaming sends the same payload with "stream": true, hands each content delta of the server-sent
+event stream to a callback as it arrives, and records time to first token separately from total time.
+Token usage reported by ASI:One is credited to the tracing span the call runs in.
+"""
+
+import asyncio
+import json
+import os
+import random
+import time
+
+import aiohttp
+from dotenv import load_dotenv
+
+from tracing import record_tokens
+
+# Load environment variables from the .env file (if present)
+load_dotenv()
+
+ASI1_Endpoint = "https://api.asi1.ai/v1/chat/completions"
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+def _record_usage(response):
+    usage = response.get("usage") if isinstance(response, dict) else None
+    if usage:
+        record_tokens(usage.get("prompt_tokens"), usage.get("completion_tokens"))
+
+
+class ASI1Client:
+    def __init__(self, api_key: str = None, endpoint: str = ASI1_Endpoint, timeout: float = 60.0,
+                 max_concurrency: int = 16, max_connections: int = 32, retries: int = 3, backoff: float = 0.5):
+        self.api_key = api_key if api_key is not None else os.getenv("ASI1_API_KEY")
+        self.endpoint = endpoint
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self.max_connections = max_connections
+        self.retries = retries
+        self.backoff = backoff
+        self._session = None
+        self._semaphore = None
+        self._loop = None
+        self._streams = 0
+        self._first_token_time = 0.0
+        self._stream_time = 0.0
+
+    def _ensure_session(self) -> aiohttp.ClientSession:
+        # sessions and semaphores belong to one event loop; a new loop (e.g. asyncio.run) gets its own
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_connections, keepalive_timeout=30),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                headers={
+                    'Content-Type': 'application/json',
+                    'Accept': 'application/json',
+                    'Authorization': f'Bearer {self.api_key}',  # agentverse api key; stored in agent secrets
+                },
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._loop = loop
+        return self._session
+
+    async def complete(self, payload: dict) -> dict:
+        """POST a chat completion payload and return the decoded JSON response."""
+        session = self._ensure_session()
+        for attempt in range(self.retries + 1):
+            try:
+                async with self._semaphore:
+                    async with session.post(self.endpoint, json=payload) as resp:
+                        if resp.status not in RETRY_STATUSES or attempt == self.retries:
+                            response = await resp.json(content_type=None)
+                            _record_usage(response)
+                            return response
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                if attempt == self.retries:
+                    raise
+            # full jitter: sleep a random time up to the exponential backoff, outside the semaphore
+            await asyncio.sleep(random.uniform(0, self.backoff * 2 ** attempt))
+
+    async def complete_streaming(self, payload: dict, on_delta) -> dict:
+        """
+        Stream a chat completion, awaiting on_delta(text) for every content delta, and return the same shape
+        as complete() with the joined text. Only failures before the first delta are retried, so nothing
+        already handed to on_delta is sent twice.
+        """
+        session = self._ensure_session()
+        payload = {**payload, "stream": True}
+        for attempt in range(self.retries + 1):
+            start = time.perf_counter()
+            parts, finish_reason, usage = [], None, None
+            try:
+                async with self._semaphore:
+                    async with session.post(self.endpoint, json=payload, headers={'Accept': 'text/event-stream'}) as resp:
+                        if resp.status != 200:
+                            if resp.status not in RETRY_STATUSES or attempt == self.retries:
+                                return await resp.json(content_type=None)
+                        else:
+                            async for line in resp.content:
+                                line = line.strip()
+                                if not line.startswith(b"data:"):
+                                    continue
+                                data = line[len(b"data:"):].strip()
+                                if data == b"[DONE]":
+                                    break
+                                chunk = json.loads(data)
+                                usage = chunk.get("usage") or usage
+                                for choice in chunk.get("choices", []):
+                                    finish_reason = choice.get("finish_reason") or finish_reason
+                                    text = (choice.get("delta") or {}).get("content")
+                                    if text:
+                                        if not parts:
+                                            self._first_token_time += time.perf_counter() - start
+                                        parts.append(text)
+                                        await on_delta(text)
+                            self._streams += 1
+                            self._stream_time += time.perf_counter() - start
+                            if not parts:
+                                self._first_token_time += time.perf_counter() - start
+                            response = {"choices": [{"index": 0, "finish_reason": finish_reason,
+                                                     "message": {"role": "assistant", "content": "".join(parts)}}]}
+                            if usage:
+                                response["usage"] = usage
+                            _record_usage(response)
+                            return response
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                if parts or attempt == self.retries:
+                    raise
+            await asyncio.sleep(random.uniform(0, self.backoff * 2 ** attempt))
+
+    def stream_stats(self) -> dict:
+        """Completed streams with mean time to first token and mean total time (ms)."""
+        def mean_ms(total):
+            return total / self._streams * 1000 if self._streams else 0.0
+
+        return {"streams": self._streams, "first_token_ms": mean_ms(self._first_token_time),
+                "total_ms": mean_ms(self._stream_time)}
+
+    async def aclose(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+
+# shared by all helpers
+asi1_client = ASI1Client()
@@ -0,0 +1,103 @@
+"""
+This module is the compaction stage between the travel APIs and the LLM summaries in helpers.py. Raw Amadeus
+responses carry far more than the summaries use (per-traveller fare breakdowns, repeated carrier and aircraft
+details, every hotel in the search radius), and every byte of it is paid for as prompt tokens and prefill time.
+compact_flights and compact_hotels project each result down to the fields the prompts ask for (reusing
+simplify_flight_offers / simplify_hotel_offers), list carrier and aircraft names once instead of per segment,
+drop duplicate hotels and cap how many results go in. log_prompt_size records the estimated token count before
+and after compaction, plus the count ASI:One reports, for every request.
+"""
+
+import json
+
+from uagents.utils import get_logger
+
+from flights import simplify_flight_offers
+from hotels import simplify_hotel_offers
+
+MAX_FLIGHT_OFFERS = 5
+MAX_HOTELS = 3
+
+logger = get_logger("compaction")  # same format as the agents' own log lines
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about 4 characters per token for English and JSON)."""
+    return (len(text) + 3) // 4
+
+
+def _dumps(data) -> str:
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+
+
+def _results(response) -> list:
+    """The result list of an Amadeus response; raises on an error response so the caller can apologise."""
+    if isinstance(response, list):
+        return response
+    if "data" not in response and "errors" in response:
+        raise ValueError(f"Amadeus returned errors: {response['errors']}")
+    return response.get("data", [])
+
+
+def compact_flights(response, max_offers: int = MAX_FLIGHT_OFFERS) -> str:
+    """Cheapest offers with only their essential fields, and each carrier/aircraft name listed once."""
+    offers = simplify_flight_offers(_results(response))
+    offers.sort(key=lambda offer: float(offer['price']['total']))
+    offers = offers[:max_offers]
+
+    dictionaries = response.get("dictionaries", {}) if isinstance(response, dict) else {}
+    carriers = sorted({seg['carrierCode'] for offer in offers for seg in offer['segments']})
+    aircraft = sorted({seg['aircraft'] for offer in offers for seg in offer['segments']})
+    return _dumps({
+        "offers": offers,
+        "carriers": {code: dictionaries.get("carriers", {}).get(code, code) for code in carriers},
+        "aircraft": {code: dictionaries.get("aircraft", {}).get(code, code) for code in aircraft},
+    })
+
+
+def _hotel_location(hotel: dict) -> dict:
+    """Street address (as far as Amadeus gives one) and coordinates of a hotel-list entry."""
+    address = hotel.get("address", {})
+    parts = address.get("lines", []) + [address.get(field) for field in ("postalCode", "cityName", "countryCode")]
+    geo = hotel.get("geoCode", {})
+    location = {}
+    if any(parts):
+        location["address"] = ", ".join(part for part in parts if part)
+    if geo.get("latitude") is not None and geo.get("longitude") is not None:
+        location["coordinates"] = [geo["latitude"], geo["longitude"]]
+    return location
+
+
+def compact_hotels(response, max_hotels: int = MAX_HOTELS) -> str:
+    """The nearest (or cheapest, for hotel offers) distinct hotels, with only name, id, distance, location and chain."""
+    results = _results(response)
+    if results and "hotel" in results[0]:
+        # hotel-offers responses: price, rating and address per hotel, already sorted by price
+        return _dumps(simplify_hotel_offers(results)[:max_hotels])
+
+    hotels, seen = [], set()
+    for hotel in sorted(results, key=lambda h: h.get("distance", {}).get("value", float("inf"))):
+        key = hotel.get("dupeId") or hotel.get("name")
+        if key in seen:
+            continue
+        seen.add(key)
+        distance = hotel.get("distance", {})
+        hotels.append({
+            "id": hotel.get("hotelId"),
+            "name": hotel.get("name"),
+            "distance": f"{distance.get('value')} {distance.get('unit', 'KM')}",
+            "location": _hotel_location(hotel),
+            "chain": hotel.get("chainCode"),
+        })
+        if len(hotels) == max_hotels:
+            break
+    return _dumps(hotels)
+
+
+def log_prompt_size(kind: str, raw, prompt: str, response: dict):
+    """Log estimated prompt tokens for the raw data vs. the compacted prompt, and ASI:One's own count."""
+    usage = (response.get("usage") or {}) if isinstance(response, dict) else {}
+    logger.info(
+        f"{kind} prompt: raw ~{estimate_tokens(str(raw))} tokens, compacted ~{estimate_tokens(prompt)} tokens, "
+        f"ASI:One prompt_tokens={usage.get('prompt_tokens', 'n/a')}"
+    )
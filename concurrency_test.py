@@ -0,0 +1,141 @@
+"""
+This script drives the coordinator's handle_chat with hundreds of overlapping users whose questions are all
+forwarded to EventRAG, and checks that every answer reaches the user who asked it. Classification goes to a
+local mock ASI:One endpoint that tags each question as "generic" and echoes it back; the EventRAG agent is
+simulated: each forwarded message is answered after a random delay, in one message or as streamed chunks,
+tagged with the question's msg_id as the real agent does, and a share of questions are never answered. The
+fake Context has no storage at all, so routing must come from the pending-request table alone. After the
+reply timeout, the expiry sweep must tell exactly the unanswered users. Exits non-zero on any lost or
+misrouted reply.
+
+Run from the repository root:  python concurrency_test.py [users] [drop_rate]
+"""
+
+import asyncio
+import json
+import logging
+import random
+import sys
+import threading
+import time
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import agent
+from asi1_client import asi1_client
+from pending_requests import IN_REPLY_TO, PendingRequests
+from uagents_core.contrib.protocols.chat import ChatMessage, MetadataContent, TextContent
+
+REPLY_TIMEOUT = 3.0
+
+
+class EchoClassifier(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        content = json.dumps({"type": "generic", "prompt": body["messages"][-1]["content"]})
+        message = {"role": "assistant", "content": content}
+        payload = json.dumps({"choices": [{"index": 0, "message": message}]}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+class FakeContext:
+    """Just enough of uagents' Context: a logger and send(). No storage, no session."""
+    logger = logging.getLogger("concurrency_test")
+
+    def __init__(self, world):
+        self.world = world
+
+    async def send(self, recipient, message):
+        await self.world.deliver(recipient, message)
+
+
+class World:
+    def __init__(self, drop_rate: float):
+        self.drop_rate = drop_rate
+        self.inboxes = defaultdict(list)  # user -> texts received
+        self.unanswered = set()  # questions the simulated EventRAG drops
+        self.tasks = []
+
+    async def deliver(self, recipient, message: ChatMessage):
+        if recipient != agent.event_RAG_agent:
+            self.inboxes[recipient].append(message.text())
+            return
+        question = message.text()
+        if random.random() < self.drop_rate:
+            self.unanswered.add(question)
+            return
+        self.tasks.append(asyncio.create_task(self.rag_reply(message.msg_id, question)))
+
+    async def rag_reply(self, msg_id, question):
+        """The EventRAG agent's answer, whole or in streamed chunks, each tagged with the question's msg_id."""
+        await asyncio.sleep(random.uniform(0, 0.5))
+        answer = f"answer to: {question}"
+        chunks = [answer] if random.random() < 0.5 else [answer[:12], answer[12:]]
+        for chunk in chunks:
+            reply = ChatMessage(content=[TextContent(type="text", text=chunk),
+                                         MetadataContent(metadata={IN_REPLY_TO: str(msg_id)})])
+            await agent.handle_chat(FakeContext(self), agent.event_RAG_agent, reply)
+            await asyncio.sleep(random.uniform(0, 0.05))
+
+
+async def main(n_users: int, drop_rate: float, endpoint: str) -> int:
+    asi1_client.endpoint = endpoint
+    agent.pending_requests = PendingRequests(ttl=REPLY_TIMEOUT)
+    world = World(drop_rate)
+
+    async def user(i):
+        question = ChatMessage(content=[TextContent(type="text", text=f"when is devconnect? (user {i})")])
+        await agent.handle_chat(FakeContext(world), f"user{i}", question)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(user(i) for i in range(n_users)))
+    await asyncio.gather(*world.tasks)
+    answered_s = time.perf_counter() - start
+    stats_before_expiry = agent.pending_requests.stats()
+
+    await asyncio.sleep(REPLY_TIMEOUT)
+    await agent.expire_pending_requests(FakeContext(world))
+    await asi1_client.aclose()
+
+    correct = timed_out = lost = misrouted = 0
+    for i in range(n_users):
+        question = f"when is devconnect? (user {i})"
+        received = world.inboxes[f"user{i}"]
+        if question in world.unanswered:
+            expected = ["Sorry, the event assistant didn't answer in time. Please try again."]
+            timed_out += received == expected
+        else:
+            correct += "".join(received) == f"answer to: {question}"
+        if not received:
+            lost += 1
+    # every inbox holds only its own user's answer (or apology), so anything else arrived at the wrong user
+    misrouted = n_users - correct - timed_out - lost
+
+    print(f"\n{n_users} overlapping users, {drop_rate:.0%} of EventRAG replies dropped")
+    print(f"all replies routed in {answered_s:.2f} s; pending table: {stats_before_expiry}")
+    print(f"answered correctly: {correct}  timed out and told: {timed_out}  lost: {lost}  misrouted: {misrouted}")
+    print(f"after expiry: {agent.pending_requests.stats()}")
+    return 1 if lost or misrouted else 0
+
+
+if __name__ == "__main__":
+    n_users = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    drop_rate = float(sys.argv[2]) if len(sys.argv) > 2 else 0.05
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), EchoClassifier)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    endpoint = f"http://127.0.0.1:{server.server_address[1]}/v1/chat/completions"
+    status = asyncio.run(main(n_users, drop_rate, endpoint))
+    server.shutdown()
+    sys.exit(status)
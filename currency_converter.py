@@ -1,15 +1,22 @@
 """
 The `get_currencies` function uses an asynchronous helper (`exchange_rate_helper`) to extract two
-currency codes from a user prompt, then cleans and returns them. The `fetch_exchange_rates` function
-retrieves live exchange rate data from the ExchangeRate API, calculates the conversion for a given
-amount, and returns a formatted message showing the current rate and timestamp.
+currency codes from a user prompt, then cleans and returns them. The async `fetch_exchange_rates` function
+converts an amount with live ExchangeRate API data and returns a formatted message showing the current rate
+and timestamp. Rates come from ExchangeRateCache: one cached USD rate table, refreshed on the provider's
+time_next_update schedule, from which any pair is computed locally as a cross rate.
 """
 
-import requests
-from helpers import exchange_rate_helper
 import asyncio
+import os
+import time
+
+from helpers import exchange_rate_helper
+from http_session import http_session
+from single_flight import coalesce
 from uagents import Model, Field
 
+RATES_URL = 'https://v6.exchangerate-api.com/v6/' + os.getenv("EXCHANGE_RATE_API_KEY", "f10aad56bb1665e3114dd115") + '/latest/'
+
 class CurrencyConversionRequest(Model):
     base_code: str
     other_currency: str
@@ -35,17 +42,68 @@ def get_currencies(prompt):
 
 
 
-def fetch_exchange_rates(base_code, target_code, amount):
-    url = 'https://v6.exchangerate-api.com/v6/f10aad56bb1665e3114dd115/latest/'+base_code
+class ExchangeRateCache:
+    """
+    One provider rate table (for `base`), kept until the provider's time_next_update. Any pair is priced locally
+    as a cross rate through that base. With stale_while_revalidate, an expired table keeps answering while a
+    single background refresh runs; otherwise callers wait for the refresh. Fetches are single-flight.
+    """
+
+    def __init__(self, base: str = "USD", stale_while_revalidate: bool = True, min_refresh: float = 60.0):
+        self.base = base
+        self.stale_while_revalidate = stale_while_revalidate
+        self.min_refresh = min_refresh
+        self.table = None  # provider response: conversion_rates, time_last_update_utc, time_next_update_unix, ...
+        self._refresh_at = 0.0
+        self._refresh = None  # task of the fetch in progress
+        self.fetches = 0
+        self.stale_hits = 0
+
+    def _fresh(self) -> bool:
+        return self.table is not None and time.time() < self._refresh_at
+
+    async def _fetch(self):
+        async with http_session.get().get(RATES_URL + self.base) as resp:
+            data = await resp.json()
+        if data.get("result") != "success":
+            raise RuntimeError(f"Exchange rate lookup failed: {data.get('error-type', data)}")
+        self.fetches += 1
+        self.table = data
+        # refresh on the provider's own schedule, but never in a tight loop if its clock says "now"
+        self._refresh_at = max(float(data.get("time_next_update_unix", 0)), time.time() + self.min_refresh)
 
-    # Making our request
-    response = requests.get(url)
-    data = response.json()
+    def _start_refresh(self) -> asyncio.Task:
+        if self._refresh is None or self._refresh.done():
+            self._refresh = asyncio.create_task(self._fetch())
+            # a background refresh may fail with nobody awaiting it; the next call simply retries
+            self._refresh.add_done_callback(lambda task: task.cancelled() or task.exception())
+        return self._refresh
 
-    last_update = data["time_last_update_utc"]
-    rate = data["conversion_rates"][str(target_code)]
+    async def rates(self) -> dict:
+        """The current rate table, refreshing it if it has expired."""
+        if self._fresh():
+            return self.table
+        refresh = self._start_refresh()
+        if self.table is not None and self.stale_while_revalidate:
+            self.stale_hits += 1
+            return self.table
+        await asyncio.shield(refresh)
+        return self.table
+
+    async def rate(self, base_code: str, target_code: str) -> float:
+        """Units of target_code per one base_code."""
+        conversion_rates = (await self.rates())["conversion_rates"]
+        return conversion_rates[str(target_code).upper()] / conversion_rates[str(base_code).upper()]
+
+
+exchange_rates = ExchangeRateCache()
+
+
+@coalesce("exchange_rates")
+async def fetch_exchange_rates(base_code, target_code, amount):
+    rate = await exchange_rates.rate(base_code, target_code)
+    last_update = exchange_rates.table["time_last_update_utc"]
     if amount == 1:
-        return f"As of {last_update}, 1 ${base_code} = {rate} ${target_code}."
+        return f"As of {last_update}, 1 ${base_code} = {rate:.6g} ${target_code}."
     else:
         return f"As of {last_update}, {amount} {base_code} = {rate * amount:.6f} {target_code}."
-
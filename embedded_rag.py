@@ -0,0 +1,82 @@
+"""
+This module lets the coordinator answer event questions in-process instead of messaging the EventRAG agent.
+Forwarding a question means a full mailbox round trip to another agent and back, plus a pending-request
+lookup to find who asked; with EVENTRAG_EMBEDDED=1 the coordinator instead imports the EventRAG package, loads
+the same knowledge graph, classifier and learned-answer cache the EventRAG agent uses, and runs
+process_query_async itself. The embedded graph keeps its own snapshot and learned-knowledge store
+(EVENTRAG_EMBEDDED_SNAPSHOT, EVENTRAG_EMBEDDED_STORE), so it never writes to the files the EventRAG agent has
+open. The remote agent stays the fallback: if the embedded graph can't be loaded (e.g. hyperon isn't installed)
+or a query fails, the question is forwarded as before. Identical questions asked at the same time share one
+pipeline run.
+"""
+
+import os
+
+from single_flight import SingleFlight, groups
+
+EVENTRAG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "EventRAG")
+
+_inflight_queries = groups.setdefault("event_rag", SingleFlight())
+
+
+class EmbeddedRAG:
+    def __init__(self, rag, llm, classifier, learned_cache, process_query, snapshot_path: str = None,
+                 save_snapshot=None):
+        self.rag = rag
+        self.llm = llm
+        self.classifier = classifier
+        self.learned_cache = learned_cache
+        self._process_query = process_query
+        self._snapshot_path = snapshot_path
+        self._save_snapshot = save_snapshot
+
+    @classmethod
+    def load(cls, api_key: str = None, store_path: str = None, snapshot_path: str = None) -> "EmbeddedRAG":
+        """Build the EventRAG pipeline the way EventRAG/agent.py does; raises ImportError without hyperon."""
+        from hyperon import MeTTa
+        from EventRAG.knowledge_store import KnowledgeStore
+        from EventRAG.snapshot import load_knowledge, save_snapshot
+        from EventRAG.utils import AsyncLLM, IntentClassifier, learned_cache_from_rag, process_query_async
+
+        if store_path is None:
+            store_path = os.getenv("EVENTRAG_EMBEDDED_STORE", os.path.join(EVENTRAG_DIR, "embedded_knowledge.db"))
+        if snapshot_path is None:
+            snapshot_path = os.getenv("EVENTRAG_EMBEDDED_SNAPSHOT",
+                                      os.path.join(EVENTRAG_DIR, "embedded_knowledge.snapshot"))
+        rag = load_knowledge(MeTTa(), store=KnowledgeStore(store_path), snapshot_path=snapshot_path)
+        learned_cache = learned_cache_from_rag(
+            rag,
+            threshold=float(os.getenv("EVENTRAG_LEARNED_THRESHOLD", "0.85")),
+            max_entries=int(os.getenv("EVENTRAG_LEARNED_MAX", "5000")),
+        )
+        llm = AsyncLLM(api_key=api_key if api_key is not None else os.getenv("ASI1_API_KEY"))
+        return cls(rag, llm, IntentClassifier.from_rag(rag), learned_cache, process_query_async,
+                   snapshot_path, save_snapshot)
+
+    async def answer(self, prompt: str, on_delta=None) -> str:
+        """The reply the EventRAG agent would send for prompt (what was streamed to on_delta, if anything was)."""
+        # a caller that joins a query already running gets its answer whole, not streamed
+        return await _inflight_queries.do(" ".join(prompt.lower().split()), lambda: self._answer(prompt, on_delta))
+
+    async def _answer(self, prompt: str, on_delta=None) -> str:
+        streamed = []
+
+        async def forward(text):
+            streamed.append(text)
+            await on_delta(text)
+
+        response = await self._process_query(prompt.strip(), self.rag, self.llm, self.classifier,
+                                             learned_cache=self.learned_cache,
+                                             on_delta=forward if on_delta else None)
+        if streamed:
+            return "".join(streamed)
+        if isinstance(response, dict):
+            return f"**{response.get('selected_question', prompt)}**\n\n{response.get('humanized_answer', '')}"
+        return str(response)
+
+    async def aclose(self):
+        """Snapshot the graph (with what was learned) for the next start, then release the LLM pool and the store."""
+        if self._snapshot_path:
+            self._save_snapshot(self.rag, self._snapshot_path)
+        await self.llm.aclose()
+        self.rag.store.close()
@@ -1,36 +1,19 @@
 ### Write code for the new module here and import it from agent.py.
-import aiohttp
-import asyncio
-import requests
-from dotenv import load_dotenv
-import os
+from amadeus_auth import amadeus_tokens
+from http_session import http_session
+from single_flight import coalesce
 
-# Load environment variables from the .env file (if present)
-load_dotenv()
 
-AMADEUS_CLIENT = os.getenv("AMADEUS_CLIENT")
-AMADEUS_SECRET = os.getenv("AMADEUS_SECRET")
-
-AUTH_ENDPOINT = "https://test.api.amadeus.com/v1/security/oauth2/token"
-headers = {"Content-Type": "application/x-www-form-urlencoded"}
-data = {"grant_type": "client_credentials",
-        "client_id": AMADEUS_CLIENT,
-        "client_secret": AMADEUS_SECRET}
-response = requests.post(AUTH_ENDPOINT,
-                        headers=headers,
-                        data=data)
-access_token = response.json()['access_token']
-
-async def fetch_offers(l_from, to, date):
-    headers = {'Authorization': 'Bearer' + ' ' + access_token}
+# concurrent searches for the same route and date share one Amadeus request
+@coalesce("flight_offers", key=lambda l_from, to, date, session=None: (str(l_from).upper(), str(to).upper(), date))
+async def fetch_offers(l_from, to, date, session=None):
     flight_search_endpoint = 'https://test.api.amadeus.com/v2/shopping/flight-offers'
     parameters = {"adults": 1, "originLocationCode":l_from, "destinationLocationCode":to,"departureDate":date, "max":2}
 
-    async with aiohttp.ClientSession() as session:
-        async with session.get(flight_search_endpoint,params=parameters,headers=headers) as resp:
-            flights = await resp.json()
-            # print(flights)
-            return flights
+    # the coordinator's shared keep-alive session unless the caller passes its own
+    flights = await amadeus_tokens.get_json(session or http_session.get(), flight_search_endpoint, parameters)
+    # print(flights)
+    return flights
 
 def simplify_flight_offers(response_data):
     """
@@ -5,32 +5,27 @@ weather, hotels, currency, or event info, and to generate structured or enriched
 Each helper function handles a specific type of query — for example, parsing flight data, summarizing
 weather forecasts, formatting hotel results, interpreting currency conversions, or answering general
 event-related enquiries. Essentially, it bridges raw user input with intelligent, structured outputs
-that other agents in the system can act upon.
+that other agents in the system can act upon. All calls go through the shared, pooled ASI1Client
+in asi1_client.py, so none of them block the agent's event loop. Flight and hotel data is compacted
+(compaction.py) before it goes into a prompt, and every summary logs its prompt size. Given an on_delta
+callback, the summaries stream their completion and hand it the text as it is generated. Identical prompts
+classified at the same time share one categorize_prompt call.
 """
 
-import requests, os
-import json
-from dotenv import load_dotenv
-import os
+from asi1_client import asi1_client
+from compaction import compact_flights, compact_hotels, log_prompt_size
+from single_flight import coalesce
 
-# Load environment variables from the .env file (if present)
-load_dotenv()
 
-ASI_1_API_KEY = os.getenv("ASI1_API_KEY")
-
-asi1_api_key = ASI_1_API_KEY
-
-ASI1_Endpoint = "https://api.asi1.ai/v1/chat/completions"
-
-headers = {
-    'Content-Type': 'application/json',
-    'Accept': 'application/json',
-    'Authorization': f'Bearer {asi1_api_key}'  # agentverse api key; stored in agent secrets
-}
+async def _complete(payload, on_delta=None):
+    if on_delta is None:
+        return await asi1_client.complete(payload)
+    return await asi1_client.complete_streaming(payload, on_delta)
 
 
+@coalesce("classify", key=lambda prompt: " ".join(str(prompt).lower().split()))
 async def categorize_prompt(prompt):
-    payload = json.dumps({
+    payload = {
         "model": "asi1-mini",
         "messages": [
             {
@@ -113,6 +108,11 @@ async def categorize_prompt(prompt):
 
                             You must still strictly output valid JSON in the exact structure required. No markdown, no extra text, no explanations.
 
+                            If the user asks for several of these in one message (e.g. "weather and hotels near breakpoint"), return a JSON
+                            array with one object per request, each in its exact format above, for example:
+                            [{"type": "weather", ...}, {"type": "hotel", ...}]
+                            A message with a single request is still answered with a single object.
+
 
                 """
             },
@@ -124,15 +124,13 @@ async def categorize_prompt(prompt):
         "temperature": 0.2,
         "stream": False,
         "max_tokens": 5000
-    })
-
-    response = requests.request("POST", ASI1_Endpoint, headers=headers, data=payload)
+    }
 
-    return response.json()
+    return await asi1_client.complete(payload)
 
 
-def extract_flight_routes(flight_data):
-    payload = json.dumps({
+async def extract_flight_routes(flight_data, on_delta=None):
+    payload = {
         "model": "asi1-fast",
         "messages": [
             {
@@ -145,23 +143,24 @@ def extract_flight_routes(flight_data):
                 to names like 350=Airbus A350-900), times (HH:MM with +1 for next day), and layovers—then sorts 
                 by price, selects the cheapest, and outputs a user-friendly summary with emojis, separators, 
                 and details like route header, no-direct note if applicable, per-segment itineraries, totals, and a booking nudge.
+                Airline and aircraft names, where known, are listed once in the "carriers" and "aircraft" tables.
             """
             },
             {
                 "role": "user",
-                "content": f"{flight_data}"
+                "content": compact_flights(flight_data)
             }
         ],
         "temperature": 0.2,
         "stream": False,
-    })
-    response = requests.request("POST", ASI1_Endpoint, headers=headers, data=payload)
+    }
+    response = await _complete(payload, on_delta)
+    log_prompt_size("flight", flight_data, payload["messages"][1]["content"], response)
+    return response
 
-    return response.json()
 
-
-def extract_weather_data(data, prompt):
-    payload = json.dumps({
+async def extract_weather_data(data, prompt, on_delta=None):
+    payload = {
         "model": "asi1-fast",
         "messages": [
             {
@@ -184,14 +183,14 @@ def extract_weather_data(data, prompt):
         ],
         "temperature": 0.2,
         "stream": False,
-    })
-    response = requests.request("POST", ASI1_Endpoint, headers=headers, data=payload)
-
-    return response.json()
+    }
+    response = await _complete(payload, on_delta)
+    log_prompt_size("weather", data, str(data), response)
+    return response
 
 
-def extract_hotel_data(hotel_data):
-    payload = json.dumps({
+async def extract_hotel_data(hotel_data, on_delta=None):
+    payload = {
         "model": "asi1-fast",
         "messages": [
             {
@@ -209,19 +208,19 @@ def extract_hotel_data(hotel_data):
             },
             {
                 "role": "user",
-                "content": f"{hotel_data}"
+                "content": compact_hotels(hotel_data)
             }
         ],
         "temperature": 0.2,
         "stream": False,
-    })
-    response = requests.request("POST", ASI1_Endpoint, headers=headers, data=payload)
-
-    return response.json()
+    }
+    response = await _complete(payload, on_delta)
+    log_prompt_size("hotel", hotel_data, payload["messages"][1]["content"], response)
+    return response
 
 
 async def general_enquiry(prompt):
-    payload = json.dumps({
+    payload = {
         "model": "asi1-fast",
         "messages": [
             {
@@ -243,14 +242,12 @@ async def general_enquiry(prompt):
         ],
         "temperature": 0.2,
         "stream": False,
-    })
-    response = requests.request("POST", ASI1_Endpoint, headers=headers, data=payload)
-
-    return response.json()
+    }
+    return await asi1_client.complete(payload)
 
 
 async def exchange_rate_helper(prompt):
-    payload = json.dumps({
+    payload = {
         "model": "asi1-fast",
         "messages": [
             {
@@ -270,7 +267,5 @@ async def exchange_rate_helper(prompt):
         ],
         "temperature": 0.2,
         "stream": False,
-    })
-    response = requests.request("POST", ASI1_Endpoint, headers=headers, data=payload)
-
-    return response.json()
\ No newline at end of file
+    }
+    return await asi1_client.complete(payload)
\ No newline at end of file
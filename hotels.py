@@ -1,43 +1,26 @@
 """
 This module integrates with the Amadeus API to authenticate, retrieve, and process hotel data
-based on proximity to event locations. It manages OAuth2 authentication, makes asynchronous and
-synchronous API calls to fetch hotel details, filters
+based on proximity to event locations. It authenticates through the shared, lazily refreshed token in
+amadeus_auth.py, makes asynchronous and synchronous API calls to fetch hotel details, filters
 and simplifies hotel offers for readability, and can also retrieve sentiment data for specific
 hotels. Overall, it serves as a utility for discovering and evaluating nearby accommodations,
 streamlining the process of finding relevant hotels for event attendees.
 """
 
-import aiohttp
-import asyncio
-import requests
-from dotenv import load_dotenv
-import os
+from amadeus_auth import amadeus_tokens
+from http_session import http_session
+from single_flight import coalesce
 
-# Load environment variables from the .env file (if present)
-load_dotenv()
 
-AMADEUS_CLIENT = os.getenv("AMADEUS_CLIENT")
-AMADEUS_SECRET = os.getenv("AMADEUS_SECRET")
-
-AUTH_ENDPOINT = "https://test.api.amadeus.com/v1/security/oauth2/token"
-headers = {"Content-Type": "application/x-www-form-urlencoded"}
-data = {"grant_type": "client_credentials",
-        "client_id": AMADEUS_CLIENT,
-        "client_secret": AMADEUS_SECRET}
-response = requests.post(AUTH_ENDPOINT,
-                         headers=headers,
-                         data=data)
-access_token = response.json()["access_token"]
-
-
-async def fetch_hotels_by_proximity(event):
+# concurrent searches near the same venue share one Amadeus request
+@coalesce("hotels", key=lambda event, session=None: event)
+async def fetch_hotels_by_proximity(event, session=None):
     d_longitude = -58.43
     d_latitude = -34.62
 
     b_longitude = 54.37
     b_latitude = 24.4539
 
-    headers = {'Authorization': 'Bearer' + ' ' + access_token}
     hotel_search_endpoint = 'https://test.api.amadeus.com/v1/reference-data/locations/hotels/by-geocode'
     parameters = {}
     if event == "devconnect":
@@ -47,10 +30,9 @@ async def fetch_hotels_by_proximity(event):
         parameters = {"latitude": b_latitude, "longitude": b_longitude, "radius": 3, "radiusUnit": "KM",
                       "hotelSource": "ALL"}
 
-    async with aiohttp.ClientSession() as session:
-        async with session.get(hotel_search_endpoint, params=parameters, headers=headers) as resp:
-            hotels = await resp.json()
-            return hotels
+    # the coordinator's shared keep-alive session unless the caller passes its own
+    hotels = await amadeus_tokens.get_json(session or http_session.get(), hotel_search_endpoint, parameters)
+    return hotels
 
 
 def fetch_hotel_data():
@@ -0,0 +1,94 @@
+"""
+This module provides SharedSession, the app-lifetime aiohttp session the coordinator agent uses for its outbound
+API calls (Amadeus flights, hotels and auth). Its TCPConnector caches DNS lookups, keeps idle connections alive
+and limits connections per host, so back-to-back requests reuse an open TCP/TLS connection instead of paying for a
+new DNS lookup and handshake each time. The session is opened lazily on the running event loop; the agent closes it
+on shutdown. An aiohttp TraceConfig records how long each request took and whether it opened a new connection
+or reused one, and stats() summarises both, which is where the handshake savings show up.
+"""
+
+import asyncio
+import time
+
+import aiohttp
+
+
+class SharedSession:
+    def __init__(self, limit: int = 100, limit_per_host: int = 10, dns_ttl: int = 300,
+                 keepalive_timeout: float = 30.0, timeout: float = 30.0):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.dns_ttl = dns_ttl
+        self.keepalive_timeout = keepalive_timeout
+        self.timeout = timeout
+        self._session = None
+        self._loop = None
+        # request count and total latency (s) by connection kind, and time spent opening connections (DNS + TCP + TLS)
+        self._requests = {"new": 0, "reused": 0}
+        self._request_time = {"new": 0.0, "reused": 0.0}
+        self._connect_time = 0.0
+
+    def get(self) -> aiohttp.ClientSession:
+        """The shared session, opened on first use (and again if the event loop changed)."""
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                ttl_dns_cache=self.dns_ttl,
+                keepalive_timeout=self.keepalive_timeout,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                trace_configs=[self._trace_config()],
+            )
+            self._loop = loop
+        return self._session
+
+    def _trace_config(self) -> aiohttp.TraceConfig:
+        async def on_request_start(session, ctx, params):
+            ctx.start = time.perf_counter()
+            ctx.connection = "reused"
+
+        async def on_connection_create_start(session, ctx, params):
+            ctx.connect_start = time.perf_counter()
+            ctx.connection = "new"
+
+        async def on_connection_create_end(session, ctx, params):
+            self._connect_time += time.perf_counter() - ctx.connect_start
+
+        async def on_request_end(session, ctx, params):
+            self._requests[ctx.connection] += 1
+            self._request_time[ctx.connection] += time.perf_counter() - ctx.start
+
+        trace = aiohttp.TraceConfig()
+        trace.on_request_start.append(on_request_start)
+        trace.on_connection_create_start.append(on_connection_create_start)
+        trace.on_connection_create_end.append(on_connection_create_end)
+        trace.on_request_end.append(on_request_end)
+        return trace
+
+    def stats(self) -> dict:
+        """Request counts and mean latency (ms) on new vs. reused connections, and mean connect time."""
+        def mean_ms(total, count):
+            return total / count * 1000 if count else 0.0
+
+        new, reused = self._requests["new"], self._requests["reused"]
+        return {
+            "requests": new + reused,
+            "new_connections": new,
+            "reused_connections": reused,
+            "new_ms": mean_ms(self._request_time["new"], new),
+            "reused_ms": mean_ms(self._request_time["reused"], reused),
+            "connect_ms": mean_ms(self._connect_time, new),
+        }
+
+    async def aclose(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+
+# owned by the coordinator agent (agent.py), which closes it on shutdown
+http_session = SharedSession()
@@ -0,0 +1,446 @@
+"""
+This script compares the coordinator's ASI:One call paths under concurrent load, without touching the network.
+It starts a local mock chat-completions endpoint that answers after a fixed delay (and can fail a share of
+requests with 503 to exercise retries), then sends the same batch of prompts two ways from one event loop:
+through the old blocking `requests.request(...)` call inside async helpers, and through helpers.py on the
+shared pooled ASI1Client, all in flight at once. Next to total time it reports how long the event loop stayed
+frozen (the worst delay of a 10 ms heartbeat), which is what stalls every other chat on the agent.
+A second section times sequential GETs against a local HTTPS mock (self-signed certificate made with the
+openssl CLI; plain HTTP if it is missing) with a new aiohttp session per request, as flights.py and hotels.py
+used to, and with the shared keep-alive SharedSession, and prints the session's connection statistics.
+A third section answers a four-part question (weather, flight, hotel, currency) with simulated lookup delays,
+one part after another as handle_chat used to and then fanned out with run_subtasks.
+A fourth section builds Amadeus-shaped flight and hotel responses and sends each to the summary helpers raw
+(as they used to be) and compacted, against a mock whose delay grows with prompt length like prefill does,
+reporting estimated prompt tokens and latency for both. The fifth has the mock generate a weather summary
+token by token and compares sending it whole with streaming it through ChatStream: time until the user
+gets the first text, and until the reply is complete. The last sends a burst of identical questions, as
+an event announcement does, and reports how many classification calls single-flight collapsed. Finally it
+measures what a tracing span costs with tracing off and on, and prints the stage histograms of a traced
+classification and flight summary.
+
+Run from the repository root:  python load_test.py [prompts] [latency_ms] [failure_rate]
+"""
+
+import asyncio
+import json
+import logging
+import os
+import random
+import shutil
+import ssl
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import aiohttp
+import requests
+
+import single_flight
+
+from asi1_client import asi1_client
+from compaction import compact_flights, compact_hotels, estimate_tokens
+from helpers import categorize_prompt, extract_flight_routes, extract_hotel_data
+from helpers import extract_weather_data
+from http_session import SharedSession
+from streaming import ChatStream
+from subtasks import merge_answers, run_subtasks
+from tracing import Tracer
+
+CLASSIFIED = json.dumps({"type": "event_info", "prompt": "how much are devconnect tickets",
+                         "event": "devconnect", "category": "ticket"})
+WEATHER_SUMMARY = ("🌤️ Devconnect weather, Buenos Aires: expect mild spring days, highs around 24°C and lows near 15°C, "
+                   "with a chance of light showers midweek. Pack a light jacket for the evenings. " * 4)
+
+
+def make_mock_handler(latency, failure_rate, per_token_latency=0.0, answer=CLASSIFIED, decode_latency=0.0):
+    """latency + per_token_latency * prompt tokens until the first output token, decode_latency per further token."""
+    class MockCompletions(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, so the pooled client can reuse connections
+        disable_nagle_algorithm = True  # headers and body go out in separate writes
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers["Content-Length"]))
+            time.sleep(latency + per_token_latency * estimate_tokens(body.decode()))
+            tokens = answer.split(" ")
+            if json.loads(body).get("stream"):
+                self.stream(tokens)
+                return
+            time.sleep(decode_latency * (len(tokens) - 1))
+            if random.random() < failure_rate:
+                status, payload = 503, b'{"error": "overloaded"}'
+            else:
+                status, payload = 200, json.dumps({
+                    "id": "mock",
+                    "object": "chat.completion",
+                    "choices": [{"index": 0, "finish_reason": "stop",
+                                 "message": {"role": "assistant", "content": answer}}],
+                    "usage": {"prompt_tokens": estimate_tokens(body.decode()), "completion_tokens": len(tokens)},
+                }).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def stream(self, tokens):
+            # server-sent events over a chunked response, one chat.completion.chunk per token
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for i, token in enumerate(tokens):
+                if i:
+                    time.sleep(decode_latency)
+                chunk = {"id": "mock", "object": "chat.completion.chunk",
+                         "choices": [{"index": 0, "delta": {"content": token if i == 0 else " " + token},
+                                      "finish_reason": "stop" if i == len(tokens) - 1 else None}]}
+                self.write_chunk(f"data: {json.dumps(chunk)}\n\n".encode())
+            self.write_chunk(b"data: [DONE]\n\n")
+            self.wfile.write(b"0\r\n\r\n")
+
+        def write_chunk(self, data):
+            self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+            self.wfile.flush()
+
+        def do_GET(self):
+            # stands in for an Amadeus reference-data lookup
+            payload = b'{"data": []}'
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    return MockCompletions
+
+
+def start_mock_server(latency, failure_rate, tls_context=None, per_token_latency=0.0, answer=CLASSIFIED,
+                      decode_latency=0.0):
+    handler = make_mock_handler(latency, failure_rate, per_token_latency, answer, decode_latency)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    if tls_context is not None:
+        server.socket = tls_context.wrap_socket(server.socket, server_side=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+async def blocking_categorize(prompt, endpoint):
+    # the helpers' previous call path: async signature, blocking request inside
+    payload = json.dumps({"model": "asi1-mini", "messages": [{"role": "user", "content": prompt}]})
+    response = requests.request("POST", endpoint, headers={'Content-Type': 'application/json'}, data=payload)
+    return response.json()
+
+
+async def heartbeat(stop, interval=0.01):
+    """Worst lateness of a periodic wake-up, i.e. the longest the event loop was blocked."""
+    worst = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        worst = max(worst, time.perf_counter() - start - interval)
+    return worst
+
+
+async def run(calls):
+    stop = asyncio.Event()
+    monitor = asyncio.create_task(heartbeat(stop))
+    await asyncio.sleep(0)
+    start = time.perf_counter()
+    results = await asyncio.gather(*calls, return_exceptions=True)
+    elapsed = time.perf_counter() - start
+    stop.set()
+    failed = sum(1 for r in results if isinstance(r, Exception) or "choices" not in r)
+    return {"elapsed": elapsed, "max_stall": await monitor, "failed": failed}
+
+
+async def main(n_prompts, endpoint):
+    prompts = [f"How much are devconnect tickets? #{i}" for i in range(n_prompts)]
+    blocking = await run([blocking_categorize(p, endpoint) for p in prompts])
+    asi1_client.endpoint = endpoint
+    pooled = await run([categorize_prompt(p) for p in prompts])
+    await asi1_client.aclose()
+    return blocking, pooled
+
+
+def self_signed_context(directory):
+    """Server TLS context with a throwaway certificate for 127.0.0.1, or None without the openssl CLI."""
+    if shutil.which("openssl") is None:
+        return None
+    cert, key = os.path.join(directory, "cert.pem"), os.path.join(directory, "key.pem")
+    subprocess.run(["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1", "-subj", "/CN=127.0.0.1",
+                    "-keyout", key, "-out", cert], check=True, capture_output=True)
+    context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    context.load_cert_chain(cert, key)
+    return context
+
+
+async def compare_sessions(url, n_requests):
+    client_tls = ssl.create_default_context()
+    client_tls.check_hostname = False
+    client_tls.verify_mode = ssl.CERT_NONE  # throwaway self-signed certificate
+
+    start = time.perf_counter()
+    for _ in range(n_requests):
+        async with aiohttp.ClientSession() as session:
+            async with session.get(url, ssl=client_tls) as resp:
+                await resp.read()
+    per_request = (time.perf_counter() - start) / n_requests
+
+    shared = SharedSession()
+    start = time.perf_counter()
+    for _ in range(n_requests):
+        async with shared.get().get(url, ssl=client_tls) as resp:
+            await resp.read()
+    reused = (time.perf_counter() - start) / n_requests
+    stats = shared.stats()
+    await shared.aclose()
+    return per_request, reused, stats
+
+
+class FanOutContext:
+    logger = logging.getLogger("load_test")
+
+
+def simulated_handler(delay):
+    async def handler(ctx, task, on_delta=None):
+        await asyncio.sleep(delay)
+        return f"{task['type']} answer"
+    return handler
+
+
+async def compare_fan_out(delays):
+    handlers = {kind: simulated_handler(delay) for kind, delay in delays.items()}
+    tasks = [{"type": kind} for kind in delays]
+
+    start = time.perf_counter()
+    sequential = [await handlers[task["type"]](FanOutContext, task) for task in tasks]
+    sequential_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    fanned_out = await run_subtasks(FanOutContext, tasks, handlers)
+    fan_out_s = time.perf_counter() - start
+    assert merge_answers(sequential) == merge_answers(fanned_out)
+    return sequential_s, fan_out_s
+
+
+def synthetic_flight_response(n_offers, n_segments=2):
+    """A flight-offers search response with the fields (and per-traveller bulk) Amadeus returns."""
+    offers = []
+    for i in range(n_offers):
+        segments = [{
+            "departure": {"iataCode": "LOS" if s == 0 else "ADD", "terminal": "1", "at": f"2025-11-14T{8 + 6 * s:02d}:05:00"},
+            "arrival": {"iataCode": "ADD" if s < n_segments - 1 else "EZE", "terminal": "2", "at": f"2025-11-14T{13 + 6 * s:02d}:40:00"},
+            "carrierCode": "ET", "number": str(900 + 10 * i + s), "aircraft": {"code": "350"},
+            "operating": {"carrierCode": "ET"}, "duration": "PT5H35M", "id": str(i * n_segments + s + 1),
+            "numberOfStops": 0, "blacklistedInEU": False,
+        } for s in range(n_segments)]
+        offers.append({
+            "type": "flight-offer", "id": str(i + 1), "source": "GDS", "instantTicketingRequired": False,
+            "nonHomogeneous": False, "oneWay": False, "isUpsellOffer": False, "lastTicketingDate": "2025-11-01",
+            "lastTicketingDateTime": "2025-11-01", "numberOfBookableSeats": 9,
+            "itineraries": [{"duration": "PT22H15M", "segments": segments}],
+            "price": {"currency": "EUR", "total": f"{900 + 37 * ((i * 7) % 11)}.40", "base": "610.00",
+                      "fees": [{"amount": "0.00", "type": "SUPPLIER"}, {"amount": "0.00", "type": "TICKETING"}],
+                      "grandTotal": f"{900 + 37 * ((i * 7) % 11)}.40", "additionalServices": [{"amount": "120.00", "type": "CHECKED_BAGS"}]},
+            "pricingOptions": {"fareType": ["PUBLISHED"], "includedCheckedBagsOnly": True},
+            "validatingAirlineCodes": ["ET"],
+            "travelerPricings": [{
+                "travelerId": "1", "fareOption": "STANDARD", "travelerType": "ADULT",
+                "price": {"currency": "EUR", "total": "933.40", "base": "610.00"},
+                "fareDetailsBySegment": [{
+                    "segmentId": seg["id"], "cabin": "ECONOMY", "fareBasis": "TLOWNG", "brandedFare": "ECOLITE",
+                    "brandedFareLabel": "ECONOMY LITE", "class": "T", "includedCheckedBags": {"quantity": 1},
+                    "includedCabinBags": {"quantity": 1},
+                    "amenities": [{"description": "PRE RESERVED SEAT ASSIGNMENT", "isChargeable": True,
+                                   "amenityType": "PRE_RESERVED_SEAT", "amenityProvider": {"name": "BrandedFare"}},
+                                  {"description": "MEAL", "isChargeable": False,
+                                   "amenityType": "MEAL", "amenityProvider": {"name": "BrandedFare"}}],
+                } for seg in segments],
+            }],
+        })
+    return {"meta": {"count": n_offers}, "data": offers, "dictionaries": {
+        "locations": {"LOS": {"cityCode": "LOS", "countryCode": "NG"}, "ADD": {"cityCode": "ADD", "countryCode": "ET"},
+                      "EZE": {"cityCode": "BUE", "countryCode": "AR"}},
+        "aircraft": {"350": "AIRBUS A350-900"}, "currencies": {"EUR": "EURO"}, "carriers": {"ET": "ETHIOPIAN AIRLINES"}}}
+
+
+def synthetic_hotel_response(n_hotels):
+    """A hotels-by-geocode response: every hotel in the radius, some listed twice under different ids."""
+    return {"data": [{
+        "chainCode": "HI", "iataCode": "BUE", "dupeId": 700000 + i // 2 * 2, "name": f"HOTEL {i // 2} PALERMO",
+        "hotelId": f"HIBUE{i:03d}", "geoCode": {"latitude": -34.62 + i / 1000, "longitude": -58.43},
+        "address": {"countryCode": "AR"}, "distance": {"value": round(0.1 + 0.07 * i, 2), "unit": "KM"},
+        "lastUpdate": "2025-06-01T10:00:00",
+    } for i in range(n_hotels)], "meta": {"count": n_hotels}}
+
+
+async def compare_compaction(endpoint, flights, hotels):
+    asi1_client.endpoint = endpoint
+    results = []
+    for kind, data, summarise in (("flight", flights, extract_flight_routes), ("hotel", hotels, extract_hotel_data)):
+        raw_tokens = estimate_tokens(str(data))
+        # what the helper used to send: the raw response, rendered with str()
+        start = time.perf_counter()
+        await asi1_client.complete({"model": "asi1-fast", "messages": [{"role": "user", "content": f"{data}"}]})
+        raw_s = time.perf_counter() - start
+        start = time.perf_counter()
+        await summarise(data)
+        compact_s = time.perf_counter() - start
+        results.append((kind, raw_tokens, raw_s, compact_s))
+    await asi1_client.aclose()
+    return results
+
+
+class StreamContext:
+    """Stands in for the agent's Context: ctx.send just counts the chunks."""
+    logger = logging.getLogger("load_test")
+
+    def __init__(self):
+        self.sent = 0
+
+    async def send(self, recipient, message):
+        self.sent += 1
+
+
+async def compare_streaming(endpoint, forecast):
+    asi1_client.endpoint = endpoint
+    start = time.perf_counter()
+    await extract_weather_data(forecast, "what will the weather be like at devconnect")
+    whole_s = time.perf_counter() - start
+
+    ctx = StreamContext()
+    stream = ChatStream(ctx, "user", lambda text: text)
+    await extract_weather_data(forecast, "what will the weather be like at devconnect", stream.write)
+    await stream.close()
+    stats = asi1_client.stream_stats()
+    await asi1_client.aclose()
+    return whole_s, stream, stats
+
+
+async def compare_coalescing(endpoint, n_users):
+    asi1_client.endpoint = endpoint
+    group = single_flight.groups["classify"]
+    before = group.stats()
+    start = time.perf_counter()
+    prompts = [("When is Devconnect?", "when is devconnect?", "When is  devconnect?")[i % 3] for i in range(n_users)]
+    results = await asyncio.gather(*(categorize_prompt(p) for p in prompts))
+    elapsed = time.perf_counter() - start
+    await asi1_client.aclose()
+    after = group.stats()
+    answered = sum(1 for r in results if "choices" in r)
+    return elapsed, answered, {k: after[k] - before[k] for k in ("calls", "executed", "collapsed")}
+
+
+def span_overhead(tracer, n=200000) -> float:
+    """Mean seconds one `with tracer.span(...)` adds around an empty block."""
+    start = time.perf_counter()
+    for _ in range(n):
+        pass
+    bare = time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in range(n):
+        with tracer.span("fetch", "weather"):
+            pass
+    return (time.perf_counter() - start - bare) / n
+
+
+async def traced_requests(endpoint, tracer, flights, n_requests):
+    asi1_client.endpoint = endpoint
+    for i in range(n_requests):
+        with tracer.span("classify", "prompt"):
+            await categorize_prompt(f"cheapest flight from London to Buenos Aires #{i}")
+        with tracer.span("summarize", "flight"):
+            await extract_flight_routes(flights)
+    await asi1_client.aclose()
+
+
+if __name__ == "__main__":
+    n_prompts = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    latency = (int(sys.argv[2]) if len(sys.argv) > 2 else 200) / 1000
+    failure_rate = float(sys.argv[3]) if len(sys.argv) > 3 else 0.0
+
+    server = start_mock_server(latency, failure_rate)
+    endpoint = f"http://127.0.0.1:{server.server_address[1]}/v1/chat/completions"
+    blocking, pooled = asyncio.run(main(n_prompts, endpoint))
+    server.shutdown()
+
+    print(f"\n{n_prompts} concurrent prompts, {latency * 1000:.0f} ms mock latency, {failure_rate:.0%} 503s")
+    for name, r in (("blocking requests", blocking), ("pooled ASI1Client", pooled)):
+        print(f"{name:<18}: {r['elapsed']:8.2f} s  {n_prompts / r['elapsed']:8.1f} prompts/s  "
+              f"event loop frozen up to {r['max_stall'] * 1000:8.1f} ms  failed {r['failed']}")
+    print(f"speed-up: {blocking['elapsed'] / pooled['elapsed']:.1f}x")
+
+    with tempfile.TemporaryDirectory() as cert_dir:
+        tls = self_signed_context(cert_dir)
+        server = start_mock_server(0.0, 0.0, tls)
+        url = f"{'https' if tls else 'http'}://127.0.0.1:{server.server_address[1]}/v1/reference-data"
+        per_request, reused, stats = asyncio.run(compare_sessions(url, n_prompts))
+        server.shutdown()
+
+    print(f"\n{n_prompts} sequential {'HTTPS' if tls else 'HTTP'} GETs to a local mock")
+    print(f"new session per request: {per_request * 1000:8.2f} ms/request")
+    print(f"shared SharedSession   : {reused * 1000:8.2f} ms/request")
+    print(f"session stats: {stats['new_connections']} new connections ({stats['new_ms']:.2f} ms/request, "
+          f"{stats['connect_ms']:.2f} ms connecting), {stats['reused_connections']} reused ({stats['reused_ms']:.2f} ms/request)")
+
+    delays = {"weather": 0.6, "flight": 1.2, "hotel": 0.9, "currency": 0.2}
+    sequential_s, fan_out_s = asyncio.run(compare_fan_out(delays))
+    print(f"\nfour-part question, simulated lookups of {', '.join(f'{k} {v:.1f} s' for k, v in delays.items())}")
+    print(f"one part at a time: {sequential_s:6.2f} s (sum {sum(delays.values()):.1f} s)")
+    print(f"run_subtasks      : {fan_out_s:6.2f} s (slowest {max(delays.values()):.1f} s)")
+
+    flights, hotels = synthetic_flight_response(20), synthetic_hotel_response(60)
+    prompt_tokens = {"flight": estimate_tokens(compact_flights(flights)), "hotel": estimate_tokens(compact_hotels(hotels))}
+    per_token = 0.0002  # simulated prefill, 5k tokens/s
+    server = start_mock_server(0.1, 0.0, per_token_latency=per_token)
+    endpoint = f"http://127.0.0.1:{server.server_address[1]}/v1/chat/completions"
+    results = asyncio.run(compare_compaction(endpoint, flights, hotels))
+    server.shutdown()
+    print(f"\nLLM summaries of raw vs. compacted API data (mock: 100 ms + {per_token * 1000:.1f} ms per prompt token)")
+    for kind, raw_tokens, raw_s, compact_s in results:
+        compact_tokens = prompt_tokens[kind]
+        print(f"{kind:<6}: ~{raw_tokens:6d} -> ~{compact_tokens:5d} data tokens ({1 - compact_tokens / raw_tokens:.0%} fewer, "
+              f"input cost scales alike)  latency {raw_s * 1000:7.1f} -> {compact_s * 1000:6.1f} ms")
+
+    forecast = "\n".join(f"2025-11-{day}: Max 24.1°C, Min 15.3°C, Precipitation 0.4mm" for day in range(10, 24))
+    decode = 0.02
+    server = start_mock_server(0.3, 0.0, answer=WEATHER_SUMMARY, decode_latency=decode)
+    endpoint = f"http://127.0.0.1:{server.server_address[1]}/v1/chat/completions"
+    whole_s, stream, stats = asyncio.run(compare_streaming(endpoint, forecast))
+    server.shutdown()
+    print(f"\nweather summary of {len(WEATHER_SUMMARY.split())} tokens (mock: 300 ms to first token + {decode * 1000:.0f} ms per token)")
+    print(f"sent whole: first text after {whole_s * 1000:7.1f} ms, complete after {whole_s * 1000:7.1f} ms, 1 message")
+    print(f"ChatStream: first text after {stream.first_chunk_s * 1000:7.1f} ms, complete after {stream.elapsed * 1000:7.1f} ms, "
+          f"{stream.chunks} messages")
+    print(f"ASI:One stream stats: {stats}")
+
+    server = start_mock_server(latency, 0.0)
+    endpoint = f"http://127.0.0.1:{server.server_address[1]}/v1/chat/completions"
+    elapsed, answered, coalesced = asyncio.run(compare_coalescing(endpoint, n_prompts))
+    server.shutdown()
+    print(f"\n{n_prompts} users asking \"when is devconnect\" at once ({latency * 1000:.0f} ms mock latency)")
+    print(f"classification calls: {coalesced['calls']} made, {coalesced['executed']} sent to ASI:One, "
+          f"{coalesced['collapsed']} collapsed; {answered} answered in {elapsed * 1000:.1f} ms")
+
+    off, on = span_overhead(Tracer(enabled=False)), span_overhead(Tracer(enabled=True))
+    print(f"\ntracing span overhead: {off * 1e9:.0f} ns off (TRACING unset), {on * 1e9:.0f} ns on")
+    tracer = Tracer(enabled=True)
+    server = start_mock_server(0.02, 0.0, per_token_latency=0.00005)
+    endpoint = f"http://127.0.0.1:{server.server_address[1]}/v1/chat/completions"
+    logging.disable(logging.INFO)  # the summaries log their prompt size
+    asyncio.run(traced_requests(endpoint, tracer, flights, 10))
+    logging.disable(logging.NOTSET)
+    server.shutdown()
+    print("traced classification and flight summary, 10 requests (mock: 20 ms + 0.05 ms per prompt token)")
+    for stage, stats in tracer.snapshot().items():
+        duration, prompt = stats["duration_seconds"], stats["prompt_tokens"]
+        print(f"{stage:<17}: {stats['spans']} spans, mean {duration['sum'] / duration['count'] * 1000:6.1f} ms, "
+              f"mean {prompt['sum'] / max(prompt['count'], 1):6.0f} prompt tokens")
@@ -0,0 +1,61 @@
+"""
+This module provides PendingRequests, the coordinator's table of questions forwarded to the EventRAG agent
+that are still waiting for an answer. Each forwarded ChatMessage is recorded under its msg_id together with
+the user who asked, and the EventRAG agent echoes that id back (MetadataContent "in_reply_to") on every
+message of its reply, so any number of questions can be in flight and each answer reaches the right user,
+without writing to agent storage per message. Entries live for a TTL, long enough for every chunk of a
+streamed answer; expire() hands back the ones that never got a reply so the user can be told. The table is
+bounded: past max_entries the oldest entries are dropped.
+"""
+
+import time
+from collections import OrderedDict
+
+# metadata key the EventRAG agent copies the forwarded message's msg_id into
+IN_REPLY_TO = "in_reply_to"
+
+
+class PendingRequests:
+    def __init__(self, ttl: float = 120.0, max_entries: int = 10000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # msg_id -> [expires_at, user address, answered], oldest first
+        self.routed = 0
+        self.unmatched = 0
+        self.expired = 0
+        self.evicted = 0
+
+    def add(self, msg_id, user: str):
+        self._entries[str(msg_id)] = [time.monotonic() + self.ttl, user, False]
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evicted += 1
+
+    def route(self, msg_id):
+        """The user waiting for the reply to msg_id, or None if it is unknown or has expired."""
+        entry = self._entries.get(str(msg_id)) if msg_id is not None else None
+        if entry is None or time.monotonic() >= entry[0]:
+            self.unmatched += 1
+            return None
+        entry[2] = True
+        self.routed += 1
+        return entry[1]
+
+    def expire(self) -> list:
+        """Drop expired entries; returns (msg_id, user) for those that never got a reply."""
+        now = time.monotonic()
+        unanswered = []
+        # entries share one TTL, so they expire in insertion order
+        while self._entries:
+            msg_id, (expires_at, user, answered) = next(iter(self._entries.items()))
+            if expires_at > now:
+                break
+            del self._entries[msg_id]
+            if not answered:
+                self.expired += 1
+                unanswered.append((msg_id, user))
+        return unanswered
+
+    def stats(self) -> dict:
+        return {"pending": len(self._entries), "routed": self.routed, "unmatched": self.unmatched,
+                "expired": self.expired, "evicted": self.evicted}
@@ -0,0 +1,182 @@
+"""
+This script compares the two ways the coordinator can answer an event question: forwarding it to the EventRAG
+agent and waiting for the reply, and answering it in-process with EmbeddedRAG (EVENTRAG_EMBEDDED=1). It runs a
+local agent pair: a stand-in EventRAG agent in a subprocess, answering chat messages with the same pipeline,
+and a coordinator-side agent in this process. Both listen on localhost with static endpoints (no Almanac, no
+mailbox), so the remote figures are a lower bound on the hop; through Agentverse mailboxes it costs more. The
+queries are ones the local classifier and answer templates handle, so neither mode calls the LLM and the
+difference is the hop alone (an LLM call would add the same time to both). Both sides build their graph in a
+temporary directory, so the benchmark leaves no store or snapshot behind.
+
+Run from the repository root:  python rag_pair_benchmark.py [queries]
+"""
+
+import asyncio
+import contextlib
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from uuid import uuid4
+
+from uagents import Agent, Context, Protocol
+from uagents.resolver import RulesBasedResolver
+from uagents_core.contrib.protocols.chat import (
+    ChatAcknowledgement,
+    ChatMessage,
+    TextContent,
+    chat_protocol_spec,
+)
+from uagents_core.identity import Identity
+from uagents_core.registration import AgentRegistrationPolicy
+
+from embedded_rag import EmbeddedRAG
+
+COORDINATOR_PORT, RAG_PORT = 8711, 8712
+COORDINATOR_SEED, RAG_SEED = "rag pair benchmark coordinator", "rag pair benchmark eventrag"
+QUERIES = ["What is the start date of Devconnect?", "What is the Breakpoint venue?", "How much are Devconnect tickets?",
+           "What is the start date of Breakpoint?", "What is the Devconnect venue?"]
+
+
+class LocalOnly(AgentRegistrationPolicy):
+    """Skips Almanac/Agentverse registration; the pair finds each other through static endpoints."""
+
+    async def register(self, agent_identifier, identity, protocols, endpoints, metadata=None):
+        pass
+
+
+def endpoint(port: int) -> str:
+    return f"http://127.0.0.1:{port}/submit"
+
+
+def local_agent(name: str, seed: str, port: int, peer_address: str, peer_port: int, loop) -> Agent:
+    return Agent(name=name, seed=seed, port=port, endpoint=[endpoint(port)], loop=loop, log_level="ERROR",
+                 resolve=RulesBasedResolver({peer_address: endpoint(peer_port)}),
+                 registration_policy=LocalOnly(), enable_agent_inspector=False, publish_agent_details=False,
+                 report_events=False, mark_inactive_on_shutdown=False)
+
+
+def create_text_chat(text: str) -> ChatMessage:
+    content = [TextContent(type="text", text=text)]
+    return ChatMessage(timestamp=datetime.now(timezone.utc), msg_id=uuid4(), content=content)
+
+
+def address_of(seed: str) -> str:
+    return Identity.from_seed(seed, 0).address
+
+
+def load_embedded(directory: str) -> EmbeddedRAG:
+    """The embedded pipeline with its store and snapshot in `directory` rather than the real ones in EventRAG/."""
+    os.makedirs(directory, exist_ok=True)
+    return EmbeddedRAG.load(api_key="unused", store_path=os.path.join(directory, "learned_knowledge.db"),
+                            snapshot_path=os.path.join(directory, "knowledge.snapshot"))
+
+
+def serve_rag(directory: str):
+    """The EventRAG side: answer each chat message with the embedded pipeline, as EventRAG/agent.py does."""
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    embedded = load_embedded(directory)
+    agent = local_agent("eventrag", RAG_SEED, RAG_PORT, address_of(COORDINATOR_SEED), COORDINATOR_PORT, loop)
+    proto = Protocol(spec=chat_protocol_spec)
+
+    @proto.on_message(ChatMessage)
+    async def answer(ctx: Context, sender: str, msg: ChatMessage):
+        await ctx.send(sender, create_text_chat(await embedded.answer(msg.text())))
+
+    @proto.on_message(ChatAcknowledgement)
+    async def ack(ctx: Context, sender: str, msg: ChatAcknowledgement):
+        pass
+
+    @agent.on_event("startup")
+    async def ready(ctx: Context):
+        print("ready", flush=True)
+
+    agent.include(proto)
+    agent.run()
+
+
+def summary(samples: list) -> str:
+    cuts = statistics.quantiles(samples, n=20)
+    return f"p50 {statistics.median(samples) * 1000:7.2f} ms  p95 {cuts[18] * 1000:7.2f} ms"
+
+
+def main(n_queries: int):
+    tmp = tempfile.mkdtemp(prefix="rag_pair_")
+    rag_process = subprocess.Popen([sys.executable, __file__, "--serve-rag", os.path.join(tmp, "eventrag")],
+                                   stdout=subprocess.PIPE, text=True)
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        embedded = load_embedded(os.path.join(tmp, "coordinator"))
+        agent = local_agent("coordinator", COORDINATOR_SEED, COORDINATOR_PORT, address_of(RAG_SEED), RAG_PORT, loop)
+        proto = Protocol(spec=chat_protocol_spec)
+        replies = asyncio.Queue()
+        results = loop.create_future()
+
+        @proto.on_message(ChatMessage)
+        async def reply(ctx: Context, sender: str, msg: ChatMessage):
+            await replies.put(msg.text())
+
+        @proto.on_message(ChatAcknowledgement)
+        async def ack(ctx: Context, sender: str, msg: ChatAcknowledgement):
+            pass
+
+        async def run(ctx: Context):
+            while (await loop.run_in_executor(None, rag_process.stdout.readline)).strip() != "ready":
+                pass
+            # keep draining the subprocess's pipeline prints so it never blocks on a full pipe
+            threading.Thread(target=rag_process.stdout.read, daemon=True).start()
+            await asyncio.sleep(1.0)  # the subprocess's server starts right after its startup handlers
+            queries = [QUERIES[i % len(QUERIES)] for i in range(n_queries)]
+            remote, in_process = [], []
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                await ask_both(ctx, [QUERIES[0]] + queries, remote, in_process)
+            results.set_result((remote, in_process))
+
+        async def ask_both(ctx: Context, queries: list, remote: list, in_process: list):
+            rag_address = address_of(RAG_SEED)
+            for i, query in enumerate(queries):
+                start = time.perf_counter()
+                await ctx.send(rag_address, create_text_chat(query))
+                remote_answer = await asyncio.wait_for(replies.get(), 30)
+                remote_s = time.perf_counter() - start
+
+                start = time.perf_counter()
+                local_answer = await embedded.answer(query)
+                local_s = time.perf_counter() - start
+                assert remote_answer == local_answer, (remote_answer, local_answer)
+                if i:  # the first round warms up connections
+                    remote.append(remote_s)
+                    in_process.append(local_s)
+
+        @agent.on_event("startup")
+        async def start(ctx: Context):
+            loop.create_task(run(ctx))
+
+        agent.include(proto)
+        agent_task = loop.create_task(agent.run_async())
+        remote, in_process = loop.run_until_complete(results)
+        agent_task.cancel()
+    finally:
+        rag_process.terminate()
+        rag_process.wait()
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    print(f"\n{n_queries} event questions answered from the knowledge graph (no LLM calls)")
+    print(f"EventRAG agent over localhost : {summary(remote)}")
+    print(f"embedded EventRAG (in-process): {summary(in_process)}")
+    print(f"hop overhead per question     : {(statistics.median(remote) - statistics.median(in_process)) * 1000:.2f} ms (p50)")
+    os._exit(0)  # skip the agent's shutdown handshake
+
+
+if __name__ == "__main__":
+    if "--serve-rag" in sys.argv:
+        serve_rag(sys.argv[sys.argv.index("--serve-rag") + 1])
+    else:
+        main(int(sys.argv[1]) if len(sys.argv) > 1 else 50)
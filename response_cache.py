@@ -0,0 +1,85 @@
+"""
+This module provides ResponseCache, the coordinator's cache of finished answers. Many users ask the same thing
+("hotels near devconnect", "weather at breakpoint"), and each answer costs an external API call plus an LLM
+summary. Answers are keyed on the classified sub-task type and the parameters that determine it (event,
+from/to/date, currency pair...; for weather also the prompt, which the summary answers), normalised so spacing
+and letter case don't matter, and kept for a TTL that suits how fast each kind of data goes stale. Memory is
+bounded by a global LRU limit. Hit/miss/eviction counters per type are exported through stats() so the TTLs
+and the size limit can be tuned against real traffic.
+"""
+
+import time
+from collections import OrderedDict
+
+# the sub-task fields an answer depends on; types not listed here are never cached
+KEY_FIELDS = {
+    # the weather summary answers the user's own question ("will it rain?", "what should I pack?")
+    "weather": ("event", "city", "date", "prompt"),
+    "flight": ("from", "to", "date"),
+    "hotel": ("event",),
+    "currency": ("base_code", "target_code", "amount"),
+}
+
+# seconds: forecasts move hourly, fares within minutes, the hotels near a venue hardly at all
+DEFAULT_TTLS = {"weather": 1800.0, "flight": 600.0, "hotel": 6 * 3600.0, "currency": 300.0}
+
+
+def _normalise(value) -> str:
+    return " ".join(str(value).lower().split())
+
+
+def task_key(task: dict):
+    """Key of a sub-task's answer (type plus the normalised KEY_FIELDS), or None if its type has none."""
+    kind = task.get("type")
+    if kind not in KEY_FIELDS:
+        return None
+    return (kind,) + tuple(_normalise(task.get(field, "")) for field in KEY_FIELDS[kind])
+
+
+class ResponseCache:
+    def __init__(self, ttls: dict = None, max_entries: int = 1000):
+        self.ttls = dict(DEFAULT_TTLS if ttls is None else ttls)
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (expires_at, answer), least recently used first
+        self._stats = {kind: {"hits": 0, "misses": 0, "evictions": 0} for kind in self.ttls}
+
+    def key(self, task: dict):
+        """Cache key for a sub-task, or None if its type isn't cached."""
+        return task_key(task) if task.get("type") in self.ttls else None
+
+    def get(self, task: dict):
+        key = self.key(task)
+        if key is None:
+            return None
+        entry = self._entries.get(key)
+        if entry is not None and time.monotonic() < entry[0]:
+            self._entries.move_to_end(key)
+            self._stats[key[0]]["hits"] += 1
+            return entry[1]
+        if entry is not None:
+            del self._entries[key]
+        self._stats[key[0]]["misses"] += 1
+        return None
+
+    def put(self, task: dict, answer: str):
+        key = self.key(task)
+        if key is None or not answer:
+            return
+        self._entries[key] = (time.monotonic() + self.ttls[key[0]], answer)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            evicted, _ = self._entries.popitem(last=False)
+            self._stats[evicted[0]]["evictions"] += 1
+
+    def stats(self) -> dict:
+        """Entries plus hits, misses, evictions and hit rate per type."""
+        per_type = {}
+        for kind, counters in self._stats.items():
+            lookups = counters["hits"] + counters["misses"]
+            per_type[kind] = {
+                **counters,
+                "entries": sum(1 for key in self._entries if key[0] == kind),
+                "ttl": self.ttls[kind],
+                "hit_rate": counters["hits"] / lookups if lookups else 0.0,
+            }
+        return {"entries": len(self._entries), "max_entries": self.max_entries, "types": per_type}
@@ -0,0 +1,69 @@
+"""
+This module provides request coalescing (single-flight) for the coordinator and the EventRAG agent. When many
+users ask the same thing at once (an event announcement brings dozens of "when is devconnect" within seconds),
+every identical request would otherwise make its own classification call, API fetch and LLM summary.
+SingleFlight.do runs one call per key and lets every concurrent caller with that key await the same result (or
+exception); once it finishes, the next caller starts a fresh call, so nothing is cached here. The shared call
+runs as its own task, so a caller that times out or is cancelled doesn't cancel it for the others. The
+coalesce decorator applies this to an async function, and stats() reports per group how many calls were made
+and how many of them were collapsed into one already in flight.
+"""
+
+import asyncio
+import functools
+
+
+class SingleFlight:
+    def __init__(self):
+        self._inflight = {}  # key -> Task of the call in progress
+        self.calls = 0
+        self.collapsed = 0
+
+    async def do(self, key, call):
+        """Result of `await call()`, shared with every concurrent caller using the same key."""
+        self.calls += 1
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(call())
+            self._inflight[key] = task
+            task.add_done_callback(functools.partial(self._done, key))
+        else:
+            self.collapsed += 1
+        return await asyncio.shield(task)
+
+    def _done(self, key, task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # mark retrieved, so a call whose callers all gave up doesn't warn
+
+    def stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "executed": self.calls - self.collapsed,
+            "collapsed": self.collapsed,
+            "in_flight": len(self._inflight),
+        }
+
+
+groups = {}  # name -> SingleFlight, for every coalesced function
+
+
+def coalesce(name: str, key=None):
+    """
+    Decorator: concurrent calls of an async function with the same key share one call. key receives the
+    function's arguments and returns a hashable key (default: the positional and keyword arguments).
+    """
+    group = groups.setdefault(name, SingleFlight())
+
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            call_key = key(*args, **kwargs) if key is not None else (args, tuple(sorted(kwargs.items())))
+            return await group.do(call_key, lambda: func(*args, **kwargs))
+        return wrapper
+    return decorator
+
+
+def stats() -> dict:
+    return {name: group.stats() for name, group in groups.items()}
@@ -0,0 +1,56 @@
+"""
+This script checks that weather lookups don't leak memory. It primes weather.py's geocoding and forecast
+caches with a synthetic 14-day forecast (so no request leaves the machine), then calls get_weather_forecast
+100k times, rendering every result the way extract_weather_data does. It samples traced Python memory every
+10k calls and fails if memory after the warm-up grows by more than the allowed slack, or if a response
+carries more than one forecast's worth of lines.
+
+Run from the repository root:  python soak_test.py [requests] [slack_kb]
+"""
+
+import asyncio
+import sys
+import tracemalloc
+
+import weather
+
+DAYS = 14
+
+
+def prime_caches():
+    location = {"name": "Buenos Aires", "latitude": -34.61, "longitude": -58.38}
+    weather.geocode_cache.put("buenos aires", location)
+    weather.forecast_cache.put(f"{location['latitude']},{location['longitude']}", {
+        "time": [f"2025-11-{day:02d}" for day in range(10, 10 + DAYS)],
+        "temperature_2m_max": [24.5 + day % 3 for day in range(DAYS)],
+        "temperature_2m_min": [14.0 + day % 2 for day in range(DAYS)],
+        "precipitation_sum": [0.2 * (day % 4) for day in range(DAYS)],
+    }, ttl=24 * 3600)
+
+
+async def soak(n_requests, sample_every=10_000):
+    samples = []
+    for i in range(1, n_requests + 1):
+        forecast = await weather.get_weather_forecast("devconnect")
+        lines = str(forecast).count("\n") + 1
+        if lines != DAYS:
+            raise AssertionError(f"request {i}: expected {DAYS} forecast lines, got {lines}")
+        if i % sample_every == 0:
+            samples.append(tracemalloc.get_traced_memory()[0])
+    return samples
+
+
+if __name__ == "__main__":
+    n_requests = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    slack_kb = float(sys.argv[2]) if len(sys.argv) > 2 else 64
+
+    prime_caches()
+    tracemalloc.start()
+    samples = asyncio.run(soak(n_requests))
+    tracemalloc.stop()
+
+    print(f"{n_requests} weather requests, traced memory every {n_requests // len(samples)}:")
+    print("  " + "  ".join(f"{sample / 1024:.0f} KB" for sample in samples))
+    growth_kb = (samples[-1] - samples[0]) / 1024
+    print(f"growth after warm-up: {growth_kb:+.1f} KB (allowed {slack_kb:.0f} KB)")
+    sys.exit(0 if growth_kb <= slack_kb else 1)
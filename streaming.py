@@ -0,0 +1,61 @@
+"""
+This module provides ChatStream, which turns a token stream from ASI:One into a few progressive ChatMessages
+instead of one message sent after the whole completion. Deltas are buffered and sent at word boundaries: the
+first chunk goes out as soon as it holds a few words, so the user sees the answer start after the model's
+first tokens, and later chunks are sent once they are long enough or a moment has passed, so a reply costs a
+handful of messages rather than one per token. It records when the first chunk and the last one were sent.
+"""
+
+import time
+
+FIRST_CHUNK_CHARS = 40
+CHUNK_CHARS = 400
+CHUNK_INTERVAL = 1.0
+
+
+class ChatStream:
+    def __init__(self, ctx, recipient: str, make_message, first_chunk_chars: int = FIRST_CHUNK_CHARS,
+                 chunk_chars: int = CHUNK_CHARS, interval: float = CHUNK_INTERVAL):
+        self.ctx = ctx
+        self.recipient = recipient
+        self.make_message = make_message  # text -> ChatMessage, i.e. the agent's create_text_chat
+        self.first_chunk_chars = first_chunk_chars
+        self.chunk_chars = chunk_chars
+        self.interval = interval
+        self.chunks = 0
+        self.first_chunk_s = None
+        self.elapsed = None
+        self._sent = []
+        self._buffer = ""
+        self._start = time.perf_counter()
+        self._last_flush = self._start
+
+    @property
+    def text(self) -> str:
+        """Everything sent so far."""
+        return "".join(self._sent)
+
+    async def write(self, delta: str):
+        self._buffer += delta
+        limit = self.first_chunk_chars if self.chunks == 0 else self.chunk_chars
+        if len(self._buffer) >= limit or (self.chunks and time.perf_counter() - self._last_flush >= self.interval):
+            # hold back a trailing partial word for the next chunk
+            cut = max(self._buffer.rfind(" "), self._buffer.rfind("\n")) + 1
+            if cut > 0:
+                await self._send(self._buffer[:cut])
+                self._buffer = self._buffer[cut:]
+
+    async def close(self):
+        """Send whatever is still buffered."""
+        if self._buffer:
+            await self._send(self._buffer)
+            self._buffer = ""
+        self.elapsed = time.perf_counter() - self._start
+
+    async def _send(self, text: str):
+        await self.ctx.send(self.recipient, self.make_message(text))
+        self._sent.append(text)
+        self.chunks += 1
+        self._last_flush = time.perf_counter()
+        if self.first_chunk_s is None:
+            self.first_chunk_s = self._last_flush - self._start
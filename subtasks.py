@@ -0,0 +1,80 @@
+"""
+This module lets the coordinator answer multi-part travel questions ("weather and hotels near breakpoint") in one
+reply. categorize_prompt may classify a message into several sub-tasks (a JSON array of the usual objects);
+parse_subtasks normalises the classifier output to a list. run_subtasks then runs the handler for every sub-task
+concurrently with asyncio.gather, each under a timeout for its type, so the reply waits for the slowest lookup
+rather than the sum of all of them. A sub-task that times out or fails yields an apology for that part only,
+and merge_answers joins the parts, in the order they were asked, into one message. With a ResponseCache, parts
+answered recently are served from it and fresh answers are stored; apologies never are. Identical cacheable
+parts asked at the same time by different users share one handler call (see single_flight.py). A single-part
+question can be streamed: its handler gets the on_delta callback to pass on to its LLM summary.
+"""
+
+import asyncio
+import json
+
+from response_cache import task_key
+from single_flight import SingleFlight, groups
+
+# per-type time budgets (seconds) for the fetch plus its LLM summary
+SUBTASK_TIMEOUTS = {"weather": 20.0, "flight": 30.0, "hotel": 30.0, "currency": 10.0}
+DEFAULT_TIMEOUT = 30.0
+MAX_SUBTASKS = 5
+
+# one fetch + summary for identical sub-tasks in flight at once, keyed like the response cache (weather
+# parts on their prompt too, so different questions about one forecast are not answered alike)
+_inflight_answers = groups.setdefault("subtask", SingleFlight())
+
+
+class SubtaskError(Exception):
+    """Raised by a handler that can't answer; the message is the apology sent for that part."""
+
+
+def parse_subtasks(content: str) -> list:
+    """Classifier output (one JSON object or an array of them) as a list of sub-task dicts."""
+    data = json.loads(content)
+    tasks = data if isinstance(data, list) else [data]
+    return [task for task in tasks if isinstance(task, dict) and "type" in task][:MAX_SUBTASKS]
+
+
+async def run_subtasks(ctx, tasks: list, handlers: dict, timeouts: dict = SUBTASK_TIMEOUTS, cache=None,
+                       on_delta=None) -> list:
+    """
+    Run handlers[task["type"]](ctx, task) for every task at once. Returns one answer per task, in order:
+    the cached or freshly computed text, an apology on timeout or error, or None for types without a handler.
+    on_delta is passed to the handler only when there is a single task; parts of a multi-part answer would
+    otherwise interleave.
+    """
+    if len(tasks) != 1:
+        on_delta = None
+
+    async def run(task):
+        handler = handlers.get(task["type"])
+        if handler is None:
+            return None
+        if cache is not None:
+            cached = cache.get(task)
+            if cached is not None:
+                return cached
+        key = task_key(task)
+        call = lambda: handler(ctx, task, on_delta=on_delta)
+        try:
+            answer = await asyncio.wait_for(_inflight_answers.do(key, call) if key is not None else call(),
+                                            timeouts.get(task["type"], DEFAULT_TIMEOUT))
+        except SubtaskError as e:
+            return str(e)
+        except asyncio.TimeoutError:
+            ctx.logger.warning(f"{task['type']} sub-task timed out")
+            return f"Sorry, the {task['type']} lookup took too long. Please try again."
+        except Exception as e:
+            ctx.logger.error(f"{task['type']} sub-task failed: {e}")
+            return f"Sorry, I couldn't get the {task['type']} information right now."
+        if cache is not None:
+            cache.put(task, answer)
+        return answer
+
+    return await asyncio.gather(*(run(task) for task in tasks))
+
+
+def merge_answers(answers: list) -> str:
+    return "\n\n---\n\n".join(answer for answer in answers if answer)
@@ -0,0 +1,172 @@
+"""
+This module provides lightweight per-stage tracing for the query pipeline, so a slow reply can be pinned on
+classification, knowledge-graph retrieval, an external API fetch, the LLM summary or sending the message.
+Code wraps a stage in `with tracer.span(stage, kind):` (stages: classify, retrieve, fetch, summarize, send;
+kind says which one, e.g. "weather"). Each finished span adds its duration to a per-stage histogram, and
+the LLM clients call record_tokens() with the usage ASI:One reports, which is credited to the innermost
+open span and kept in prompt/completion token histograms. Spans are tracked in a context variable, so
+concurrent chats don't mix. snapshot() returns everything as a dict (served as JSON by the agents), and
+prometheus() renders it in the Prometheus text exposition format. Tracing is off unless TRACING=1; then
+span() returns one shared no-op object and record_tokens() returns at once, so the instrumented code pays a
+function call per stage and nothing else.
+"""
+
+import contextvars
+import os
+import time
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+TOKEN_BUCKETS = (16, 32, 64, 128, 256, 512, 1024, 2048, 4096, 8192)
+
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "count", "sum")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+    def snapshot(self) -> dict:
+        """Count, sum and cumulative bucket counts (upper bound -> observations at or below it)."""
+        cumulative, total = {}, 0
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            cumulative[str(bound)] = total
+        cumulative["+Inf"] = self.count
+        return {"count": self.count, "sum": self.sum, "buckets": cumulative}
+
+
+class StageStats:
+    __slots__ = ("duration", "prompt_tokens", "completion_tokens", "errors")
+
+    def __init__(self):
+        self.duration = Histogram(DURATION_BUCKETS)
+        self.prompt_tokens = Histogram(TOKEN_BUCKETS)
+        self.completion_tokens = Histogram(TOKEN_BUCKETS)
+        self.errors = 0
+
+
+class Span:
+    __slots__ = ("tracer", "key", "start", "prompt_tokens", "completion_tokens", "_reset")
+
+    def __init__(self, tracer, key):
+        self.tracer = tracer
+        self.key = key
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+
+    def __enter__(self):
+        self._reset = _current_span.set(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration = time.perf_counter() - self.start
+        _current_span.reset(self._reset)
+        self.tracer._record(self, duration, failed=exc_type is not None)
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Tracer:
+    def __init__(self, enabled: bool = False, namespace: str = "eventcore"):
+        self.enabled = enabled
+        self.namespace = namespace
+        self._stages = {}  # (stage, kind) -> StageStats
+
+    def span(self, stage: str, kind: str = ""):
+        """Context manager timing one stage; a shared no-op when tracing is off."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return Span(self, (stage, kind))
+
+    def _record(self, span: Span, duration: float, failed: bool):
+        stats = self._stages.get(span.key)
+        if stats is None:
+            stats = self._stages[span.key] = StageStats()
+        stats.duration.observe(duration)
+        if span.prompt_tokens or span.completion_tokens:
+            stats.prompt_tokens.observe(span.prompt_tokens)
+            stats.completion_tokens.observe(span.completion_tokens)
+        if failed:
+            stats.errors += 1
+
+    def snapshot(self) -> dict:
+        """Per "stage/kind": spans, errors, and duration and token histograms."""
+        return {
+            f"{stage}/{kind}" if kind else stage: {
+                "spans": stats.duration.count,
+                "errors": stats.errors,
+                "duration_seconds": stats.duration.snapshot(),
+                "prompt_tokens": stats.prompt_tokens.snapshot(),
+                "completion_tokens": stats.completion_tokens.snapshot(),
+            }
+            for (stage, kind), stats in sorted(self._stages.items())
+        }
+
+    def prometheus(self) -> str:
+        """All stages in the Prometheus text exposition format."""
+        lines = []
+        for metric, help_text, field in (
+            ("stage_duration_seconds", "Time spent in a pipeline stage.", "duration"),
+            ("stage_prompt_tokens", "Prompt tokens of the LLM calls made in a stage.", "prompt_tokens"),
+            ("stage_completion_tokens", "Completion tokens of the LLM calls made in a stage.", "completion_tokens"),
+        ):
+            name = f"{self.namespace}_{metric}"
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+            for (stage, kind), stats in sorted(self._stages.items()):
+                histogram = getattr(stats, field)
+                if not histogram.count:
+                    continue
+                labels = f'stage="{stage}",kind="{kind}"'
+                for bound, count in histogram.snapshot()["buckets"].items():
+                    lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {count}')
+                lines.append(f"{name}_sum{{{labels}}} {histogram.sum}")
+                lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+        name = f"{self.namespace}_stage_errors_total"
+        lines += [f"# HELP {name} Spans of a stage that ended in an exception.", f"# TYPE {name} counter"]
+        for (stage, kind), stats in sorted(self._stages.items()):
+            lines.append(f'{name}{{stage="{stage}",kind="{kind}"}} {stats.errors}')
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str):
+        """Write prometheus() to path atomically, e.g. for node_exporter's textfile collector."""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(self.prometheus())
+        os.replace(tmp_path, path)
+
+
+def record_tokens(prompt_tokens: int = 0, completion_tokens: int = 0):
+    """Credit an LLM call's token usage to the innermost open span, if any."""
+    span = _current_span.get()
+    if span is not None:
+        span.prompt_tokens += prompt_tokens or 0
+        span.completion_tokens += completion_tokens or 0
+
+
+tracer = Tracer(enabled=os.getenv("TRACING", "0") == "1")
@@ -0,0 +1,102 @@
+"""
+This module provides TTLCache, a small async cache for results of slow outbound API calls (geocoding, weather
+forecasts). Entries expire after a per-cache TTL (None keeps them forever) and the least recently used ones are
+dropped past max_entries. get_or_fetch is single-flight: concurrent misses for the same key share one fetch
+instead of each calling the API. With a path, entries are also kept in a small JSON file, so a restarted agent
+starts warm instead of refetching everything; values must then be JSON-serialisable.
+"""
+
+import asyncio
+import json
+import os
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    def __init__(self, ttl: float = None, max_entries: int = 256, path: str = None):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.path = path
+        self._entries = OrderedDict()  # key -> (expires_at wall-clock time or None, value)
+        self._inflight = {}  # key -> Future of the fetch in progress
+        self.hits = 0
+        self.misses = 0
+        self.fetches = 0
+        if path and os.path.exists(path):
+            self._load()
+
+    def get(self, key: str):
+        """The cached value for key, or None if missing or expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at is not None and time.time() >= expires_at:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def put(self, key: str, value, ttl: float = None):
+        ttl = self.ttl if ttl is None else ttl
+        self._entries[key] = (time.time() + ttl if ttl is not None else None, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        if self.path:
+            self._save()
+
+    async def get_or_fetch(self, key: str, fetch, ttl: float = None):
+        """Cached value for key, or the result of `await fetch()` (stored unless None); one fetch per key at a time."""
+        value = self.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+        self.misses += 1
+        pending = self._inflight.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            self.fetches += 1
+            value = await fetch()
+            if value is not None:
+                self.put(key, value, ttl)
+            future.set_result(value)
+            return value
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # mark retrieved, so a fetch nobody else awaited doesn't warn
+            raise
+        finally:
+            del self._inflight[key]
+
+    def _load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            return
+        now = time.time()
+        for key, (expires_at, value) in stored.items():
+            if expires_at is None or expires_at > now:
+                self._entries[key] = (expires_at, value)
+
+    def _save(self):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({key: [expires_at, value] for key, (expires_at, value) in self._entries.items()}, f)
+        os.replace(tmp_path, self.path)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "fetches": self.fetches,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
@@ -2,80 +2,113 @@
 This script defines an asynchronous function get_weather_forecast that fetches a 14-day weather
 forecast for a city associated with a given event name (either "devconnect" or "breakpoint"). It
 first uses the Open-Meteo geocoding API to obtain latitude and longitude coordinates for the
-event's city, then retrieves forecast data—including daily maximum and minimum temperatures
-and precipitation—using Open-Meteo’s weather API. The results are formatted into readable strings
-and stored in an array, which is returned for later use. The file also includes configuration for
-interacting with the ASI1 API, though it is not used within this function.
+event's city, then retrieves forecast data—including daily maximum and minimum temperatures and
+precipitation—using Open-Meteo’s weather API. Each call returns its own compact Forecast (one
+tuple per field), which renders as one readable line per day when put into a prompt. Geocoding
+results are memoized for good and forecasts are cached per location for about an hour (optionally
+on disk, see WEATHER_CACHE_DIR), and concurrent requests for one location share a fetch.
 """
 
-import requests, os
-import json
-from dotenv import load_dotenv
 import os
+from dataclasses import dataclass
 
-# Load environment variables from the .env file (if present)
-load_dotenv()
-
-ASI_1_API_KEY = os.getenv("ASI1_API_KEY")
-
-asi1_api_key = ASI_1_API_KEY
-
-ASI1_Endpoint = "https://api.asi1.ai/v1/chat/completions"
-
+from dotenv import load_dotenv
 
-headers = {
-  'Content-Type': 'application/json',
-  'Accept': 'application/json',
-  'Authorization': f'Bearer {asi1_api_key}'  # agentverse api key; stored in agent secrets
-}
-array = []
+from http_session import http_session
+from single_flight import coalesce
+from ttl_cache import TTLCache
 
+# Load environment variables from the .env file (if present)
+load_dotenv()
 
+GEOCODE_URL = "https://geocoding-api.open-meteo.com/v1/search"
+FORECAST_URL = "https://api.open-meteo.com/v1/forecast"
+
+# Coordinates never change, so geocoding results are kept for good. Open-Meteo refreshes its models
+# roughly hourly, so a forecast is reused for up to WEATHER_CACHE_TTL seconds (default one hour).
+# WEATHER_CACHE_DIR, if set, persists both caches across restarts.
+_cache_dir = os.getenv("WEATHER_CACHE_DIR")
+geocode_cache = TTLCache(ttl=None, path=os.path.join(_cache_dir, "geocode.json") if _cache_dir else None)
+forecast_cache = TTLCache(ttl=float(os.getenv("WEATHER_CACHE_TTL", "3600")),
+                          path=os.path.join(_cache_dir, "forecast.json") if _cache_dir else None)
+
+
+@dataclass(frozen=True, slots=True)
+class Forecast:
+    """One location's daily forecast, stored column-wise (one tuple per field, one entry per day)."""
+    location: str
+    dates: tuple
+    max_temps: tuple
+    min_temps: tuple
+    precipitation: tuple
+
+    def __iter__(self):
+        """(date, max °C, min °C, precipitation mm) per day."""
+        return zip(self.dates, self.max_temps, self.min_temps, self.precipitation)
+
+    def __len__(self):
+        return len(self.dates)
+
+    def __str__(self):
+        # the 'YYYY-MM-DD: Max ..°C, Min ..°C, Precipitation ..mm' lines extract_weather_data's prompt expects
+        return "\n".join(f"{date}: Max {max_temp}°C, Min {min_temp}°C, Precipitation {precipitation}mm"
+                         for date, max_temp, min_temp, precipitation in self)
+
+
+async def geocode(city):
+    """First Open-Meteo geocoding match for city (name, latitude, longitude), or None if not found."""
+    async def fetch():
+        async with http_session.get().get(GEOCODE_URL, params={"name": city, "count": 1}) as resp:
+            geo_data = await resp.json()
+        if "results" not in geo_data:
+            return None
+        return {key: geo_data["results"][0][key] for key in ("name", "latitude", "longitude")}
+
+    return await geocode_cache.get_or_fetch(city, fetch)
+
+
+async def fetch_forecast(latitude, longitude):
+    """Daily 14-day forecast for a location, or None if Open-Meteo didn't answer."""
+    async def fetch():
+        weather_params = {
+            "latitude": latitude,
+            "longitude": longitude,
+            "daily": "temperature_2m_max,temperature_2m_min,precipitation_sum",
+            "forecast_days": 14,
+            "timezone": "auto"
+        }
+        async with http_session.get().get(FORECAST_URL, params=weather_params) as resp:
+            if resp.status != 200:
+                return None
+            return (await resp.json())["daily"]
+
+    return await forecast_cache.get_or_fetch(f"{latitude},{longitude}", fetch)
+
+
+@coalesce("weather")
 async def get_weather_forecast(event):
     city = ""
     if event == "devconnect":
         city = "buenos aires"
     elif event == "breakpoint":
         city = "abu dhabi"
-    # 1️⃣ Get city coordinates from Open-Meteo's geocoding API
-    geocode_url = "https://geocoding-api.open-meteo.com/v1/search"
-    geocode_params = {"name": city, "count": 1}
-    geo_response = requests.get(geocode_url, params=geocode_params)
-    geo_data = geo_response.json()
-
-    if "results" not in geo_data:
+    # 1️⃣ Get city coordinates from Open-Meteo's geocoding API (memoized)
+    location = await geocode(city)
+    if location is None:
         print("City not found.")
         return
 
-    latitude = geo_data["results"][0]["latitude"]
-    longitude = geo_data["results"][0]["longitude"]
-    location_name = geo_data["results"][0]["name"]
-
-    # 2️⃣ Fetch 14-day weather forecast
-    weather_url = "https://api.open-meteo.com/v1/forecast"
-    weather_params = {
-        "latitude": latitude,
-        "longitude": longitude,
-        "daily": "temperature_2m_max,temperature_2m_min,precipitation_sum",
-        "forecast_days": 14,
-        "timezone": "auto"
-    }
-
-    weather_response = requests.get(weather_url, params=weather_params)
-    if weather_response.status_code != 200:
+    # 2️⃣ Fetch 14-day weather forecast (cached per location)
+    daily = await fetch_forecast(location["latitude"], location["longitude"])
+    if daily is None:
         print("Failed to fetch weather data.")
         return
 
-    weather_data = weather_response.json()
-    print(f"\n14-Day Weather Forecast for {location_name}:\n")
-
-    # 3️⃣ Print daily forecast
-    for i in range(len(weather_data["daily"]["time"])):
-        date = weather_data["daily"]["time"][i]
-        max_temp = weather_data["daily"]["temperature_2m_max"][i]
-        min_temp = weather_data["daily"]["temperature_2m_min"][i]
-        precipitation = weather_data["daily"]["precipitation_sum"][i]
-
-        forecast = f"{date}: Max {max_temp}°C, Min {min_temp}°C, Precipitation {precipitation}mm"
-        array.append(forecast)
-    return array
+    # 3️⃣ Return this call's forecast as its own compact object; nothing accumulates between calls
+    return Forecast(
+        location=location["name"],
+        dates=tuple(daily["time"]),
+        max_temps=tuple(daily["temperature_2m_max"]),
+        min_temps=tuple(daily["temperature_2m_min"]),
+        precipitation=tuple(daily["precipitation_sum"]),
+    )